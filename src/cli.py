@@ -0,0 +1,148 @@
+"""Command line tools for maintaining the workbench.
+"""
+
+import argparse
+import logging
+from logging import getLogger
+
+from llama_index.core import SimpleDirectoryReader
+from llama_index.core.node_parser import SentenceSplitter
+import numpy as np
+import ollama
+
+from config import get_settings
+from core.prompting.provider.monitor import ModelStatus
+from core.prompting.store.quantization import get_quantization_report
+from resources import create_model_monitors, create_session_manager
+
+logger = getLogger()
+settings = get_settings()
+
+
+def quantization_report(args: argparse.Namespace):
+    """Print the recall and size of each quantization setting for the
+    embeddings of a sample corpus."""
+    documents = SimpleDirectoryReader(input_files=args.files).load_data()
+    nodes = SentenceSplitter.from_defaults(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap
+    ).get_nodes_from_documents(documents)
+    texts = [node.get_content() for node in nodes]
+
+    if len(texts) <= args.queries:
+        raise ValueError(
+            f"The corpus has {len(texts)} chunks, which is not enough for "
+            f"{args.queries} queries.")
+
+    client = ollama.Client(
+        host=settings.ollama_host,
+        timeout=settings.ollama_request_timeout
+    )
+    embeddings = []
+    for start in range(0, len(texts), args.batch_size):
+        response = client.embed(
+            model=settings.model_embeddings,
+            input=texts[start:start + args.batch_size]
+        )
+        embeddings.extend(response['embeddings'])
+        logger.info('m=embed done=%d total=%d', len(embeddings), len(texts))
+
+    # Queries are held out from the corpus, so they do not match themselves.
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    permutation = np.random.default_rng(args.seed).permutation(len(texts))
+    queries = embeddings[permutation[:args.queries]]
+    corpus = embeddings[permutation[args.queries:]]
+
+    entries = get_quantization_report(corpus, queries, args.top_k)
+
+    print(f"Corpus: {len(corpus)} chunks | Queries: {len(queries)} | "
+          f"Dimensions: {corpus.shape[1]} | Top-k: {args.top_k}")
+    print(f"{'Quantization':<14}{'Rescore':<9}{'Searched (KB)':>15}"
+          f"{'Stored (KB)':>13}{'Recall':>9}")
+    for entry in entries:
+        print(f"{entry.quantization:<14}{str(entry.rescore):<9}"
+              f"{entry.searched_bytes / 1024:>15,.1f}"
+              f"{entry.stored_bytes / 1024:>13,.1f}"
+              f"{entry.recall:>9.3f}")
+
+
+def sweep_sessions(args: argparse.Namespace):
+    """Delete the files and collections of idle sessions."""
+    if settings.shared_corpus:
+        # The app keeps the corpus references and indexes in memory, so
+        # changes by another process would be overwritten or left stale.
+        raise ValueError(
+            'Sessions cannot be swept from the command line while the shared '
+            'corpus is enabled. Use the sweeper of the app instead.')
+
+    manager = create_session_manager()
+    evicted = manager.sweep()
+
+    for session_id in evicted:
+        print(f"Deleted session {session_id}")
+    print(f"Deleted sessions: {len(evicted)} | "
+          f"Remaining sessions: {len(manager.get_sessions())}")
+
+
+def check_models(args: argparse.Namespace):
+    """Print whether the LLM and embedding models are loaded by Ollama,
+    optionally loading them first."""
+    for monitor in create_model_monitors():
+        if args.warm_up:
+            monitor.warm_up()
+
+        for status in monitor.check():
+            print_model_status(status)
+
+
+def print_model_status(status: ModelStatus):
+    """Print the load state of a model."""
+    load_time = f"{status.load_time:.2f}s" \
+        if status.load_time is not None else '-'
+    host = f" | Host: {status.host}" if status.host else ''
+    error = f" | Error: {status.error}" if status.error else ''
+    print(f"{status.name}{host} | Loaded: {status.loaded} | "
+          f"Load time: {load_time} | "
+          f"VRAM: {status.size_vram / 1024 ** 2:,.0f} MB{error}")
+
+
+def main():
+    """Run the command from the command line arguments."""
+    logging.basicConfig(level=logging.INFO, format=settings.log_format)
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(required=True)
+
+    report_parser = commands.add_parser(
+        'quantization-report',
+        help='Compare recall and size of embedding quantization settings.')
+    report_parser.add_argument(
+        'files', nargs='+', help='Files of the sample corpus.')
+    report_parser.add_argument('--top-k', type=int, default=10)
+    report_parser.add_argument('--queries', type=int, default=100)
+    report_parser.add_argument('--chunk-size', type=int, default=1024)
+    report_parser.add_argument('--chunk-overlap', type=int, default=20)
+    report_parser.add_argument('--batch-size', type=int, default=64)
+    report_parser.add_argument('--seed', type=int, default=0)
+    report_parser.set_defaults(command=quantization_report)
+
+    sweep_parser = commands.add_parser(
+        'sweep-sessions',
+        help='Delete sessions idle for longer than the session TTL or '
+        'exceeding the session quota.')
+    sweep_parser.set_defaults(command=sweep_sessions)
+
+    models_parser = commands.add_parser(
+        'check-models',
+        help='Check if the LLM and embedding models are loaded by Ollama.')
+    models_parser.add_argument(
+        '--warm-up', action='store_true',
+        help='Load the models before checking them.')
+    models_parser.set_defaults(command=check_models)
+
+    args = parser.parse_args()
+    args.command(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,12 +12,33 @@ class Settings(BaseSettings):
     ollama_host: str = 'http://localhost:11434'
     """Host of the Ollama server."""
 
+    ollama_hosts: str = ''
+    """Comma separated hosts of Ollama servers sharing the generation and
+    embedding requests, sent to the host with the fewest requests in flight.
+    Overrides OLLAMA_HOST when set."""
+
+    ollama_host_cooldown: int = 30
+    """Seconds a failing Ollama host stops receiving requests before being
+    tried again, when using multiple hosts."""
+
     ollama_request_timeout: int = 600
     """Request timeout to the Ollama server, in seconds."""
 
     ollama_model: str = 'contextualized-assistant'
     """Name of the LLM model used by Ollama."""
 
+    ollama_keep_alive: str = '30m'
+    """How long Ollama keeps the LLM and embedding models loaded after each
+    request (e.g. `30m`, `1h`, or `-1` to keep them loaded)."""
+
+    ollama_warm_up: bool = True
+    """Whether to load the LLM and embedding models when the application
+    starts, so the first prompt or indexing does not wait for them."""
+
+    ollama_monitor_interval: int = 30
+    """Seconds between checks of the models loaded by Ollama, shown in the
+    sidebar. 0 disables the checks."""
+
     open_router_host: str = 'https://openrouter.ai/api/v1/chat/completions'
     """Host of the OpenRouter API."""
 
@@ -27,21 +48,128 @@ class Settings(BaseSettings):
     open_router_request_timeout: int = 60000
     """Request timeout to the OpenRouter server, in miliseconds."""
 
+    http_pool_size: int = 10
+    """Maximum connections kept alive per host for OpenRouter and /endpoint
+    requests."""
+
+    http_max_retries: int = 3
+    """Maximum retries of OpenRouter and /endpoint requests failing to connect
+    or with transient status codes (429 and 5xx)."""
+
+    http_backoff_factor: float = 0.5
+    """Base seconds of the exponential backoff between retries, with random
+    jitter added. A Retry-After header from the server takes precedence."""
+
     open_router_model: str = 'contextualized-assistant'
     """Name of the LLM model used by OpenRouter."""
 
     model_provider: str = 'OLLAMA'
     """Provider used for LLM generation (OLLAMA, OPENROUTER). Defaults to OLLAMA."""
 
+    model_provider_secondary: str = ''
+    """Provider receiving the prompts the primary provider is slow to answer
+    or fails (OLLAMA, OPENROUTER). Disabled when empty."""
+
+    hedge_percentile: float = 95
+    """Percentile of the primary provider latencies after which prompts are
+    also sent to the secondary provider."""
+
+    hedge_initial_deadline: float = 10
+    """Seconds after which prompts are also sent to the secondary provider,
+    until enough latencies of the primary provider are recorded."""
+
+    hedge_timeout: float = 600
+    """Seconds waited for a response of either provider when hedging, after
+    which the prompt fails. Set to 0 to wait until the providers time out."""
+
     model_embeddings: str = 'mxbai-embed-large'
     """Name of the embedding model used by the application."""
 
+    embedding_max_in_flight: int = 4
+    """Maximum amount of concurrent embedding requests during indexing. Should
+    match the amount of parallel requests the Ollama server can handle
+    (OLLAMA_NUM_PARALLEL)."""
+
+    parser_workers: int = 1
+    """Number of processes parsing uploaded files in parallel. 1 parses files
+    one at a time in the indexing thread."""
+
     vector_db_path: str = './.data/vdb'
     """Path where the embeddings data will be saved."""
 
+    vector_store: str = 'CHROMA'
+    """Store used for session collections (CHROMA, NUMPY). NUMPY performs exact
+    search on a memory-mapped matrix, faster for collections up to a few
+    thousand chunks. CHROMA uses an approximate index, better suited for
+    large corpora. Defaults to CHROMA."""
+
+    vector_store_quantization: str = 'float32'
+    """Type of the embeddings kept by the NUMPY store (float32, float16, int8).
+    float16 and int8 reduce size at the cost of recall. Applies only to new
+    collections."""
+
+    vector_store_rescore: bool = True
+    """Rescore quantized search results with float32 embeddings, recovering
+    recall at the cost of keeping the float32 embeddings on disk."""
+
+    shared_corpus: bool = False
+    """Store documents in a collection shared by all sessions, so identical
+    files uploaded to different sessions are indexed only once. Each session
+    keeps references to its documents and queries only them."""
+
+    embedding_cache_max_size: int = 536870912
+    """Maximum size of the embedding cache, in bytes. The cache is stored in
+    the vector database path and shared by all sessions. Set to 0 to disable
+    the cache."""
+
+    document_cache_max_size: int = 268435456
+    """Maximum size of the cache of parsed files, in bytes. Files with the same
+    contents are parsed only once, even when the chunking changes. Set to 0
+    to disable the cache."""
+
+    response_cache_max_size: int = 268435456
+    """Maximum size of the cache of model responses, in bytes, used by prompts
+    with the `cache` parameter and by replays with cached responses. Set to 0
+    to disable the cache."""
+
+    response_cache_ttl: int = 604800
+    """Seconds a cached model response is reused. Set to 0 to reuse responses
+    until evicted."""
+
+    query_cache_size: int = 256
+    """Maximum number of query embeddings and query results kept in memory."""
+
+    rag_context_max_tokens: int = 1536
+    """Default maximum estimated tokens of the context used by /rag, keeping
+    prompts within the model context window. /context is not limited unless
+    requested. Set to 0 to disable the limit."""
+
     session_path: str = './.data/session'
     """Directory where session files are stored."""
 
+    session_ttl: int = 86400
+    """Seconds a session can stay idle before its files and collection are
+    deleted. Set to 0 to keep idle sessions."""
+
+    session_max_size: int = 0
+    """Maximum total size of the session files and index data, in bytes. The
+    least recently used idle sessions are deleted while it is exceeded. Set
+    to 0 to disable the quota. Chroma collections are not counted."""
+
+    session_restore_from_url: bool = False
+    """Keep the session ID in the page URL, so refreshing the page restores the
+    session and its indexing jobs. Anyone with the URL gets the session files
+    and chat, and the URL is kept in browser history and proxy logs, so only
+    enable it on trusted deployments."""
+
+    session_sweep_interval: int = 600
+    """Seconds between background sweeps of idle sessions. Set to 0 to only
+    sweep from the command line."""
+
+    cache_resources: bool = True
+    """Reuse clients, providers and indexers between Streamlit reruns. Disable
+    to compare the setup time logged on each rerun."""
+
     model_config = SettingsConfigDict(env_file='.env')
 
 
@@ -0,0 +1,203 @@
+"""HTTP client module."""
+
+import asyncio
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+"""Status codes of transient errors, whose requests are retried."""
+
+MAX_BACKOFF = 120
+"""Maximum seconds waited between retries."""
+
+T = TypeVar('T')
+
+
+def create_http_session(
+    pool_size: int = 10,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+    backoff_jitter: float = 0.5
+) -> requests.Session:
+    """Create an HTTP session that keeps connections alive and retries
+    transient errors.
+
+    Only connection errors and transient status codes are retried, since the
+    server may have already processed requests failing while reading the
+    response. Retries wait an exponential backoff with random jitter, or the
+    time requested by the server in a Retry-After header. When retries are
+    exhausted, the last response is returned.
+
+    Args:
+        - pool_size: Maximum connections kept alive per host.
+        - max_retries: Maximum retries of a request.
+        - backoff_factor: Base seconds of the exponential backoff.
+        - backoff_jitter: Maximum random seconds added to each backoff.
+
+    Returns:
+        HTTP session, which can be shared by threads.
+    """
+    retry = Retry(
+        total=max_retries,
+        read=0,
+        other=0,
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=None,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+def create_async_http_client(
+    pool_size: int = 10,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+    backoff_jitter: float = 0.5
+) -> httpx.AsyncClient:
+    """Create an async HTTP client that keeps connections alive and retries
+    transient errors, with the same policy of `create_http_session`.
+
+    The client can only be used in the event loop where it is first used.
+
+    Args:
+        - pool_size: Maximum connections kept alive.
+        - max_retries: Maximum retries of a request.
+        - backoff_factor: Base seconds of the exponential backoff.
+        - backoff_jitter: Maximum random seconds added to each backoff.
+
+    Returns:
+        Async HTTP client.
+    """
+    limits = httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size
+    )
+    return httpx.AsyncClient(transport=AsyncRetryTransport(
+        httpx.AsyncHTTPTransport(limits=limits),
+        max_retries,
+        backoff_factor,
+        backoff_jitter
+    ))
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """Retries requests failing to connect or with transient status codes,
+    waiting an exponential backoff with random jitter or the time requested
+    in a Retry-After header.
+
+    Other transport errors are raised, since the server may have already
+    processed the request.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_retries: int,
+        backoff_factor: float,
+        backoff_jitter: float
+    ):
+        """
+        Args:
+            - transport: Transport performing the requests.
+            - max_retries: Maximum retries of a request.
+            - backoff_factor: Base seconds of the exponential backoff.
+            - backoff_jitter: Maximum random seconds added to each backoff.
+        """
+        self._transport = transport
+        self._max_retries = max_retries
+        self._backoff_factor = backoff_factor
+        self._backoff_jitter = backoff_jitter
+
+    async def handle_async_request(
+        self,
+        request: httpx.Request
+    ) -> httpx.Response:
+        for attempt in range(self._max_retries + 1):
+            last_attempt = attempt == self._max_retries
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if last_attempt:
+                    raise
+                await asyncio.sleep(self._get_backoff(attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                return response
+
+            delay = _get_retry_after(response)
+            await response.aclose()
+            await asyncio.sleep(
+                delay if delay is not None else self._get_backoff(attempt))
+
+        raise AssertionError('Retries exhausted without a response.')
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+    def _get_backoff(self, attempt: int) -> float:
+        backoff = self._backoff_factor * (2 ** attempt) + \
+            random.uniform(0, self._backoff_jitter)
+        return min(backoff, MAX_BACKOFF)
+
+
+class LoopLocal(Generic[T]):
+    """Keeps a value per event loop, since async clients can only be used in
+    the loop where they were first used."""
+
+    def __init__(self, factory: Callable[[], T]):
+        """
+        Args:
+            - factory: Creates the value for a loop.
+        """
+        self._factory = factory
+        self._values: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T] \
+            = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """Get the value of the running event loop, creating it on first
+        access."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._values:
+                self._values[loop] = self._factory()
+            return self._values[loop]
+
+
+def _get_retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+
+    return min(max(delay, 0), MAX_BACKOFF)
@@ -0,0 +1,59 @@
+"""Latency statistics module."""
+
+from collections import deque
+import math
+import threading
+
+
+class LatencyStats():
+    """Keeps the latencies of the most recent requests to a backend, so its
+    percentiles reflect its current load.
+
+    It can be shared by threads.
+    """
+
+    def __init__(self, window: int = 100):
+        """
+        Args:
+            - window: Number of recent latencies kept.
+        """
+        if window < 1:
+            raise ValueError('Window must be greater than zero.')
+
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        """Record the latency of a request.
+
+        Args:
+            - latency: Seconds taken by the request.
+        """
+        with self._lock:
+            self._latencies.append(latency)
+
+    def get_count(self) -> int:
+        """Get the number of latencies kept."""
+        with self._lock:
+            return len(self._latencies)
+
+    def get_percentile(self, percentile: float) -> float | None:
+        """Get a percentile of the latencies kept, using the nearest rank.
+
+        Args:
+            - percentile: Percentile, from 0 to 100.
+
+        Returns:
+            Latency in seconds, or None if no latency was recorded.
+        """
+        if not 0 <= percentile <= 100:
+            raise ValueError('Percentile must be between 0 and 100.')
+
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        if not latencies:
+            return None
+
+        rank = max(math.ceil(percentile / 100 * len(latencies)), 1)
+        return latencies[rank - 1]
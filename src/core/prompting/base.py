@@ -1,8 +1,10 @@
 """Prompt structure module."""
 
 from abc import abstractmethod
+import asyncio
 from logging import getLogger
 import re
+from typing import Callable, Iterable, Iterator
 
 from attr import dataclass
 
@@ -18,12 +20,19 @@ class Prompt():
     PROMPT_PATTERN = r"(\:(?P<label>[a-z0-9-]+)\s)?(\/(?P<generator>[a-z]+)(\?(?P<params>[A-Za-z0-9&=\.\-_]+))?)?(\s?(?P<prompt>.*))?"
     """Regex pattern for the prompt structure."""
 
-    def __init__(self, text: str):
+    def __init__(
+        self,
+        text: str,
+        default_parameters: dict[str, str] | None = None
+    ):
         """
         Args:
             - text: Prompt text.
+            - default_parameters: Generator parameters used when not set in
+                the prompt text.
         """
         self._original_prompt = text
+        self._default_parameters = default_parameters or {}
         pattern = re.compile(self.PROMPT_PATTERN, re.DOTALL)
         self._match = pattern.match(text)
 
@@ -53,7 +62,7 @@ class Prompt():
         """Return the generator parameters, if available."""
         parameters_text = self._match.group('params')
 
-        parameters = {}
+        parameters = dict(self._default_parameters)
 
         if parameters_text is not None:
             parameters_pairs = parameters_text.split('&')
@@ -77,6 +86,96 @@ class GeneratedResponse():
     output_tokens: int = 0
     """Total number of output tokens. Can be 0 in case no model was used."""
 
+    cached: bool = False
+    """Whether the response was reused from a previous generation, so its
+    tokens were not spent again."""
+
+    context: list[int] | None = None
+    """Conversation state after the generation, which can be passed to a
+    following generation to continue it without evaluating the previous
+    prompts again. Only available for providers supporting it."""
+
+
+class GenerationStream():
+    """Streams a response while it is generated.
+
+    Iterating the stream returns the text chunks as they arrive. Once all
+    chunks are consumed, the final response, with token counts, is available
+    and the completion callbacks are called.
+    """
+
+    def __init__(self, chunks: Iterable[str | GeneratedResponse]):
+        """
+        Args:
+            - chunks: Text chunks of the response. It can end with the final
+                response, otherwise the response is built from the chunks.
+        """
+        self._chunks = iter(chunks)
+        self._parts: list[str] = []
+        self._response: GeneratedResponse | None = None
+        self._callbacks: list[Callable[[GeneratedResponse], None]] = []
+
+    @classmethod
+    def from_response(
+        cls,
+        generate: Callable[[], GeneratedResponse]
+    ) -> 'GenerationStream':
+        """Create a stream with a single chunk from a blocking generation.
+
+        Args:
+            - generate: Generates the response, called on the first iteration.
+        """
+        def chunks() -> Iterator[str | GeneratedResponse]:
+            response = generate()
+            yield response.value
+            yield response
+
+        return cls(chunks())
+
+    def __iter__(self) -> Iterator[str]:
+        while self._response is None:
+            chunk = next(self._chunks, None)
+
+            if chunk is None or isinstance(chunk, GeneratedResponse):
+                self._complete(chunk)
+                for callback in self._callbacks:
+                    callback(self._response)
+                return
+
+            self._parts.append(chunk)
+            yield chunk
+
+    def add_done_callback(self, callback: Callable[[GeneratedResponse], None]):
+        """Add a function called with the final response once the stream is
+        consumed.
+
+        Args:
+            - callback: Function called with the final response.
+        """
+        self._callbacks.append(callback)
+
+    def get_response(self) -> GeneratedResponse:
+        """Get the final response, consuming the remaining chunks."""
+        for _ in self:
+            pass
+
+        return self._response
+
+    def close(self):
+        """Stop consuming the stream, so the generation releases its
+        connection instead of running until done."""
+        close = getattr(self._chunks, 'close', None)
+        if close is not None:
+            close()
+
+    def _complete(self, response: GeneratedResponse | None):
+        if response is None:
+            response = GeneratedResponse(value=''.join(self._parts))
+        elif not response.value and self._parts:
+            response.value = ''.join(self._parts)
+
+        self._response = response
+
 
 class ResponseGenerator():
     """Generate responses based on a prompt."""
@@ -98,22 +197,104 @@ class ResponseGenerator():
         """
         raise NotImplementedError()
 
+    def generate_stream(self, prompt: Prompt) -> GenerationStream:
+        """Generates a response based on a prompt, streaming it while it is
+        generated.
+
+        By default, the response is generated at once and streamed as a
+        single chunk.
+
+        Args:
+            - prompt: Prompt to generate a response.
+
+        Returns:
+            Stream of the response.
+        """
+        return GenerationStream.from_response(lambda: self.generate(prompt))
+
+    async def generate_async(self, prompt: Prompt) -> GeneratedResponse:
+        """Generates a response based on a prompt, without blocking the event
+        loop.
+
+        By default, the response is generated in a worker thread.
+
+        Args:
+            - prompt: Prompt to generate a response.
+
+        Returns:
+            Response from the generation.
+        """
+        return await asyncio.to_thread(self.generate, prompt)
+
 
 class ModelProvider():
     """Provides model prompt execution for response generation."""
 
+    def get_cache_key(self) -> str:
+        """Get the key identifying the provider, model and generation options,
+        so cached responses are only reused by the same configuration."""
+        return type(self).__name__
+
     @abstractmethod
-    def generate(self, prompt: str) -> GeneratedResponse:
+    def generate(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
         """Generates a response based on a prompt.
 
         Args:
             - prompt: Prompt to generate a response.
+            - context: Conversation state of a previous response, continued by
+                this generation. Ignored by providers not supporting it.
 
         Returns:
             Response from the generation.
         """
         raise NotImplementedError()
 
+    def generate_stream(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GenerationStream:
+        """Generates a response based on a prompt, streaming it while it is
+        generated.
+
+        By default, the response is generated at once and streamed as a
+        single chunk.
+
+        Args:
+            - prompt: Prompt to generate a response.
+            - context: Conversation state of a previous response, continued by
+                this generation. Ignored by providers not supporting it.
+
+        Returns:
+            Stream of the response.
+        """
+        return GenerationStream.from_response(
+            lambda: self.generate(prompt, context))
+
+    async def generate_async(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        """Generates a response based on a prompt, without blocking the event
+        loop.
+
+        By default, the response is generated in a worker thread.
+
+        Args:
+            - prompt: Prompt to generate a response.
+            - context: Conversation state of a previous response, continued by
+                this generation. Ignored by providers not supporting it.
+
+        Returns:
+            Response from the generation.
+        """
+        return await asyncio.to_thread(self.generate, prompt, context)
+
 
 class GenerationError(Exception):
     def __init__(self, message: str = 'Error when performing generation.'):
@@ -0,0 +1,224 @@
+"""Persistent cache module."""
+
+from logging import getLogger
+import os
+import sqlite3
+import threading
+import time
+
+from attr import dataclass
+
+logger = getLogger()
+
+
+@dataclass
+class CacheStats():
+    """Defines the usage statistics of a cache."""
+
+    hits: int = 0
+    """Total number of lookups that found a value."""
+
+    misses: int = 0
+    """Total number of lookups that did not find a value."""
+
+    evictions: int = 0
+    """Total number of entries removed to respect the cache limits."""
+
+
+class DiskCache():
+    """Key-value store persisted in a SQLite database, shared by every
+    process and session pointing to the same file.
+
+    Entries are evicted in least recently used order when the total size of
+    the stored values exceeds the maximum size.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int,
+        ttl: int = 0
+    ):
+        """
+        Args:
+            - path: Path of the database file.
+            - max_size: Maximum total size of the stored values, in bytes.
+            - ttl: Time, in seconds, an entry is valid after being written.
+                0 means entries never expire.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._max_size = max_size
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+        self._connection = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, '
+            'value BLOB NOT NULL, '
+            'size INTEGER NOT NULL, '
+            'created REAL NOT NULL, '
+            'accessed REAL NOT NULL)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)'
+        )
+
+    def get(self, key: str) -> bytes | None:
+        """Get a value from the cache.
+
+        Args:
+            - key: Key of the value.
+
+        Returns:
+            Value found or None.
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        """Get multiple values from the cache.
+
+        Args:
+            - keys: Keys of the values.
+
+        Returns:
+            Values found, indexed by key. Keys not found are not present.
+        """
+        if not keys:
+            return {}
+
+        now = time.time()
+        unique_keys = list(dict.fromkeys(keys))
+        found: dict[str, bytes] = {}
+        expired: list[str] = []
+
+        with self._lock:
+            # SQLite limits the amount of variables per statement.
+            for start in range(0, len(unique_keys), 500):
+                keys_slice = unique_keys[start:start + 500]
+                placeholders = ','.join('?' * len(keys_slice))
+                rows = self._connection.execute(
+                    f"SELECT key, value, created FROM entries "
+                    f"WHERE key IN ({placeholders})",
+                    keys_slice
+                ).fetchall()
+
+                for key, value, created in rows:
+                    if self._ttl and now - created > self._ttl:
+                        expired.append(key)
+                    else:
+                        found[key] = value
+
+            if expired:
+                self._connection.executemany(
+                    'DELETE FROM entries WHERE key = ?',
+                    [(key,) for key in expired]
+                )
+            if found:
+                self._connection.executemany(
+                    'UPDATE entries SET accessed = ? WHERE key = ?',
+                    [(now, key) for key in found]
+                )
+
+            self._stats.hits += len(found)
+            self._stats.misses += len(unique_keys) - len(found)
+
+        return found
+
+    def set(self, key: str, value: bytes):
+        """Set a value in the cache.
+
+        Args:
+            - key: Key of the value.
+            - value: Value to be stored.
+        """
+        self.set_many({key: value})
+
+    def set_many(self, values: dict[str, bytes]):
+        """Set multiple values in the cache.
+
+        Args:
+            - values: Values to be stored, indexed by key.
+        """
+        if not values:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO entries '
+                '(key, value, size, created, accessed) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(key, value, len(value), now, now)
+                 for key, value in values.items()]
+            )
+            self._evict()
+
+    def delete(self, key: str):
+        """Remove a value from the cache.
+
+        Args:
+            - key: Key of the value.
+        """
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM entries WHERE key = ?', (key,))
+
+    def clear(self):
+        """Remove all values from the cache."""
+        with self._lock:
+            self._connection.execute('DELETE FROM entries')
+
+    def get_size(self) -> int:
+        """Get the total size of the stored values, in bytes."""
+        with self._lock:
+            return self._get_size()
+
+    def get_stats(self) -> CacheStats:
+        """Get the usage statistics of the cache since its creation."""
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions
+        )
+
+    def close(self):
+        """Close the underlying database."""
+        with self._lock:
+            self._connection.close()
+
+    def _get_size(self) -> int:
+        row = self._connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()
+        return row[0]
+
+    def _evict(self):
+        excess = self._get_size() - self._max_size
+        if excess <= 0:
+            return
+
+        keys: list[str] = []
+        freed = 0
+        rows = self._connection.execute(
+            'SELECT key, size FROM entries ORDER BY accessed')
+        for key, size in rows:
+            if freed >= excess:
+                break
+            keys.append(key)
+            freed += size
+
+        self._connection.executemany(
+            'DELETE FROM entries WHERE key = ?',
+            [(key,) for key in keys]
+        )
+        self._stats.evictions += len(keys)
+        logger.info('m=evict entries=%d size=%d', len(keys), freed)
@@ -0,0 +1,113 @@
+"""Parsed document cache module."""
+
+import json
+from logging import getLogger
+import os
+import zlib
+
+from llama_index.core import Document
+import llama_index.core
+
+from core.prompting.cache.base import CacheStats, DiskCache
+
+LOADER_VERSION = f"llama-index-{llama_index.core.__version__}"
+"""Version of the loader that parses files. Entries parsed by other versions
+are ignored, since extraction results can change between versions."""
+
+METADATA_FILE_PATH = 'file_path'
+METADATA_FILE_NAME = 'file_name'
+
+logger = getLogger()
+
+
+class DocumentCache():
+    """Caches documents parsed from files by content, so the same file is
+    only parsed once, regardless of its name or the chunking used."""
+
+    def __init__(self, cache: DiskCache):
+        """
+        Args:
+            - cache: Store where documents are persisted.
+        """
+        self._cache = cache
+
+    def get(
+        self,
+        file_path: str,
+        content_hash: str
+    ) -> list[Document] | None:
+        """Get the documents of a file.
+
+        Args:
+            - file_path: Path of the file. Its name and path replace the
+                ones of the file originally parsed.
+            - content_hash: SHA-256 of the file contents.
+
+        Returns:
+            Documents found or None. Corrupt entries are deleted and also
+            return None, so the file is parsed again.
+        """
+        key = self._get_key(file_path, content_hash)
+        value = self._cache.get(key)
+        if value is None:
+            return None
+
+        try:
+            entries = json.loads(zlib.decompress(value))
+        except (zlib.error, ValueError) as e:
+            logger.warning('m=document_cache key=%s e=%s', key, e)
+            self._cache.delete(key)
+            return None
+
+        documents = []
+        for entry in entries:
+            metadata = entry['metadata']
+            if METADATA_FILE_PATH in metadata:
+                metadata[METADATA_FILE_PATH] = file_path
+            if METADATA_FILE_NAME in metadata:
+                metadata[METADATA_FILE_NAME] = os.path.basename(file_path)
+
+            documents.append(Document(
+                text=entry['text'],
+                metadata=metadata,
+                excluded_embed_metadata_keys=entry['excluded_embed'],
+                excluded_llm_metadata_keys=entry['excluded_llm']
+            ))
+
+        return documents
+
+    def set(
+        self,
+        file_path: str,
+        content_hash: str,
+        documents: list[Document]
+    ):
+        """Store the documents of a file.
+
+        Args:
+            - file_path: Path of the file.
+            - content_hash: SHA-256 of the file contents.
+            - documents: Documents parsed from the file.
+        """
+        entries = [
+            {
+                'text': document.text,
+                'metadata': document.metadata,
+                'excluded_embed': document.excluded_embed_metadata_keys,
+                'excluded_llm': document.excluded_llm_metadata_keys
+            }
+            for document in documents
+        ]
+        self._cache.set(
+            self._get_key(file_path, content_hash),
+            zlib.compress(json.dumps(entries).encode('utf-8'))
+        )
+
+    def get_stats(self) -> CacheStats:
+        """Get the usage statistics of the cache."""
+        return self._cache.get_stats()
+
+    def _get_key(self, file_path: str, content_hash: str) -> str:
+        # Files are parsed according to their extension.
+        extension = os.path.splitext(file_path)[1].lower()
+        return f"{LOADER_VERSION}:{extension}:{content_hash}"
@@ -0,0 +1,75 @@
+"""Embedding cache module."""
+
+from array import array
+import hashlib
+from typing import Sequence
+
+from core.prompting.cache.base import CacheStats, DiskCache
+
+
+class EmbeddingCache():
+    """Caches embeddings by model and content, so identical texts are only
+    embedded once across sessions."""
+
+    def __init__(self, cache: DiskCache):
+        """
+        Args:
+            - cache: Store where embeddings are persisted.
+        """
+        self._cache = cache
+
+    def get_many(
+        self,
+        model_name: str,
+        texts: list[str]
+    ) -> list[Sequence[float] | None]:
+        """Get the cached embeddings of texts.
+
+        Args:
+            - model_name: Name of the embedding model.
+            - texts: Texts to look for.
+
+        Returns:
+            Embeddings in the same order of the texts, with None for texts
+            not found in the cache.
+        """
+        keys = [self._get_key(model_name, text) for text in texts]
+        found = self._cache.get_many(keys)
+
+        embeddings: list[Sequence[float] | None] = []
+        for key in keys:
+            value = found.get(key)
+            if value is None:
+                embeddings.append(None)
+            else:
+                embedding = array('f')
+                embedding.frombytes(value)
+                embeddings.append(embedding.tolist())
+
+        return embeddings
+
+    def set_many(
+        self,
+        model_name: str,
+        texts: list[str],
+        embeddings: list[Sequence[float]]
+    ):
+        """Store the embeddings of texts.
+
+        Args:
+            - model_name: Name of the embedding model.
+            - texts: Texts that were embedded.
+            - embeddings: Embeddings in the same order of the texts.
+        """
+        self._cache.set_many({
+            self._get_key(model_name, text): array('f', embedding).tobytes()
+            for text, embedding in zip(texts, embeddings)
+        })
+
+    def get_stats(self) -> CacheStats:
+        """Get the usage statistics of the cache."""
+        return self._cache.get_stats()
+
+    def _get_key(self, model_name: str, text: str) -> str:
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{model_name}:{digest}"
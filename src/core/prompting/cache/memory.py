@@ -0,0 +1,74 @@
+"""In-memory cache module."""
+
+from collections import OrderedDict
+import threading
+from typing import Any, Hashable
+
+from core.prompting.cache.base import CacheStats
+
+
+class LruCache():
+    """Thread-safe in-memory cache, evicting the least recently used entries
+    when the maximum number of entries is reached."""
+
+    def __init__(self, max_entries: int):
+        """
+        Args:
+            - max_entries: Maximum number of entries kept in the cache.
+        """
+        if max_entries < 1:
+            raise ValueError('Max entries must be greater than zero.')
+
+        self._max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Get a value from the cache.
+
+        Args:
+            - key: Key of the value.
+
+        Returns:
+            Value found or None.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return self._entries[key]
+
+    def set(self, key: Hashable, value: Any):
+        """Set a value in the cache.
+
+        Args:
+            - key: Key of the value.
+            - value: Value to be stored.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self):
+        """Remove all values from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> CacheStats:
+        """Get the usage statistics of the cache since its creation."""
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions
+        )
@@ -2,7 +2,12 @@
 
 from logging import getLogger
 
-from core.prompting.base import GeneratedResponse, Prompt, ResponseGenerator
+from core.prompting.base import (
+    GeneratedResponse,
+    GenerationStream,
+    Prompt,
+    ResponseGenerator
+)
 from core.prompting.history import (
     PromptHistory,
     PromptHistoryEntry,
@@ -34,37 +39,106 @@ class PromptExecutor():
 
         self._generators = generators_per_type
 
-    def execute(self, prompt: str) -> GeneratedResponse:
+    def execute(
+        self,
+        prompt: str,
+        parameters: dict[str, str] | None = None
+    ) -> GeneratedResponse:
         """Executes a prompt.
 
         Args:
             - Prompt to be executed.
+            - parameters: Generator parameters used when not set in the
+                prompt.
 
         Returns:
             Generated response from the prompt execution.
         """
-        replaced_prompt = self._replacer.replace(prompt)
-        prompt_structure = Prompt(replaced_prompt)
-        generator_type = prompt_structure.get_generator_type()
+        prompt_structure = self._get_prompt(prompt, parameters)
+        generated_response = self._get_generator(prompt_structure).generate(
+            prompt_structure)
+
+        self._complete(prompt_structure, generated_response)
+
+        return generated_response
+
+    async def execute_async(
+        self,
+        prompt: str,
+        parameters: dict[str, str] | None = None
+    ) -> GeneratedResponse:
+        """Executes a prompt without blocking the event loop, so many prompts
+        can be executed concurrently.
+
+        Responses are added to the history as they complete, and replacements
+        use the history from when the execution starts.
 
-        if generator_type in self._generators:
-            generated_response = self._generators[generator_type].generate(
-                prompt_structure)
+        Args:
+            - Prompt to be executed.
+            - parameters: Generator parameters used when not set in the
+                prompt.
 
-            self._append_history(prompt_structure, generated_response)
+        Returns:
+            Generated response from the prompt execution.
+        """
+        prompt_structure = self._get_prompt(prompt, parameters)
+        generated_response = await self._get_generator(
+            prompt_structure).generate_async(prompt_structure)
+
+        self._complete(prompt_structure, generated_response)
 
-            logger.debug(
-                'm=generate type=%s params=%s prompt=%s response=%s',
-                generator_type,
-                prompt_structure.get_generator_parameters(),
-                prompt,
-                generated_response)
+        return generated_response
 
-            return generated_response
-        else:
+    def execute_stream(
+        self,
+        prompt: str,
+        parameters: dict[str, str] | None = None
+    ) -> GenerationStream:
+        """Executes a prompt, streaming the response while it is generated.
+
+        The response is added to the history once the stream is consumed.
+
+        Args:
+            - Prompt to be executed.
+            - parameters: Generator parameters used when not set in the
+                prompt.
+
+        Returns:
+            Stream of the generated response.
+        """
+        prompt_structure = self._get_prompt(prompt, parameters)
+        stream = self._get_generator(prompt_structure).generate_stream(
+            prompt_structure)
+        stream.add_done_callback(
+            lambda response: self._complete(prompt_structure, response))
+
+        return stream
+
+    def _get_prompt(
+        self,
+        prompt: str,
+        parameters: dict[str, str] | None
+    ) -> Prompt:
+        return Prompt(self._replacer.replace(prompt), parameters)
+
+    def _get_generator(self, prompt: Prompt) -> ResponseGenerator:
+        generator_type = prompt.get_generator_type()
+        if generator_type not in self._generators:
             raise ValueError(
                 f"Generator not available for type name {generator_type}.")
 
+        return self._generators[generator_type]
+
+    def _complete(self, prompt: Prompt, response: GeneratedResponse):
+        self._append_history(prompt, response)
+
+        logger.debug(
+            'm=generate type=%s params=%s prompt=%s response=%s',
+            prompt.get_generator_type(),
+            prompt.get_generator_parameters(),
+            prompt.get_original_prompt(),
+            response)
+
     def _append_history(self, prompt: Prompt, response: GeneratedResponse):
         self._history.append(PromptHistoryEntry(
             label=prompt.get_label(),
@@ -5,6 +5,9 @@ from core.prompting.indexer import ContextIndexer
 
 PARAM_TOP_K = 'top-k'
 PARAM_FILE_NAME = 'file'
+PARAM_MODE = 'mode'
+PARAM_MMR = 'mmr'
+PARAM_MAX_TOKENS = 'max-tokens'
 DEFULT_TOP_K: int = 10
 
 
@@ -13,13 +16,17 @@ class ContextResponseGenerator(ResponseGenerator):
 
     def __init__(
         self,
-            indexer: ContextIndexer
+            indexer: ContextIndexer,
+            max_tokens: int = 0
     ):
         """
         Args:
             - indexer: Index manager
+            - max_tokens: Default maximum estimated tokens of the context. 0
+                means no limit.
         """
         self._indexer = indexer
+        self._max_tokens = max_tokens
 
     def get_type(self) -> str:
         return 'context'
@@ -29,11 +36,18 @@ class ContextResponseGenerator(ResponseGenerator):
         param_top_k = int(params[PARAM_TOP_K]
                           ) if PARAM_TOP_K in params else DEFULT_TOP_K
         param_file_name = params[PARAM_FILE_NAME] if PARAM_FILE_NAME in params else ''
+        param_mode = params[PARAM_MODE] if PARAM_MODE in params else ContextIndexer.QUERY_MODE_VECTOR
+        param_mmr = float(params[PARAM_MMR]) if PARAM_MMR in params else None
+        param_max_tokens = int(params[PARAM_MAX_TOKENS]
+                               ) if PARAM_MAX_TOKENS in params else self._max_tokens
 
         response = self._indexer.query(
             prompt.get_prompt(),
             param_top_k,
-            param_file_name)
+            param_file_name,
+            param_mode,
+            param_mmr,
+            param_max_tokens)
 
         return GeneratedResponse(
             value=response
@@ -10,6 +10,20 @@ PARAM_URL = 'url'
 class EndpointResponseGenerator(ResponseGenerator):
     """Generate responses from endpoints."""
 
+    def __init__(
+        self,
+            session: requests.Session | None = None,
+            timeout: float = 60
+    ):
+        """
+        Args:
+            - session: HTTP session used for requests, reusing connections.
+                If not provided, a session without retries is created.
+            - timeout: Request timeout, in seconds.
+        """
+        self._session = session if session is not None else requests.Session()
+        self._timeout = timeout
+
     def get_type(self) -> str:
         return 'endpoint'
 
@@ -19,7 +33,7 @@ class EndpointResponseGenerator(ResponseGenerator):
         if url is None:
             raise ValueError('No URL was provided.')
 
-        response = requests.get(url, timeout=60)
+        response = self._session.get(url, timeout=self._timeout)
         contents = response.text
 
         return GeneratedResponse(
@@ -1,12 +1,23 @@
 """Model generation module."""
 
+from logging import getLogger
+
 from core.prompting.base import (
     DEFULT_GENERATOR_TYPE,
     GeneratedResponse,
+    GenerationStream,
     ModelProvider,
     Prompt,
     ResponseGenerator
 )
+from core.prompting.history import PromptHistory
+
+logger = getLogger()
+
+PARAM_CACHE = 'cache'
+PARAM_CONTINUE = 'continue'
+CACHE_ENABLED_VALUES = ['1', 'true']
+CONTINUE_LAST = 'last'
 
 
 class ModelResponseGenerator(ResponseGenerator):
@@ -14,16 +25,54 @@ class ModelResponseGenerator(ResponseGenerator):
 
     def __init__(
         self,
-            provider: ModelProvider
+            provider: ModelProvider,
+            cached_provider: ModelProvider | None = None,
+            history: PromptHistory | None = None
     ):
         """
         Args:
             - provider: Provider for generating responses from a model.
+            - cached_provider: Provider reusing previous responses, used when
+                the prompt has the `cache` parameter enabled.
+            - history: Prompt history, used to continue the conversation of a
+                previous response when the prompt has the `continue`
+                parameter.
         """
         self._provider = provider
+        self._cached_provider = cached_provider
+        self._history = history
 
     def get_type(self) -> str:
         return DEFULT_GENERATOR_TYPE
 
     def generate(self, prompt: Prompt) -> GeneratedResponse:
-        return self._provider.generate(prompt.get_prompt())
+        return self._get_provider(prompt).generate(
+            prompt.get_prompt(), self._get_context(prompt))
+
+    def generate_stream(self, prompt: Prompt) -> GenerationStream:
+        return self._get_provider(prompt).generate_stream(
+            prompt.get_prompt(), self._get_context(prompt))
+
+    async def generate_async(self, prompt: Prompt) -> GeneratedResponse:
+        return await self._get_provider(prompt).generate_async(
+            prompt.get_prompt(), self._get_context(prompt))
+
+    def _get_context(self, prompt: Prompt) -> list[int] | None:
+        target = prompt.get_generator_parameters().get(PARAM_CONTINUE, '')
+        if not target or self._history is None:
+            return None
+
+        context = self._history.get_context(
+            '' if target == CONTINUE_LAST else target)
+        if context is None:
+            logger.warning('m=get_context target=%s reason=not_found', target)
+
+        return context
+
+    def _get_provider(self, prompt: Prompt) -> ModelProvider:
+        cache = prompt.get_generator_parameters().get(PARAM_CACHE, '')
+        if self._cached_provider is not None and \
+                cache.lower() in CACHE_ENABLED_VALUES:
+            return self._cached_provider
+
+        return self._provider
@@ -1,35 +1,76 @@
 """RAG generation module."""
 
-from core.prompting.base import GeneratedResponse, Prompt, ResponseGenerator
-from core.prompting.generator.context import ContextResponseGenerator
-from core.prompting.generator.model import ModelResponseGenerator
+import asyncio
+
+from core.prompting.base import (
+    GeneratedResponse,
+    GenerationStream,
+    Prompt,
+    ResponseGenerator
+)
+from core.prompting.generator.context import (
+    PARAM_MAX_TOKENS,
+    ContextResponseGenerator
+)
+from core.prompting.generator.model import (
+    PARAM_CACHE,
+    PARAM_CONTINUE,
+    ModelResponseGenerator
+)
+
+MODEL_PARAMS = [PARAM_CACHE, PARAM_CONTINUE]
 
 
 class RagResponseGenerator(ResponseGenerator):
     """Generate responses querying the context and passing it to a model.
 
     This is a shortcut generator which operates other generators, so no 
-    history for /rag is created.
+    history for /rag is created. Parameters are forwarded to the context
+    generator, and the `cache` and `continue` parameters also to the model
+    generator.
     """
 
     def __init__(
         self,
             model_generator: ModelResponseGenerator,
-            context_generator: ContextResponseGenerator
+            context_generator: ContextResponseGenerator,
+            max_tokens: int = 0
     ):
         """
         Args:
             - ollama_generator: Ollama generator.
             - context_generator: Context generator.
+            - max_tokens: Default maximum estimated tokens of the context,
+                when the `max-tokens` parameter is not set. 0 means no limit.
         """
         self._model_generator = model_generator
         self._context_generator = context_generator
+        self._max_tokens = max_tokens
 
     def get_type(self) -> str:
         return 'rag'
 
     def generate(self, prompt: Prompt) -> GeneratedResponse:
-        context_query = '/context ' + prompt.get_prompt()
+        return self._model_generator.generate(self._get_rag_prompt(prompt))
+
+    def generate_stream(self, prompt: Prompt) -> GenerationStream:
+        return self._model_generator.generate_stream(
+            self._get_rag_prompt(prompt))
+
+    async def generate_async(self, prompt: Prompt) -> GeneratedResponse:
+        rag_prompt = await asyncio.to_thread(self._get_rag_prompt, prompt)
+        return await self._model_generator.generate_async(rag_prompt)
+
+    def _get_rag_prompt(self, prompt: Prompt) -> Prompt:
+        params = prompt.get_generator_parameters()
+        context_values = dict(params)
+        if self._max_tokens > 0:
+            context_values.setdefault(
+                PARAM_MAX_TOKENS, str(self._max_tokens))
+        context_params = '&'.join(
+            f"{key}={value}" for key, value in context_values.items())
+        context_query = (f"/context?{context_params} " if context_params
+                         else '/context ') + prompt.get_prompt()
         context_response = self._context_generator.generate(
             Prompt(context_query)
         )
@@ -44,6 +85,6 @@ Query: {prompt.get_prompt()}
 Answer:
 """
 
-        return self._model_generator.generate(
-            Prompt(rag_prompt)
-        )
+        model_params = {key: value for key, value in params.items()
+                        if key in MODEL_PARAMS}
+        return Prompt(rag_prompt, model_params)
@@ -50,13 +50,40 @@ class PromptHistory(list[PromptHistoryEntry]):
         """
         return [entry.response.value for entry in self if entry.label == label]
 
+    def get_context(self, label: str = '') -> list[int] | None:
+        """Get the conversation state of the last response, so a new
+        generation can continue it.
+
+        Args:
+            - label: Label of the response. If empty, the last response is
+                used.
+
+        Returns:
+            Conversation state, or None if the response has none (e.g. it was
+            not generated by Ollama), so older conversations are not
+            continued by mistake.
+        """
+        for entry in reversed(self):
+            if not label or entry.label == label:
+                return entry.response.context
+
+        return None
+
     def get_total_input_tokens(self) -> int:
-        """Get the total number of input tokens of entries in the history."""
-        return sum(entry.response.input_tokens for entry in self)
+        """Get the total number of input tokens of entries in the history,
+        excluding cached responses."""
+        return sum(entry.response.input_tokens for entry in self
+                   if not entry.response.cached)
 
     def get_total_output_tokens(self) -> int:
-        """Get the total number of output tokens of entries in the history."""
-        return sum(entry.response.output_tokens for entry in self)
+        """Get the total number of output tokens of entries in the history,
+        excluding cached responses."""
+        return sum(entry.response.output_tokens for entry in self
+                   if not entry.response.cached)
+
+    def get_total_cached(self) -> int:
+        """Get the number of cached responses in the history."""
+        return sum(1 for entry in self if entry.response.cached)
 
 
 class PromptHistoryReplacer():
@@ -1,16 +1,41 @@
 """Manages indexing of files in a vector database."""
 
 from logging import getLogger
-from typing import Sequence
+import os
+import threading
+from timeit import default_timer as timer
+from typing import Callable, Iterator, Sequence
 
-from chromadb.api.models.Collection import Collection
-from llama_index.core import SimpleDirectoryReader
 from llama_index.core import Document
 from llama_index.core.node_parser import SentenceSplitter
-from llama_index.core.schema import BaseNode
 from ollama import Client
 import chromadb
 
+from core.prompting.cache.embedding import EmbeddingCache
+from core.prompting.cache.memory import LruCache
+from core.prompting.indexing.corpus import Corpus
+from core.prompting.indexing.fingerprint import (
+    FileFingerprint,
+    FingerprintRegistry,
+    get_file_fingerprint
+)
+from core.prompting.indexing.parser import DocumentParser
+from core.prompting.indexing.pipeline import (
+    IndexingProgress,
+    Pipeline,
+    PipelineStage
+)
+from core.prompting.provider.pool import OllamaClientPool
+from core.prompting.retrieval.lexical import (
+    LexicalIndex,
+    reciprocal_rank_fusion
+)
+from core.prompting.retrieval.mmr import maximal_marginal_relevance
+from core.prompting.retrieval.packer import ContextChunk, pack_context
+from core.prompting.retrieval.similarity import cosine_similarities
+from core.prompting.store.base import VectorMatch, VectorStore
+from core.prompting.store.chroma import ChromaVectorStore
+
 logger = getLogger()
 
 
@@ -20,120 +45,633 @@ class ContextIndexer():
     METADATA_FILE_NAME = 'file-name'
     METADATA_CHUNK_INDEX = 'chunk-index'
 
+    QUERY_MODE_VECTOR = 'vector'
+    QUERY_MODE_HYBRID = 'hybrid'
+    QUERY_MODES = [QUERY_MODE_VECTOR, QUERY_MODE_HYBRID]
+
+    HYBRID_LEXICAL_FACTOR = 3
+    """Number of lexical candidates per chunk returned by hybrid queries."""
+
+    MMR_FETCH_FACTOR = 4
+    """Number of candidates per chunk fetched before MMR diversification."""
+
     def __init__(
         self,
-        ollama: Client,
+        ollama: Client | OllamaClientPool,
         db_path: str,
         collection_name: str,
-        embedding_model_name: str
+        embedding_model_name: str,
+        max_in_flight: int = 1,
+        embedding_cache: EmbeddingCache | None = None,
+        query_embedding_cache: LruCache | None = None,
+        query_result_cache: LruCache | None = None,
+        store: VectorStore | None = None,
+        parser: DocumentParser | None = None,
+        corpus: Corpus | None = None,
+        keep_alive: str | None = None
     ):
         """
         Args:
-            - ollama: Client to access Ollama.
+            - ollama: Client to access Ollama, or a pool of clients.
             - db_path: Path to the data of the vector database.
             - collection_name: Name of the collection where documents will be
                 saved.
             - embedding_model_name: Name of embedding model.
+            - max_in_flight: Maximum amount of embedding requests performed
+                concurrently during indexing.
+            - embedding_cache: Cache checked before requesting embeddings.
+                If not provided, all embeddings are requested.
+            - query_embedding_cache: In-memory cache for embeddings of query
+                prompts.
+            - query_result_cache: In-memory cache for query results. Results
+                are invalidated whenever the collection changes.
+            - store: Vector store of the collection. If not provided, a Chroma
+                collection is created in db_path.
+            - parser: Parser of the indexed files. If not provided, files are
+                parsed one at a time in the indexing thread.
+            - corpus: Corpus shared by collections. If provided, chunks are
+                stored in the corpus once per unique document, and the
+                collection only keeps references to its documents.
+            - keep_alive: How long Ollama keeps the embedding model loaded
+                after each request. If not provided, the server default is
+                used.
         """
+        if max_in_flight < 1:
+            raise ValueError('Max in flight must be greater than zero.')
+
         self._ollama = ollama
-        self._db = chromadb.PersistentClient(path=db_path)
+        self._corpus = corpus
+        if corpus is not None:
+            store = corpus.get_store()
+        self._store = store if store is not None else ChromaVectorStore(
+            chromadb.PersistentClient(path=db_path),
+            collection_name)
         self._collection_name = collection_name
         self._embedding_model_name = embedding_model_name
+        self._keep_alive = keep_alive
+        self._max_in_flight = max_in_flight
+        self._embedding_cache = embedding_cache
+        self._query_embedding_cache = query_embedding_cache
+        self._query_result_cache = query_result_cache
+        self._parser = parser if parser is not None else DocumentParser()
+        self._progress_lock = threading.Lock()
+        self._fingerprints = FingerprintRegistry(
+            self._get_fingerprints_path(db_path, collection_name))
+        self._lexical_index = corpus.get_lexical_index() \
+            if corpus is not None else LexicalIndex(
+                self._get_lexical_index_path(db_path, collection_name))
+        self._source_key = Corpus.METADATA_DOCUMENT_ID \
+            if corpus is not None else self.METADATA_FILE_NAME
+
+    @classmethod
+    def delete_collection(
+        cls,
+        db_path: str,
+        collection_name: str,
+        store: VectorStore,
+        corpus: Corpus | None = None
+    ):
+        """Delete a collection and the index data kept besides it.
+
+        Args:
+            - db_path: Path to the data of the vector database.
+            - collection_name: Name of the collection.
+            - store: Vector store of the collection.
+            - corpus: Corpus whose documents may be referenced by the
+                collection.
+        """
+        store.drop()
+        if corpus is not None:
+            corpus.remove_references(collection_name)
+        for path in cls.get_data_paths(db_path, collection_name):
+            if os.path.exists(path):
+                os.remove(path)
+
+        logger.info('m=delete_collection collection=%s', collection_name)
+
+    @classmethod
+    def get_data_paths(cls, db_path: str, collection_name: str) -> list[str]:
+        """Get the paths of the index data kept besides a collection.
+
+        Args:
+            - db_path: Path to the data of the vector database.
+            - collection_name: Name of the collection.
+        """
+        return [cls._get_fingerprints_path(db_path, collection_name),
+                cls._get_lexical_index_path(db_path, collection_name)]
 
     def index_files(
         self,
         files_path: list[str],
         chunk_size: int = 1024,
-        chunk_overlap: int = 20
+        chunk_overlap: int = 20,
+        batch_size: int = 64,
+        on_progress: Callable[[IndexingProgress], None] | None = None
     ):
         """Index files in the context.
 
+        Files are streamed through loading, splitting, embedding and saving
+        stages, so memory usage does not grow with the amount of files.
+        Files already indexed with the same contents and chunking parameters
+        are skipped. Files that changed since the last indexing have their
+        previous chunks replaced once the new ones are stored, so they keep
+        their previous fingerprint if the indexing fails. With a corpus, files
+        whose documents are already in the corpus are only referenced.
+
         Args:
             - files_path: Path of each file to be indexed.
             - chunk_size: Size when splitting documents. The smaller,
                 the more precise. More context at 
                 https://www.llamaindex.ai/blog/evaluating-the-ideal-chunk-size-for-a-rag-system-using-llamaindex-6207e5d3fec5
             - chunk_overlap: Amount of overlap when splitting documents into chunk_size.
+            - batch_size: Amount of chunks sent in a single embedding request
+                and saved in a single write to the collection.
+            - on_progress: Called periodically in the caller thread with the
+                current indexing progress.
         """
+        if batch_size < 1:
+            raise ValueError('Batch size must be greater than zero.')
+
+        changed_files: dict[str, FileFingerprint] = {}
+        touched_files: dict[str, FileFingerprint] = {}
+        for file_path in files_path:
+            file_name = os.path.basename(file_path)
+            previous = self._fingerprints.get(file_name)
+            fingerprint = get_file_fingerprint(
+                file_path, chunk_size, chunk_overlap, previous)
+
+            if not fingerprint.is_indexed_as(previous):
+                changed_files[file_path] = fingerprint
+            elif fingerprint != previous:
+                # Rewritten with the same contents, so only the size and
+                # modification time are updated, avoiding hashing it again.
+                touched_files[file_name] = fingerprint
+
+        logger.info('m=index files=%d changed=%d touched=%d',
+                    len(files_path), len(changed_files), len(touched_files))
+
+        for file_name, fingerprint in touched_files.items():
+            self._fingerprints.set(file_name, fingerprint)
+
+        if len(changed_files) == 0:
+            if touched_files:
+                self._fingerprints.save()
+            return
+
+        sources = {
+            os.path.basename(file_path): self._get_source(
+                os.path.basename(file_path), fingerprint)
+            for file_path, fingerprint in changed_files.items()
+        }
+        if self._corpus is not None:
+            # Documents are referenced before indexing, so they are not
+            # deleted by other collections while being indexed.
+            self._corpus.add_references(self._collection_name, sources)
 
-        documents = self._load_documents(files_path)
+        chunk_counts: dict[str, int] = {}
+        try:
+            self._index_changed_files(
+                changed_files, sources, chunk_counts, chunk_size,
+                chunk_overlap, batch_size, on_progress)
+        except BaseException:
+            if self._corpus is not None:
+                self._corpus.remove_references(self._collection_name, sources)
+            raise
 
-        if len(documents) == 0:
+        self._remove_previous_chunks(list(sources), chunk_counts)
+        for file_path, fingerprint in changed_files.items():
+            self._fingerprints.set(os.path.basename(file_path), fingerprint)
+        self._fingerprints.save()
+
+        if self._embedding_cache is not None:
+            stats = self._embedding_cache.get_stats()
+            logger.info('m=embedding_cache hits=%d misses=%d evictions=%d',
+                        stats.hits, stats.misses, stats.evictions)
+
+    def _index_changed_files(
+        self,
+        changed_files: dict[str, FileFingerprint],
+        sources: dict[str, str],
+        chunk_counts: dict[str, int],
+        chunk_size: int,
+        chunk_overlap: int,
+        batch_size: int,
+        on_progress: Callable[[IndexingProgress], None] | None
+    ):
+        if self._corpus is not None:
+            changed_files = {
+                file_path: fingerprint
+                for file_path, fingerprint in changed_files.items()
+                if not self._corpus.has_document(
+                    sources[os.path.basename(file_path)])
+            }
+            logger.info('m=index corpus_new=%d', len(changed_files))
+            if len(changed_files) == 0:
+                return
+
+        progress = IndexingProgress(files=len(changed_files))
+        pipeline = Pipeline(
+            [
+                PipelineStage(
+                    'load',
+                    lambda parsed_file: self._load_file(parsed_file, progress)
+                ),
+                PipelineStage(
+                    'split',
+                    lambda documents: self._split_file(
+                        documents,
+                        sources,
+                        chunk_counts,
+                        chunk_size,
+                        chunk_overlap,
+                        batch_size,
+                        progress)
+                ),
+                PipelineStage(
+                    'embed',
+                    lambda batch: self._embed_batch(batch, progress),
+                    workers=self._max_in_flight
+                ),
+                PipelineStage(
+                    'save',
+                    lambda batch: self._save_batch(batch, progress)
+                )
+            ],
+            queue_size=self._max_in_flight * 2
+        )
+        pipeline.run(
+            self._parser.parse(
+                changed_files.keys(),
+                {file_path: fingerprint.content_hash
+                 for file_path, fingerprint in changed_files.items()}),
+            (lambda: on_progress(progress)) if on_progress else None
+        )
+
+        logger.info('m=index progress=%s', progress)
+
+        if progress.documents_loaded == 0:
             raise AssertionError('No documents were loaded.')
 
-        chunks = self._split_documents(documents, chunk_size, chunk_overlap)
-        self._save_documents(chunks)
+        self._store.persist()
+        self._lexical_index.save()
+        if self._corpus is not None:
+            self._corpus.set_indexed(
+                [sources[os.path.basename(file_path)]
+                 for file_path in changed_files])
+
+    def get_file_names(self) -> list[str]:
+        """Get the names of the indexed files."""
+        return self._fingerprints.get_file_names()
 
     def query(
             self,
             prompt: str,
             top_k: int = 4,
-            file_name: str = '') -> str:
+            file_name: str = '',
+            mode: str = QUERY_MODE_VECTOR,
+            mmr: float | None = None,
+            max_tokens: int = 0) -> str:
         """Query the context.
 
         Args:
             - prompt: Prompt to query the context.
             - top_k: How many chunks to return.
             - file_name: Name of the file in the context for results filtering.
+            - mode: How chunks are searched. `vector` uses only embeddings
+                similarity. `hybrid` fuses the rankings of a lexical (BM25)
+                search and a vector search, matching exact terms like
+                identifiers and codes.
+            - mmr: If provided, more candidates are fetched and diversified
+                with maximal marginal relevance, using this value as the
+                trade-off between relevance (1) and diversity (0).
+            - max_tokens: Maximum estimated tokens of the context. Chunks are
+                added by relevance while they fit, merging adjacent chunks of
+                the same file. 0 means no limit.
 
         Returns:
             Context found or empty string.
         """
 
-        logger.info('m=query top_k=%d file=%s prompt=%s',
-                    top_k, file_name, prompt)
+        logger.info('m=query top_k=%d file=%s mode=%s mmr=%s max_tokens=%d '
+                    'prompt=%s', top_k, file_name, mode, mmr, max_tokens,
+                    prompt)
 
-        where = {}
-        if file_name:
-            where[self.METADATA_FILE_NAME] = file_name
-
-        embeddings = self._get_embeddings(prompt)
-        collection = self._get_or_create_collection()
-        results = collection.query(
-            query_embeddings=[embeddings],
-            n_results=top_k,
-            where=where
+        if mode not in self.QUERY_MODES:
+            raise ValueError(f"Invalid query mode {mode}.")
+        if mmr is not None and not 0 <= mmr <= 1:
+            raise ValueError('MMR must be between 0 and 1.')
+
+        result_key = (
+            self._collection_name,
+            self._fingerprints.get_version(),
+            prompt,
+            top_k,
+            file_name,
+            mode,
+            mmr,
+            max_tokens
+        )
+        if self._query_result_cache is not None:
+            context = self._query_result_cache.get(result_key)
+            if context is not None:
+                self._log_query_cache_stats()
+                return context
+
+        sources = self._get_sources(file_name)
+        if sources is not None and len(sources) == 0:
+            return ''
+
+        embeddings = self._get_query_embeddings(prompt)
+        candidates_k = top_k * self.MMR_FETCH_FACTOR if mmr is not None \
+            else top_k
+
+        if mode == self.QUERY_MODE_HYBRID:
+            matches = self._query_hybrid(
+                prompt, embeddings, candidates_k, sources)
+        else:
+            matches = self._query_vector(
+                embeddings, candidates_k, sources, mmr is not None)
+
+        if mmr is not None:
+            matches = self._diversify(embeddings, matches, top_k, mmr)
+
+        file_names = self._get_file_names()
+        context = pack_context(
+            (self._get_context_chunk(match, file_names) for match in matches),
+            max_tokens
         )
 
-        context = ''
-        for idx_doc, document in enumerate(results['documents']):
-            for idx_chunk, chunk in enumerate(document):
-                chunk_id = results['ids'][idx_doc][idx_chunk]
-                context += f"<< Context {chunk_id} >>\n{chunk}\n\n"
+        if self._query_result_cache is not None:
+            self._query_result_cache.set(result_key, context)
+        self._log_query_cache_stats()
 
         return context
 
-    def _get_or_create_collection(self) -> Collection:
-        return self._db.create_collection(
-            name=self._collection_name,
-            get_or_create=True,
-            metadata={'hnsw:space': 'cosine'}
+    def _query_vector(
+        self,
+        embeddings: Sequence[float],
+        top_k: int,
+        sources: list[str] | None,
+        include_embeddings: bool = False
+    ) -> list[VectorMatch]:
+        where = {}
+        if sources is not None:
+            where[self._source_key] = sources
+
+        return self._store.query(embeddings, top_k, where, include_embeddings)
+
+    def _query_hybrid(
+        self,
+        prompt: str,
+        embeddings: Sequence[float],
+        top_k: int,
+        sources: list[str] | None
+    ) -> list[VectorMatch]:
+        start = timer()
+        lexical_results = self._lexical_index.search(
+            prompt, top_k * self.HYBRID_LEXICAL_FACTOR, file_names=sources)
+        logger.info('m=query_lexical results=%d elapsed=%f',
+                    len(lexical_results), timer() - start)
+
+        matches: dict[str, VectorMatch] = {}
+        similarities: dict[str, float] = {}
+        for match in self._query_vector(embeddings, top_k, sources):
+            matches[match.id] = match
+            similarities[match.id] = 1 - match.distance
+
+        # Lexical candidates outside the vector results are ranked by their
+        # stored embeddings, instead of widening the vector query.
+        candidate_ids = [chunk_id for chunk_id, _ in lexical_results
+                         if chunk_id not in matches]
+        if candidate_ids:
+            candidates = self._store.get(
+                candidate_ids, include_embeddings=True)
+            for match, similarity in zip(candidates, cosine_similarities(
+                    embeddings, [match.embedding for match in candidates])):
+                matches[match.id] = match
+                similarities[match.id] = similarity
+
+        vector_ranking = sorted(
+            similarities, key=lambda chunk_id: similarities[chunk_id],
+            reverse=True)
+        lexical_ranking = [chunk_id for chunk_id, _ in lexical_results]
+        fused_ranking = reciprocal_rank_fusion(
+            [vector_ranking, lexical_ranking])
+
+        return [matches[chunk_id] for chunk_id, _ in fused_ranking[:top_k]]
+
+    def _diversify(
+        self,
+        embeddings: Sequence[float],
+        matches: list[VectorMatch],
+        top_k: int,
+        mmr: float
+    ) -> list[VectorMatch]:
+        missing_ids = [match.id for match in matches
+                       if match.embedding is None]
+        if missing_ids:
+            found = {match.id: match for match in self._store.get(
+                missing_ids, include_embeddings=True)}
+            matches = [found.get(match.id, match) for match in matches]
+            matches = [match for match in matches
+                       if match.embedding is not None]
+
+        selected = maximal_marginal_relevance(
+            embeddings,
+            [match.embedding for match in matches],
+            top_k,
+            mmr)
+        logger.info('m=mmr candidates=%d selected=%d',
+                    len(matches), len(selected))
+
+        return [matches[index] for index in selected]
+
+    def _remove_previous_chunks(
+        self,
+        file_names: list[str],
+        chunk_counts: dict[str, int]
+    ):
+        indexed_file_names = [file_name for file_name in file_names
+                              if self._fingerprints.get(file_name) is not None]
+        if not indexed_file_names:
+            return
+
+        if self._corpus is not None:
+            # New documents have other ids, so the previous ones are only
+            # unreferenced.
+            self._corpus.remove_references(
+                self._collection_name,
+                {file_name: self._get_source(
+                    file_name, self._fingerprints.get(file_name))
+                 for file_name in indexed_file_names})
+            return
+
+        # Chunk ids only depend on the file name and chunk index, so the new
+        # chunks replaced the previous ones, except those past the new count.
+        for file_name in indexed_file_names:
+            chunk_count = chunk_counts.get(file_name, 0)
+            stale_indexes = list(range(
+                chunk_count, len(self._lexical_index.get_ids([file_name]))))
+            if not stale_indexes:
+                continue
+
+            self._store.delete({
+                self.METADATA_FILE_NAME: [file_name],
+                self.METADATA_CHUNK_INDEX: stale_indexes
+            })
+            self._lexical_index.remove([
+                self._get_chunk_id(file_name, chunk_index)
+                for chunk_index in stale_indexes])
+            logger.info('m=delete_stale file=%s chunks=%d',
+                        file_name, len(stale_indexes))
+
+        self._store.persist()
+        self._lexical_index.save()
+
+    @staticmethod
+    def _get_chunk_id(source: str, chunk_index: int) -> str:
+        return f"{source}:{chunk_index}"
+
+    def _get_source(self, file_name: str, fingerprint: FileFingerprint) -> str:
+        """Get the value identifying the chunks of a file in the store."""
+        if self._corpus is not None:
+            return Corpus.get_document_id(fingerprint)
+        return file_name
+
+    def _get_sources(self, file_name: str) -> list[str] | None:
+        """Get the sources searched by a query, or None to search the whole
+        store."""
+        if self._corpus is None:
+            return [file_name] if file_name else None
+
+        file_names = [file_name] if file_name else \
+            self._fingerprints.get_file_names()
+        return [
+            self._get_source(name, fingerprint) for name in file_names
+            if (fingerprint := self._fingerprints.get(name)) is not None
+        ]
+
+    def _get_file_names(self) -> dict[str, str]:
+        """Get the names of the indexed files by source."""
+        if self._corpus is None:
+            return {}
+
+        return {
+            self._get_source(file_name, self._fingerprints.get(file_name)):
+            file_name
+            for file_name in self._fingerprints.get_file_names()
+        }
+
+    def _get_context_chunk(
+        self,
+        match: VectorMatch,
+        file_names: dict[str, str]
+    ) -> ContextChunk:
+        file_name = match.metadata.get(self.METADATA_FILE_NAME, '')
+        chunk_index = match.metadata.get(self.METADATA_CHUNK_INDEX)
+        chunk_id = match.id
+
+        # Corpus chunks are shown with the file name used in this collection.
+        document_id = match.metadata.get(Corpus.METADATA_DOCUMENT_ID)
+        if document_id in file_names:
+            file_name = file_names[document_id]
+            chunk_id = f"{file_name}:{chunk_index}"
+
+        return ContextChunk(chunk_id, match.document, file_name, chunk_index)
+
+    @staticmethod
+    def _get_fingerprints_path(db_path: str, collection_name: str) -> str:
+        return os.path.join(db_path, 'fingerprints', f"{collection_name}.json")
+
+    @staticmethod
+    def _get_lexical_index_path(db_path: str, collection_name: str) -> str:
+        return os.path.join(db_path, 'lexical', f"{collection_name}.json")
+
+    def _get_query_embeddings(self, prompt: str) -> Sequence[float]:
+        if self._query_embedding_cache is None:
+            return self._get_embeddings(prompt)
+
+        key = (self._embedding_model_name, prompt)
+        embeddings = self._query_embedding_cache.get(key)
+        if embeddings is None:
+            embeddings = self._get_embeddings(prompt)
+            self._query_embedding_cache.set(key, embeddings)
+
+        return embeddings
+
+    def _log_query_cache_stats(self):
+        caches = (
+            ('embedding', self._query_embedding_cache),
+            ('result', self._query_result_cache)
         )
+        for name, cache in caches:
+            if cache is not None:
+                stats = cache.get_stats()
+                logger.info(
+                    'm=query_cache cache=%s hits=%d misses=%d evictions=%d',
+                    name, stats.hits, stats.misses, stats.evictions)
 
     def _get_embeddings(self, text: str) -> Sequence[float]:
-        response = self._ollama.embeddings(
+        return self._get_embeddings_batch([text])[0]
+
+    def _get_embeddings_batch(
+        self,
+        texts: list[str]
+    ) -> list[Sequence[float]]:
+        if self._embedding_cache is None:
+            return self._request_embeddings(texts)
+
+        embeddings = self._embedding_cache.get_many(
+            self._embedding_model_name, texts)
+        missing = [index for index, embedding in enumerate(embeddings)
+                   if embedding is None]
+
+        if missing:
+            missing_texts = [texts[index] for index in missing]
+            missing_embeddings = self._request_embeddings(missing_texts)
+            self._embedding_cache.set_many(
+                self._embedding_model_name,
+                missing_texts,
+                missing_embeddings)
+
+            for index, embedding in zip(missing, missing_embeddings):
+                embeddings[index] = embedding
+
+        return embeddings
+
+    def _request_embeddings(self, texts: list[str]) -> list[Sequence[float]]:
+        response = self._ollama.embed(
             model=self._embedding_model_name,
-            prompt=text,
+            input=texts,
+            keep_alive=self._keep_alive
         )
-        return response['embedding']
+        return response['embeddings']
 
-    def _load_documents(self, files_path: list[str]) -> list[Document]:
-        reader = SimpleDirectoryReader(
-            input_files=files_path,
-            exclude_hidden=False,
-            recursive=True
-        )
-        documents = reader.load_data()
-        logger.info('m=documents size=%d', len(documents))
+    def _load_file(
+        self,
+        parsed_file: tuple[str, list[Document]],
+        progress: IndexingProgress
+    ) -> Iterator[list[Document]]:
+        file_path, documents = parsed_file
+        logger.info('m=documents file=%s size=%d', file_path, len(documents))
+
+        with self._progress_lock:
+            progress.files_loaded += 1
+            progress.documents_loaded += len(documents)
 
-        return documents
+        if documents:
+            yield documents
 
-    def _split_documents(
+    def _split_file(
         self,
         documents: list[Document],
+        sources: dict[str, str],
+        chunk_counts: dict[str, int],
         chunk_size: int,
-        chunk_overlap: int
-    ) -> list[BaseNode]:
+        chunk_overlap: int,
+        batch_size: int,
+        progress: IndexingProgress
+    ) -> Iterator[tuple[list[str], list[str], list[dict]]]:
         text_splitter = SentenceSplitter.from_defaults(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
@@ -142,35 +680,71 @@ class ContextIndexer():
         logger.info('m=split size=%d overlap=%d len=%d',
                     chunk_size, chunk_overlap, len(nodes))
 
-        return nodes
+        with self._progress_lock:
+            progress.chunks_split += len(nodes)
+            for node in nodes:
+                file_name = node.metadata['file_name']
+                chunk_counts[file_name] = chunk_counts.get(file_name, 0) + 1
 
-    def _save_documents(self, chunks: list[BaseNode]):
-        ids = []
-        embeddings = []
-        documents = []
-        metadatas = []
+        # Documents come from a single file and chunk indexes are sequential
+        # per file, so ids remain stable regardless of other files.
+        for start in range(0, len(nodes), batch_size):
+            ids = []
+            texts = []
+            metadatas = []
 
-        for index, chunk in enumerate(chunks):
-            file_name = chunk.metadata['file_name']
-            chunk_index = index
+            for chunk_index, node in enumerate(
+                    nodes[start:start + batch_size], start):
+                file_name = node.metadata['file_name']
+                source = sources.get(file_name, file_name)
+                metadata = {
+                    self.METADATA_FILE_NAME: file_name,
+                    self.METADATA_CHUNK_INDEX: chunk_index
+                }
+                if self._corpus is not None:
+                    metadata[Corpus.METADATA_DOCUMENT_ID] = source
 
-            chunk_id = f"{file_name}:{chunk_index}"
-            document = chunk.get_content()
-            embedding = self._get_embeddings(document)
-            metadata = {
-                self.METADATA_FILE_NAME: file_name,
-                self.METADATA_CHUNK_INDEX: chunk_index
-            }
+                ids.append(self._get_chunk_id(source, chunk_index))
+                texts.append(node.get_content())
+                metadatas.append(metadata)
+
+            yield ids, texts, metadatas
+
+    def _embed_batch(
+        self,
+        batch: tuple[list[str], list[str], list[dict]],
+        progress: IndexingProgress
+    ) -> Iterator[tuple[list[str], list[Sequence[float]], list[str], list[dict]]]:
+        ids, texts, metadatas = batch
+        embeddings = self._get_embeddings_batch(texts)
 
-            ids.append(chunk_id)
-            embeddings.append(embedding)
-            documents.append(document)
-            metadatas.append(metadata)
+        with self._progress_lock:
+            progress.chunks_embedded += len(ids)
 
-        collection = self._get_or_create_collection()
-        collection.add(
+        yield ids, embeddings, texts, metadatas
+
+    def _save_batch(
+        self,
+        batch: tuple[list[str], list[Sequence[float]], list[str], list[dict]],
+        progress: IndexingProgress
+    ) -> Iterator[None]:
+        ids, embeddings, texts, metadatas = batch
+        self._store.upsert(
             ids=ids,
             embeddings=embeddings,
-            documents=documents,
+            documents=texts,
             metadatas=metadatas
         )
+        self._lexical_index.add(
+            ids,
+            texts,
+            [metadata[self._source_key] for metadata in metadatas]
+        )
+
+        with self._progress_lock:
+            progress.chunks_saved += len(ids)
+
+        logger.info('m=save size=%d saved=%d',
+                    len(ids), progress.chunks_saved)
+
+        return iter(())
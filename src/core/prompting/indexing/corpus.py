@@ -0,0 +1,179 @@
+"""Shared corpus module."""
+
+import json
+from logging import getLogger
+import os
+import threading
+
+from core.prompting.indexing.fingerprint import FileFingerprint
+from core.prompting.retrieval.lexical import LexicalIndex
+from core.prompting.store.base import VectorStore
+
+logger = getLogger()
+
+
+class Corpus():
+    """Collection of documents shared by all sessions.
+
+    Documents are addressed by the contents and chunking of their files, so
+    identical files are parsed, embedded and stored only once. Each document
+    keeps the files of each collection referencing it and is deleted when no
+    file references it anymore.
+    """
+
+    METADATA_DOCUMENT_ID = 'document-id'
+
+    def __init__(
+        self,
+        store: VectorStore,
+        lexical_index: LexicalIndex,
+        path: str
+    ):
+        """
+        Args:
+            - store: Vector store of the corpus chunks.
+            - lexical_index: Lexical index of the corpus chunks, whose file
+                names are the document ids.
+            - path: Path of the JSON file where document references are saved.
+        """
+        self._store = store
+        self._lexical_index = lexical_index
+        self._path = path
+        self._lock = threading.Lock()
+        self._references: dict[str, set[tuple[str, str]]] = {}
+        self._indexed: set[str] = set()
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                for document_id, document in json.load(file).items():
+                    self._references[document_id] = {
+                        (collection_name, file_name)
+                        for collection_name, file_name
+                        in document['references']
+                    }
+                    if document['indexed']:
+                        self._indexed.add(document_id)
+
+    @staticmethod
+    def get_document_id(fingerprint: FileFingerprint) -> str:
+        """Get the id of the document of a file.
+
+        Args:
+            - fingerprint: Fingerprint of the file.
+
+        Returns:
+            Id of the document.
+        """
+        return (f"{fingerprint.content_hash}-{fingerprint.chunk_size}-"
+                f"{fingerprint.chunk_overlap}")
+
+    def get_store(self) -> VectorStore:
+        """Get the vector store of the corpus."""
+        return self._store
+
+    def get_lexical_index(self) -> LexicalIndex:
+        """Get the lexical index of the corpus."""
+        return self._lexical_index
+
+    def has_document(self, document_id: str) -> bool:
+        """Check if a document is completely indexed.
+
+        Args:
+            - document_id: Id of the document.
+        """
+        with self._lock:
+            return document_id in self._indexed
+
+    def add_references(self, collection_name: str, documents: dict[str, str]):
+        """Reference documents from files of a collection, so they are kept
+        while being indexed or used.
+
+        Args:
+            - collection_name: Name of the collection.
+            - documents: Id of the document of each file name.
+        """
+        with self._lock:
+            for file_name, document_id in documents.items():
+                self._references.setdefault(
+                    document_id, set()).add((collection_name, file_name))
+            self._save()
+
+    def set_indexed(self, document_ids: list[str]):
+        """Mark documents as completely indexed.
+
+        Args:
+            - document_ids: Ids of the documents.
+        """
+        with self._lock:
+            self._indexed.update(document_ids)
+            self._save()
+
+    def remove_references(
+        self,
+        collection_name: str,
+        documents: dict[str, str] | None = None
+    ):
+        """Remove references of files of a collection, deleting the documents
+        no longer referenced.
+
+        Args:
+            - collection_name: Name of the collection.
+            - documents: Id of the document of each file name. If not
+                provided, all references of the collection are removed.
+        """
+        with self._lock:
+            if documents is None:
+                removed = {
+                    document_id: {reference for reference in references
+                                  if reference[0] == collection_name}
+                    for document_id, references in self._references.items()
+                }
+            else:
+                removed = {}
+                for file_name, document_id in documents.items():
+                    removed.setdefault(document_id, set()).add(
+                        (collection_name, file_name))
+
+            orphan_ids = []
+            for document_id, document_references in removed.items():
+                references = self._references.get(document_id)
+                if references is None:
+                    continue
+
+                references.difference_update(document_references)
+                if not references:
+                    orphan_ids.append(document_id)
+
+            if orphan_ids:
+                self._store.delete({self.METADATA_DOCUMENT_ID: orphan_ids})
+                self._store.persist()
+                self._lexical_index.remove_files(orphan_ids)
+                self._lexical_index.save()
+
+            for document_id in orphan_ids:
+                del self._references[document_id]
+                self._indexed.discard(document_id)
+            self._save()
+
+        logger.info('m=remove_references collection=%s deleted=%d',
+                    collection_name, len(orphan_ids))
+
+    def _save(self):
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(
+                {
+                    document_id: {
+                        'indexed': document_id in self._indexed,
+                        'references': [list(reference)
+                                       for reference in sorted(references)]
+                    }
+                    for document_id, references in self._references.items()
+                },
+                file
+            )
+        os.replace(temp_path, self._path)
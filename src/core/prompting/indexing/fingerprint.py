@@ -0,0 +1,178 @@
+"""File fingerprinting module."""
+
+import hashlib
+import json
+import os
+
+from attr import asdict, dataclass
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class FileFingerprint():
+    """Defines the state of a file when it was indexed."""
+
+    size: int
+    """Size of the file, in bytes."""
+
+    modified: int
+    """Last modification time of the file, in nanoseconds."""
+
+    content_hash: str
+    """SHA-256 of the file contents."""
+
+    chunk_size: int
+    """Chunk size used when splitting the file."""
+
+    chunk_overlap: int
+    """Chunk overlap used when splitting the file."""
+
+    def is_indexed_as(self, other: 'FileFingerprint | None') -> bool:
+        """Check if the file would be indexed the same as another fingerprint,
+        having the same contents and chunking parameters. Size and
+        modification time are ignored, since a file rewritten with the same
+        contents does not need to be indexed again.
+
+        Args:
+            - other: Fingerprint to compare with.
+        """
+        return other is not None \
+            and self.content_hash == other.content_hash \
+            and self.chunk_size == other.chunk_size \
+            and self.chunk_overlap == other.chunk_overlap
+
+
+def get_file_hash(file_path: str) -> str:
+    """Calculate the SHA-256 of a file's contents.
+
+    Args:
+        - file_path: Path of the file.
+
+    Returns:
+        Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        while block := file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def get_file_fingerprint(
+    file_path: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    previous: FileFingerprint | None = None
+) -> FileFingerprint:
+    """Get the fingerprint of a file.
+
+    The contents are only hashed when the size or modification time differ
+    from the previous fingerprint.
+
+    Args:
+        - file_path: Path of the file.
+        - chunk_size: Chunk size used when splitting the file.
+        - chunk_overlap: Chunk overlap used when splitting the file.
+        - previous: Fingerprint from the last time the file was indexed.
+
+    Returns:
+        Current fingerprint of the file.
+    """
+    stat = os.stat(file_path)
+
+    if (previous is not None
+            and previous.size == stat.st_size
+            and previous.modified == stat.st_mtime_ns):
+        content_hash = previous.content_hash
+    else:
+        content_hash = get_file_hash(file_path)
+
+    return FileFingerprint(
+        size=stat.st_size,
+        modified=stat.st_mtime_ns,
+        content_hash=content_hash,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+
+
+class FingerprintRegistry():
+    """Keeps the fingerprints of the files indexed in a collection.
+
+    The registry has a version, incremented every time it is saved, which
+    identifies the state of the indexed files.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            - path: Path of the JSON file where fingerprints are saved.
+        """
+        self._path = path
+        self._fingerprints: dict[str, FileFingerprint] = {}
+        self._version = 0
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+                self._version = data['version']
+                for file_name, fingerprint in data['files'].items():
+                    self._fingerprints[file_name] = FileFingerprint(
+                        **fingerprint)
+
+    def get(self, file_name: str) -> FileFingerprint | None:
+        """Get the fingerprint of an indexed file.
+
+        Args:
+            - file_name: Name of the file.
+
+        Returns:
+            Fingerprint found or None.
+        """
+        return self._fingerprints.get(file_name)
+
+    def set(self, file_name: str, fingerprint: FileFingerprint):
+        """Set the fingerprint of an indexed file.
+
+        Args:
+            - file_name: Name of the file.
+            - fingerprint: Fingerprint of the file.
+        """
+        self._fingerprints[file_name] = fingerprint
+
+    def remove(self, file_name: str):
+        """Remove the fingerprint of a file.
+
+        Args:
+            - file_name: Name of the file.
+        """
+        self._fingerprints.pop(file_name, None)
+
+    def get_file_names(self) -> list[str]:
+        """Get the names of all files with fingerprints."""
+        return list(self._fingerprints.keys())
+
+    def get_version(self) -> int:
+        """Get the version of the registry."""
+        return self._version
+
+    def save(self):
+        """Save the fingerprints, incrementing the registry version."""
+        self._version += 1
+
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'version': self._version,
+                'files': {
+                    file_name: asdict(fingerprint)
+                    for file_name, fingerprint in self._fingerprints.items()
+                }
+            }, file)
+        os.replace(temp_path, self._path)
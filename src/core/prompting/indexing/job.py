@@ -0,0 +1,176 @@
+"""Background indexing module."""
+
+from logging import getLogger
+import threading
+from typing import Callable
+
+from attr import evolve
+
+from core.prompting.indexing.pipeline import IndexingProgress
+
+logger = getLogger()
+
+
+class IndexingJob():
+    """Runs an indexing operation in a background thread, exposing its
+    progress to other threads."""
+
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+
+    def __init__(
+        self,
+        key: str,
+        files_path: list[str],
+        index: Callable[[Callable[[IndexingProgress], None]], None]
+    ):
+        """
+        Args:
+            - key: Identifier of the job.
+            - files_path: Path of the files being indexed.
+            - index: Indexes the files, reporting progress to the callback
+                received.
+        """
+        self._key = key
+        self._files_path = files_path
+        self._index = index
+        self._lock = threading.Lock()
+        self._progress = IndexingProgress(files=len(files_path))
+        self._status = self.STATUS_RUNNING
+        self._error: Exception | None = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"indexing-{key}", daemon=True)
+
+    def start(self):
+        """Start the job."""
+        self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait for the job to finish.
+
+        Args:
+            - timeout: Maximum seconds to wait. If not provided, waits until
+                the job finishes.
+
+        Returns:
+            True if the job finished.
+        """
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def get_key(self) -> str:
+        """Get the identifier of the job."""
+        return self._key
+
+    def get_files_path(self) -> list[str]:
+        """Get the path of the files being indexed."""
+        return self._files_path
+
+    def get_status(self) -> str:
+        """Get the status of the job."""
+        with self._lock:
+            return self._status
+
+    def get_progress(self) -> IndexingProgress:
+        """Get a snapshot of the job progress."""
+        with self._lock:
+            return evolve(self._progress)
+
+    def get_error(self) -> Exception | None:
+        """Get the error that failed the job, if any."""
+        with self._lock:
+            return self._error
+
+    def is_running(self) -> bool:
+        """Check if the job is still running."""
+        return self.get_status() == self.STATUS_RUNNING
+
+    def _run(self):
+        logger.info('m=job_start job=%s files=%d',
+                    self._key, len(self._files_path))
+        try:
+            self._index(self._set_progress)
+        except Exception as e:
+            logger.exception('m=job_failed job=%s error=%s', self._key, e)
+            with self._lock:
+                self._status = self.STATUS_FAILED
+                self._error = e
+            return
+
+        with self._lock:
+            self._status = self.STATUS_SUCCEEDED
+        logger.info('m=job_succeeded job=%s', self._key)
+
+    def _set_progress(self, progress: IndexingProgress):
+        with self._lock:
+            self._progress = evolve(progress)
+
+
+class IndexingJobRegistry():
+    """Keeps the indexing jobs of the process, so jobs outlive the requests
+    that started them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: dict[str, IndexingJob] = {}
+
+    def start(
+        self,
+        key: str,
+        files_path: list[str],
+        index: Callable[[Callable[[IndexingProgress], None]], None]
+    ) -> IndexingJob:
+        """Start a job.
+
+        Args:
+            - key: Identifier of the job. Only one job runs per key.
+            - files_path: Path of the files being indexed.
+            - index: Indexes the files, reporting progress to the callback
+                received.
+
+        Returns:
+            Job started.
+        """
+        with self._lock:
+            current = self._jobs.get(key)
+            if current is not None and current.is_running():
+                raise ValueError(f"Job {key} is already running.")
+
+            job = IndexingJob(key, files_path, index)
+            self._jobs[key] = job
+
+        job.start()
+        return job
+
+    def get(self, key: str) -> IndexingJob | None:
+        """Get a job.
+
+        Args:
+            - key: Identifier of the job.
+
+        Returns:
+            Job found or None.
+        """
+        with self._lock:
+            return self._jobs.get(key)
+
+    def is_running(self, key: str) -> bool:
+        """Check if a job is running.
+
+        Args:
+            - key: Identifier of the job.
+        """
+        job = self.get(key)
+        return job is not None and job.is_running()
+
+    def remove(self, key: str):
+        """Remove a finished job.
+
+        Args:
+            - key: Identifier of the job.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.is_running():
+                del self._jobs[key]
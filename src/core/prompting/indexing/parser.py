@@ -0,0 +1,158 @@
+"""Document parsing module."""
+
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait
+)
+from logging import getLogger
+import multiprocessing
+import threading
+from typing import Iterable, Iterator
+
+from llama_index.core import Document
+from llama_index.core import SimpleDirectoryReader
+
+from core.prompting.cache.document import DocumentCache
+from core.prompting.indexing.fingerprint import get_file_hash
+
+logger = getLogger()
+
+
+def parse_file(file_path: str) -> list[Document]:
+    """Parse a file into documents.
+
+    Args:
+        - file_path: Path of the file.
+
+    Returns:
+        Documents extracted from the file.
+    """
+    reader = SimpleDirectoryReader(
+        input_files=[file_path],
+        exclude_hidden=False
+    )
+    return reader.load_data()
+
+
+class DocumentParser():
+    """Parses files into documents, optionally in worker processes.
+
+    Extraction of PDF, DOCX and XLSX files is CPU-bound, so parsing files in
+    separate processes allows multi-file uploads to use all cores.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        cache: DocumentCache | None = None
+    ):
+        """
+        Args:
+            - workers: Number of processes parsing files in parallel. 1 parses
+                files in the calling thread.
+            - cache: Cache of parsed documents, checked before parsing a file.
+        """
+        if workers < 1:
+            raise ValueError('Workers must be greater than zero.')
+
+        self._workers = workers
+        self._cache = cache
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def parse(
+        self,
+        files_path: Iterable[str],
+        content_hashes: dict[str, str] | None = None
+    ) -> Iterator[tuple[str, list[Document]]]:
+        """Parse files, yielding each file as soon as it is parsed.
+
+        Files found in the cache are yielded without parsing. With worker
+        processes, files are yielded in completion order and at most two
+        files per worker are parsed ahead of the consumer.
+
+        Args:
+            - files_path: Path of each file.
+            - content_hashes: SHA-256 of the files contents, by path. Missing
+                hashes are calculated when a cache is used.
+
+        Returns:
+            Path of each file with its documents.
+        """
+        content_hashes = content_hashes or {}
+        executor = self._get_executor() if self._workers > 1 else None
+        pending: dict[Future, tuple[str, str]] = {}
+
+        try:
+            for file_path in files_path:
+                content_hash = ''
+                if self._cache is not None:
+                    content_hash = content_hashes.get(
+                        file_path) or get_file_hash(file_path)
+                    documents = self._cache.get(file_path, content_hash)
+                    if documents is not None:
+                        logger.info('m=parsed file=%s cached=True', file_path)
+                        yield file_path, documents
+                        continue
+
+                if executor is None:
+                    yield self._store(
+                        file_path, content_hash, parse_file(file_path))
+                    continue
+
+                if len(pending) >= self._workers * 2:
+                    yield from self._collect(pending)
+
+                pending[executor.submit(parse_file, file_path)] = (
+                    file_path, content_hash)
+
+            while pending:
+                yield from self._collect(pending)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def _collect(
+        self,
+        pending: dict[Future, tuple[str, str]]
+    ) -> Iterator[tuple[str, list[Document]]]:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            file_path, content_hash = pending.pop(future)
+            yield self._store(file_path, content_hash, future.result())
+
+    def _store(
+        self,
+        file_path: str,
+        content_hash: str,
+        documents: list[Document]
+    ) -> tuple[str, list[Document]]:
+        logger.info('m=parsed file=%s cached=False', file_path)
+        if self._cache is not None:
+            self._cache.set(file_path, content_hash, documents)
+            stats = self._cache.get_stats()
+            logger.info('m=document_cache hits=%d misses=%d evictions=%d',
+                        stats.hits, stats.misses, stats.evictions)
+
+        return file_path, documents
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking a multi-threaded server is unsafe, so workers are
+                # started as new interpreters.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+
+            return self._executor
@@ -0,0 +1,205 @@
+"""Streaming pipeline module."""
+
+from logging import getLogger
+from queue import Empty, Full, Queue
+import threading
+from typing import Any, Callable, Iterable
+
+from attr import dataclass
+
+logger = getLogger()
+
+_END = object()
+"""Marker for the end of the items flowing through a queue."""
+
+_EMPTY = object()
+"""Marker for no item available in a queue."""
+
+POLL_INTERVAL = 0.1
+
+
+@dataclass
+class IndexingProgress():
+    """Defines the progress of an indexing operation."""
+
+    files: int = 0
+    """Total number of files to be indexed."""
+
+    files_loaded: int = 0
+    """Number of files already parsed."""
+
+    documents_loaded: int = 0
+    """Number of documents parsed from the files."""
+
+    chunks_split: int = 0
+    """Number of chunks created from the documents."""
+
+    chunks_embedded: int = 0
+    """Number of chunks with embeddings calculated."""
+
+    chunks_saved: int = 0
+    """Number of chunks written to the vector database."""
+
+
+class PipelineStage():
+    """Defines a step of a pipeline."""
+
+    def __init__(
+        self,
+        name: str,
+        function: Callable[[Any], Iterable[Any]],
+        workers: int = 1
+    ):
+        """
+        Args:
+            - name: Name of the stage, used in logs and thread names.
+            - function: Function that processes an item and returns the items
+                for the next stage.
+            - workers: Number of threads processing items concurrently.
+        """
+        if workers < 1:
+            raise ValueError('Workers must be greater than zero.')
+
+        self.name = name
+        self.function = function
+        self.workers = workers
+
+
+class Pipeline():
+    """Runs stages connected by bounded queues, each stage in its own threads.
+
+    Items flow through the stages as soon as they are produced, so the amount
+    of items held in memory is limited by the queue sizes instead of the total
+    number of items.
+    """
+
+    def __init__(
+        self,
+        stages: list[PipelineStage],
+        queue_size: int = 4
+    ):
+        """
+        Args:
+            - stages: Stages in execution order. Items returned by the last
+                stage are discarded.
+            - queue_size: Maximum number of items waiting between stages.
+        """
+        if len(stages) == 0:
+            raise ValueError('A pipeline requires at least one stage.')
+
+        self._stages = stages
+        self._queue_size = queue_size
+        self._stop = threading.Event()
+        self._error: Exception | None = None
+
+    def run(
+        self,
+        items: Iterable[Any],
+        on_wait: Callable[[], None] | None = None,
+        wait_interval: float = 0.5
+    ):
+        """Run the pipeline until all items are processed.
+
+        Args:
+            - items: Items for the first stage.
+            - on_wait: Called periodically in the caller thread while the
+                pipeline runs.
+            - wait_interval: Interval between calls to on_wait, in seconds.
+
+        Raises:
+            The first error raised by any stage.
+        """
+        queues = [Queue(self._queue_size) for _ in self._stages]
+        threads = [threading.Thread(
+            target=self._feed,
+            args=(items, queues[0]),
+            name='pipeline-source',
+            daemon=True
+        )]
+
+        for index, stage in enumerate(self._stages):
+            output = queues[index + 1] if index + 1 < len(queues) else None
+            remaining = [stage.workers]
+            remaining_lock = threading.Lock()
+
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[index], output,
+                          remaining, remaining_lock),
+                    name=f"pipeline-{stage.name}-{worker}",
+                    daemon=True
+                ))
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(wait_interval)
+                if on_wait is not None:
+                    on_wait()
+
+        if self._error is not None:
+            raise self._error
+
+    def _feed(self, items: Iterable[Any], output: Queue):
+        try:
+            for item in items:
+                if not self._put(output, item):
+                    return
+        except Exception as e:
+            self._fail('source', e)
+        finally:
+            self._put(output, _END)
+
+    def _work(
+        self,
+        stage: PipelineStage,
+        source: Queue,
+        output: Queue | None,
+        remaining: list[int],
+        remaining_lock: threading.Lock
+    ):
+        try:
+            while not self._stop.is_set():
+                item = self._get(source)
+                if item is _END:
+                    # Put the marker back so the other workers also finish.
+                    self._put(source, _END)
+                    break
+                if item is _EMPTY:
+                    continue
+
+                for result in stage.function(item):
+                    if output is not None and not self._put(output, result):
+                        return
+        except Exception as e:
+            self._fail(stage.name, e)
+        finally:
+            with remaining_lock:
+                remaining[0] -= 1
+                is_last_worker = remaining[0] == 0
+            if is_last_worker and output is not None:
+                self._put(output, _END)
+
+    def _get(self, source: Queue) -> Any:
+        try:
+            return source.get(timeout=POLL_INTERVAL)
+        except Empty:
+            return _EMPTY
+
+    def _put(self, output: Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                output.put(item, timeout=POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _fail(self, stage_name: str, error: Exception):
+        logger.error('m=pipeline stage=%s e=%s', stage_name, error)
+        if self._error is None:
+            self._error = error
+        self._stop.set()
@@ -0,0 +1,114 @@
+"""Cached generation module."""
+
+import hashlib
+import json
+from logging import getLogger
+
+from core.prompting.base import (
+    GeneratedResponse,
+    GenerationStream,
+    ModelProvider
+)
+from core.prompting.cache.base import DiskCache
+
+logger = getLogger()
+
+
+class CachedModelProvider(ModelProvider):
+    """Reuse responses previously generated for the same prompt by the same
+    provider, model and generation options.
+
+    Responses found in the cache are flagged as cached, so their tokens are
+    not counted again.
+    """
+
+    def __init__(
+        self,
+            provider: ModelProvider,
+            cache: DiskCache
+    ):
+        """
+        Args:
+            - provider: Provider generating the responses not cached.
+            - cache: Store of the generated responses.
+        """
+        self._provider = provider
+        self._cache = cache
+
+    def get_cache_key(self) -> str:
+        return self._provider.get_cache_key()
+
+    def generate(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        key = self._get_key(prompt, context)
+        response = self._get(key)
+        if response is None:
+            response = self._provider.generate(prompt, context)
+            self._set(key, response)
+
+        return response
+
+    async def generate_async(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        key = self._get_key(prompt, context)
+        response = self._get(key)
+        if response is None:
+            response = await self._provider.generate_async(prompt, context)
+            self._set(key, response)
+
+        return response
+
+    def generate_stream(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GenerationStream:
+        key = self._get_key(prompt, context)
+        response = self._get(key)
+        if response is not None:
+            return GenerationStream.from_response(lambda: response)
+
+        stream = self._provider.generate_stream(prompt, context)
+        stream.add_done_callback(lambda response: self._set(key, response))
+        return stream
+
+    def _get_key(self, prompt: str, context: list[int] | None) -> str:
+        # A continued conversation generates a different response for the
+        # same prompt, so its context is part of the key.
+        key = f"{self._provider.get_cache_key()}\n{prompt}"
+        if context is not None:
+            key += f"\n{json.dumps(context)}"
+
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def _get(self, key: str) -> GeneratedResponse | None:
+        value = self._cache.get(key)
+        stats = self._cache.get_stats()
+        logger.info('m=response_cache hit=%s hits=%d misses=%d evictions=%d',
+                    value is not None, stats.hits, stats.misses,
+                    stats.evictions)
+        if value is None:
+            return None
+
+        data = json.loads(value)
+        return GeneratedResponse(
+            value=data['value'],
+            input_tokens=data['input_tokens'],
+            output_tokens=data['output_tokens'],
+            cached=True,
+            context=data.get('context')
+        )
+
+    def _set(self, key: str, response: GeneratedResponse):
+        self._cache.set(key, json.dumps({
+            'value': response.value,
+            'input_tokens': response.input_tokens,
+            'output_tokens': response.output_tokens,
+            'context': response.context
+        }).encode('utf-8'))
@@ -0,0 +1,292 @@
+"""Hedged generation module."""
+
+import asyncio
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait
+)
+from logging import getLogger
+from timeit import default_timer as timer
+from typing import Callable, Iterator, TypeVar
+
+from core.latency import LatencyStats
+from core.prompting.base import (
+    GeneratedResponse,
+    GenerationError,
+    GenerationStream,
+    ModelProvider
+)
+
+MODE_GENERATE = 'generate'
+MODE_STREAM = 'stream'
+MIN_SAMPLES = 10
+"""Number of latencies recorded before their percentile replaces the initial
+deadline."""
+
+T = TypeVar('T')
+
+logger = getLogger()
+
+
+class HedgedModelProvider(ModelProvider):
+    """Generate responses with a primary provider, sending the prompt also to
+    a secondary provider when the primary is slower than usual or fails.
+
+    If the primary provider does not respond before the deadline, given by a
+    percentile of its recent latencies, a hedged request is sent to the
+    secondary provider and the first response is used. Errors of the
+    primary provider fail over to the secondary provider immediately.
+    Streams are hedged on the time to their first chunk.
+
+    Generations run in worker threads of each provider, so slow requests of
+    the primary provider do not delay the hedged requests. Threads cannot be
+    stopped, so the slower request keeps running until done and its latency
+    is still recorded, but requests still queued are dropped and the slower
+    stream is closed once it starts. Async generations stop the slower
+    request instead.
+    """
+
+    def __init__(
+        self,
+        primary: ModelProvider,
+        secondary: ModelProvider,
+        percentile: float = 95,
+        initial_deadline: float = 10,
+        window: int = 100,
+        timeout: float | None = None,
+        max_workers: int | None = None
+    ):
+        """
+        Args:
+            - primary: Provider used for all generations.
+            - secondary: Provider used for hedged requests and failover.
+            - percentile: Percentile of the primary provider latencies used as
+                the deadline for hedged requests.
+            - initial_deadline: Deadline in seconds, used until enough
+                latencies are recorded.
+            - window: Number of recent latencies kept per provider.
+            - timeout: Seconds waited for a response of either provider,
+                after which the generation fails. None waits until the
+                providers respond or time out.
+            - max_workers: Number of worker threads of each provider. None
+                uses the default of ThreadPoolExecutor.
+        """
+        self._providers = (primary, secondary)
+        self._percentile = percentile
+        self._initial_deadline = initial_deadline
+        self._stats = {
+            mode: (LatencyStats(window), LatencyStats(window))
+            for mode in (MODE_GENERATE, MODE_STREAM)
+        }
+        self._timeout = timeout
+        self._executors = tuple(
+            ThreadPoolExecutor(max_workers, thread_name_prefix=f"hedged-{name}")
+            for name in ('primary', 'secondary'))
+
+    def get_cache_key(self) -> str:
+        # Responses can come from either provider.
+        return '+'.join(provider.get_cache_key()
+                        for provider in self._providers)
+
+    def generate(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        return self._hedge(
+            MODE_GENERATE,
+            lambda provider: provider.generate(prompt, context))
+
+    async def generate_async(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        start = timer()
+        primary = asyncio.create_task(
+            self._generate_async(0, prompt, context))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(
+                pending, timeout=self._get_wait(start, MODE_GENERATE))
+            if primary in done and primary.exception() is None:
+                return primary.result()
+            if not done and self._get_wait(start) == 0:
+                raise self._timeout_error()
+
+            error = primary.exception() if primary in done else None
+            self._log_hedge(MODE_GENERATE, error)
+            secondary = asyncio.create_task(
+                self._generate_async(1, prompt, context))
+            pending = {secondary} if primary in done else {primary, secondary}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=self._get_wait(start),
+                    return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise self._timeout_error()
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+        finally:
+            # Unlike threads, async requests can be stopped.
+            for task in pending:
+                task.cancel()
+
+        raise error
+
+    def generate_stream(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GenerationStream:
+        return GenerationStream(self._stream_chunks(prompt, context))
+
+    def _stream_chunks(
+        self,
+        prompt: str,
+        context: list[int] | None
+    ) -> Iterator[str | GeneratedResponse]:
+        stream, chunks, first_chunk = self._hedge(
+            MODE_STREAM,
+            lambda provider: self._start_stream(
+                provider.generate_stream(prompt, context)),
+            lambda started: started[0].close())
+
+        try:
+            if first_chunk is not None:
+                yield first_chunk
+                yield from chunks
+
+            yield stream.get_response()
+        finally:
+            stream.close()
+
+    def _start_stream(
+        self,
+        stream: GenerationStream
+    ) -> tuple[GenerationStream, Iterator[str], str | None]:
+        chunks = iter(stream)
+        return stream, chunks, next(chunks, None)
+
+    def _hedge(
+        self,
+        mode: str,
+        request: Callable[[ModelProvider], T],
+        discard: Callable[[T], None] | None = None
+    ) -> T:
+        start = timer()
+        primary = self._submit(mode, 0, request)
+        submitted = [primary]
+        winner = None
+        pending = {primary}
+        try:
+            done, _ = wait(pending, timeout=self._get_wait(start, mode))
+            if done and primary.exception() is None:
+                winner = primary
+                return primary.result()
+            if not done and self._get_wait(start) == 0:
+                raise self._timeout_error()
+
+            error = primary.exception() if done else None
+            self._log_hedge(mode, error)
+            secondary = self._submit(mode, 1, request)
+            submitted.append(secondary)
+            pending = {secondary} if done else {primary, secondary}
+            while pending:
+                done, pending = wait(pending, timeout=self._get_wait(start),
+                                     return_when=FIRST_COMPLETED)
+                if not done:
+                    raise self._timeout_error()
+                for future in done:
+                    if future.exception() is None:
+                        winner = future
+                        return future.result()
+                    error = future.exception()
+        finally:
+            for future in submitted:
+                # Requests still queued behind slow ones are no longer needed,
+                # and the results of the others are discarded once done.
+                if future is not winner and not future.cancel() and \
+                        discard is not None:
+                    future.add_done_callback(
+                        lambda done: self._discard(done, discard))
+
+        raise error
+
+    def _submit(
+        self,
+        mode: str,
+        index: int,
+        request: Callable[[ModelProvider], T]
+    ) -> Future:
+        provider = self._providers[index]
+        stats = self._stats[mode][index]
+
+        def run() -> T:
+            start = timer()
+            result = request(provider)
+            stats.record(timer() - start)
+            return result
+
+        return self._executors[index].submit(run)
+
+    @staticmethod
+    def _discard(future: Future, discard: Callable[[T], None]):
+        if future.exception() is None:
+            discard(future.result())
+
+    async def _generate_async(
+        self,
+        index: int,
+        prompt: str,
+        context: list[int] | None
+    ) -> GeneratedResponse:
+        stats = self._stats[MODE_GENERATE][index]
+        start = timer()
+        try:
+            response = await self._providers[index].generate_async(
+                prompt, context)
+        except asyncio.CancelledError:
+            # The time until it was stopped is a lower bound of the latency,
+            # which keeps slow responses in the stats.
+            stats.record(timer() - start)
+            raise
+
+        stats.record(timer() - start)
+        return response
+
+    def _get_wait(self, start: float, mode: str | None = None) -> float | None:
+        # Seconds until the hedging deadline of the mode, if given, or until
+        # the timeout, whichever comes first.
+        waits = []
+        if mode is not None:
+            waits.append(self._get_deadline(mode))
+        if self._timeout is not None:
+            waits.append(max(self._timeout - (timer() - start), 0))
+
+        return min(waits) if waits else None
+
+    def _timeout_error(self) -> GenerationError:
+        logger.warning('m=hedge_timeout timeout=%s', self._timeout)
+        return GenerationError(
+            f"No response of the providers within {self._timeout} seconds.")
+
+    def _get_deadline(self, mode: str) -> float:
+        stats = self._stats[mode][0]
+        if stats.get_count() < MIN_SAMPLES:
+            return self._initial_deadline
+
+        return stats.get_percentile(self._percentile)
+
+    def _log_hedge(self, mode: str, error: BaseException | None):
+        primary_stats, secondary_stats = self._stats[mode]
+        logger.info('m=hedge mode=%s reason=%s deadline=%f '
+                    'primary_p50=%s secondary_p50=%s e=%s',
+                    mode, 'error' if error is not None else 'deadline',
+                    self._get_deadline(mode),
+                    primary_stats.get_percentile(50),
+                    secondary_stats.get_percentile(50), error)
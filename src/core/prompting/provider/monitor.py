@@ -0,0 +1,208 @@
+"""Ollama model monitoring module."""
+
+from logging import getLogger
+import threading
+from timeit import default_timer as timer
+from typing import Any, Callable
+
+from attr import dataclass, evolve
+from ollama import Client
+
+DEFAULT_MODEL_TAG = 'latest'
+NANOSECONDS_PER_SECOND = 1e9
+
+logger = getLogger()
+
+
+@dataclass
+class ModelStatus():
+    """Defines the load state of a model in Ollama."""
+
+    name: str
+    """Name of the model."""
+
+    loaded: bool
+    """Whether the model is loaded in memory."""
+
+    loading: bool = False
+    """Whether the model is being loaded by the warm-up."""
+
+    load_time: float | None = None
+    """Seconds taken by the warm-up to load the model, if measured."""
+
+    size_vram: int = 0
+    """Size of the model loaded in the GPU memory, in bytes."""
+
+    error: str = ''
+    """Error of the last warm-up or check, if any."""
+
+    host: str = ''
+    """Host of the Ollama server, when monitoring multiple hosts."""
+
+
+class OllamaModelMonitor():
+    """Loads the models used by the application and checks if they are still
+    loaded.
+
+    Ollama unloads models idle for longer than their keep alive, so the next
+    request waits for the model to load again. The warm-up loads the models
+    ahead of the first request, and the checks report whether they are
+    loaded.
+    """
+
+    def __init__(
+        self,
+        ollama: Client,
+        llm_model_name: str | None,
+        embedding_model_name: str,
+        keep_alive: str | None = None,
+        host: str = ''
+    ):
+        """
+        Args:
+            - ollama: Client to access Ollama.
+            - llm_model_name: Name of the LLM model. None when generation is
+                not performed by Ollama.
+            - embedding_model_name: Name of the embedding model.
+            - keep_alive: How long Ollama keeps the models loaded after the
+                warm-up.
+            - host: Host of the Ollama server, reported in the status when
+                monitoring multiple hosts.
+        """
+        self._ollama = ollama
+        self._llm_model_name = llm_model_name
+        self._embedding_model_name = embedding_model_name
+        self._keep_alive = keep_alive
+        self._statuses = {name: ModelStatus(name, False, host=host)
+                          for name in self._get_model_names()}
+        self._lock = threading.Lock()
+        self._monitor: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def warm_up(self):
+        """Load the models, measuring the time taken by each one."""
+        if self._llm_model_name is not None:
+            self._load(self._llm_model_name, lambda: self._ollama.generate(
+                model=self._llm_model_name,
+                prompt='',
+                keep_alive=self._keep_alive))
+
+        self._load(self._embedding_model_name, lambda: self._ollama.embed(
+            model=self._embedding_model_name,
+            input=[],
+            keep_alive=self._keep_alive))
+
+    def check(self) -> list[ModelStatus]:
+        """Check which models are loaded in Ollama.
+
+        Returns:
+            Status of each model.
+        """
+        try:
+            running = {self._get_full_name(model['model']): model
+                       for model in self._ollama.ps()['models']}
+            error = ''
+        except Exception as e:
+            logger.warning('m=check_models e=%s', e)
+            running = {}
+            error = str(e)
+
+        with self._lock:
+            for name, status in self._statuses.items():
+                model = running.get(self._get_full_name(name))
+                status.loaded = model is not None
+                status.size_vram = model['size_vram'] if model else 0
+                if not status.loading:
+                    status.error = error
+
+                logger.info('m=check_model model=%s loaded=%s load_time=%s',
+                            name, status.loaded, status.load_time)
+
+        return self.get_statuses()
+
+    def get_statuses(self) -> list[ModelStatus]:
+        """Get the status of each model from the last warm-up or check, without
+        requesting Ollama."""
+        with self._lock:
+            return [evolve(status) for status in self._statuses.values()]
+
+    def start(self, interval: int, warm_up: bool = True):
+        """Start monitoring the models in a background thread.
+
+        Args:
+            - interval: Seconds between checks. 0 disables the checks.
+            - warm_up: Whether to load the models before the first check.
+        """
+        with self._lock:
+            if self._monitor is not None:
+                return
+
+            self._stop.clear()
+            self._monitor = threading.Thread(
+                target=self._run, args=(interval, warm_up),
+                name='model-monitor', daemon=True)
+            self._monitor.start()
+
+    def stop(self):
+        """Stop the background monitoring."""
+        with self._lock:
+            monitor = self._monitor
+            self._monitor = None
+
+        if monitor is not None:
+            self._stop.set()
+            monitor.join()
+
+    def _run(self, interval: int, warm_up: bool):
+        if warm_up:
+            self.warm_up()
+
+        if interval <= 0:
+            return
+
+        self.check()
+        while not self._stop.wait(interval):
+            self.check()
+
+    def _load(self, name: str, request: Callable[[], Any]):
+        with self._lock:
+            self._statuses[name].loading = True
+
+        start = timer()
+        error = ''
+        load_time = None
+        try:
+            response = request()
+            # The load duration reported by Ollama excludes the request
+            # overhead, and is 0 if the model was already loaded.
+            load_duration = response.get('load_duration')
+            load_time = load_duration / NANOSECONDS_PER_SECOND \
+                if load_duration is not None else timer() - start
+        except Exception as e:
+            logger.warning('m=warm_up model=%s e=%s', name, e)
+            error = str(e)
+
+        with self._lock:
+            status = self._statuses[name]
+            status.loading = False
+            status.loaded = not error
+            status.load_time = load_time
+            status.error = error
+
+        logger.info('m=warm_up model=%s load_time=%s elapsed=%f',
+                    name, load_time, timer() - start)
+
+    def _get_model_names(self) -> list[str]:
+        names = [self._embedding_model_name]
+        if self._llm_model_name is not None:
+            names.insert(0, self._llm_model_name)
+
+        return names
+
+    @staticmethod
+    def _get_full_name(name: str) -> str:
+        # Ollama lists models with their tag, which defaults to latest.
+        if ':' in name.rsplit('/', 1)[-1]:
+            return name
+
+        return f"{name}:{DEFAULT_MODEL_TAG}"
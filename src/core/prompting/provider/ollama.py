@@ -1,11 +1,19 @@
 """Ollama generation module."""
 
-from ollama import Client
+from typing import Any, Callable, Iterator
 
+from ollama import AsyncClient, Client
+
+from core.http import LoopLocal
 from core.prompting.base import (
     GeneratedResponse,
+    GenerationStream,
     ModelProvider
 )
+from core.prompting.provider.pool import (
+    AsyncOllamaClientPool,
+    OllamaClientPool
+)
 
 
 class OllamaModelProvider(ModelProvider):
@@ -13,24 +21,86 @@ class OllamaModelProvider(ModelProvider):
 
     def __init__(
         self,
-            ollama: Client,
-            model_name: str = 'llama3'
+            ollama: Client | OllamaClientPool,
+            model_name: str = 'llama3',
+            async_ollama: Callable[
+                [], AsyncClient | AsyncOllamaClientPool] | None = None,
+            keep_alive: str | None = None
     ):
         """
         Args:
-            - ollama: Client to access Ollama.
+            - ollama: Client to access Ollama, or a pool of clients.
             - model_name: Name of the LLM model used for generation.
+            - async_ollama: Creates the async client used in each event loop.
+                If not provided, async generations run the client in a
+                worker thread.
+            - keep_alive: How long Ollama keeps the model loaded after each
+                generation. If not provided, the server default is used.
         """
         self._ollama = ollama
         self._model_name = model_name
+        self._async_ollama = LoopLocal(async_ollama) \
+            if async_ollama is not None else None
+        self._keep_alive = keep_alive
+
+    def get_cache_key(self) -> str:
+        return f"ollama:{self._model_name}"
+
+    def generate(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        return self._get_response(self._ollama.generate(
+            self._model_name, prompt, context=context,
+            keep_alive=self._keep_alive))
+
+    async def generate_async(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        if self._async_ollama is None:
+            return await super().generate_async(prompt, context)
+
+        return self._get_response(await self._async_ollama.get().generate(
+            self._model_name, prompt, context=context,
+            keep_alive=self._keep_alive))
+
+    def generate_stream(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GenerationStream:
+        return GenerationStream(self._stream_chunks(prompt, context))
+
+    def _stream_chunks(
+        self,
+        prompt: str,
+        context: list[int] | None
+    ) -> Iterator[str | GeneratedResponse]:
+        for ollama_response in self._ollama.generate(
+                self._model_name, prompt, context=context, stream=True,
+                keep_alive=self._keep_alive):
+            if ollama_response['response']:
+                yield ollama_response['response']
 
-    def generate(self, prompt: str) -> GeneratedResponse:
-        ollama_response = self._ollama.generate(self._model_name, prompt)
+            if ollama_response['done']:
+                yield GeneratedResponse(
+                    value='',
+                    input_tokens=ollama_response['prompt_eval_count'] or 0,
+                    output_tokens=ollama_response['eval_count'] or 0,
+                    context=ollama_response.get('context')
+                )
 
+    def _get_response(self, ollama_response: Any) -> GeneratedResponse:
+        # The context holds the tokens of the conversation so far, so passing
+        # it back only evaluates the new prompt.
         generated_response = GeneratedResponse(
             value=ollama_response['response'],
             input_tokens=ollama_response['prompt_eval_count'],
-            output_tokens=ollama_response['eval_count']
+            output_tokens=ollama_response['eval_count'],
+            context=ollama_response.get('context')
         )
 
         return generated_response
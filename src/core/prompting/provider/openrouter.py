@@ -1,74 +1,191 @@
 """OpenRouter generation module."""
 
 import json
+from typing import Any, Callable, Iterator
+
+import httpx
 import requests
 
+from core.http import LoopLocal
 from core.prompting.base import (
     GeneratedResponse,
     GenerationError,
+    GenerationStream,
     ModelProvider
 )
 
+SSE_DATA_PREFIX = 'data: '
+SSE_DONE = '[DONE]'
+
 
 class OpenRouterModelProvider(ModelProvider):
-    """Generate responses from an LLM using OpenRouter."""
+    """Generate responses from an LLM using OpenRouter.
+
+    The API is stateless, so conversation contexts are ignored.
+    """
 
     def __init__(
         self,
             api_url: str,
             api_key: str,
             api_timeout: int = 6000,
-            model_name: str = 'llama3'
+            model_name: str = 'llama3',
+            session: requests.Session | None = None,
+            async_client: Callable[[], httpx.AsyncClient] | None = None
     ):
         """
         Args:
             - api_url: OpenRouter's API endpoint.
             - api_key: OpenRouter's API key.
-            - api_timeout: OpenRouter's API timeout.
+            - api_timeout: OpenRouter's API timeout, in milliseconds.
             - model_name: Name of the LLM model used for generation.
+            - session: HTTP session used for requests, reusing connections.
+                If not provided, a session without retries is created.
+            - async_client: Creates the async HTTP client used in each event
+                loop. If not provided, a client without retries is created.
         """
         self._api_url = api_url
         self._api_key = api_key
         self._api_timeout = api_timeout
         self._model_name = model_name
+        self._session = session if session is not None else requests.Session()
+        self._async_client = LoopLocal(
+            async_client if async_client is not None else httpx.AsyncClient)
 
-    def generate(self, prompt: str) -> GeneratedResponse:
+    def get_cache_key(self) -> str:
+        return f"openrouter:{self._model_name}"
+
+    def generate(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        response = self._post(prompt, stream=False)
+        return self._get_response(response.json())
+
+    async def generate_async(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
         try:
-            response = requests.post(
+            response = await self._async_client.get().post(
                 url=self._api_url,
-                timeout=self._api_timeout,
-                headers={
-                    'Authorization': f"Bearer {self._api_key}"
-                },
-                data=json.dumps({
-                    'model': self._model_name,
-                    'messages': [
-                        {
-                            'role': "user",
-                            'content': prompt
-                        }
-                    ]
-                })
+                timeout=self._api_timeout / 1000,
+                headers=self._get_headers(),
+                content=json.dumps(self._get_request_data(prompt, False))
             )
         except Exception as ex:
             raise GenerationError(
                 'Cannot perform request to OpenRouter') from ex
 
         status_code: int = response.status_code
-        if status_code == 200:
-            api_response = response.json()
+        if status_code != 200:
+            raise GenerationError(
+                f"OpenRouter HTTP request error: {status_code}")
+
+        return self._get_response(response.json())
+
+    def generate_stream(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GenerationStream:
+        return GenerationStream(self._stream_chunks(prompt))
+
+    def _get_response(self, api_response: dict[str, Any]) -> GeneratedResponse:
+        if 'error' in api_response:
+            raise GenerationError(
+                f"OpenRouter HTTP request error: {api_response['error']}")
+
+        generated_response = GeneratedResponse(
+            value=api_response['choices'][0]['message']['content'],
+            input_tokens=api_response['usage']['prompt_tokens'],
+            output_tokens=api_response['usage']['completion_tokens']
+        )
+
+        return generated_response
+
+    def _stream_chunks(self, prompt: str) -> Iterator[str | GeneratedResponse]:
+        response = self._post(prompt, stream=True)
+        usage = None
+
+        with response:
+            for event in self._read_events(response):
+                if 'error' in event:
+                    raise GenerationError(
+                        f"OpenRouter HTTP request error: {event['error']}")
 
-            if 'error' in api_response:
-                raise GenerationError(
-                    f"OpenRouter HTTP request error: {api_response['error']}")
+                if event.get('usage'):
+                    usage = event['usage']
 
-            generated_response = GeneratedResponse(
-                value=api_response['choices'][0]['message']['content'],
-                input_tokens=api_response['usage']['prompt_tokens'],
-                output_tokens=api_response['usage']['completion_tokens']
+                for choice in event.get('choices', []):
+                    content = choice.get('delta', {}).get('content')
+                    if content:
+                        yield content
+
+        if usage is not None:
+            yield GeneratedResponse(
+                value='',
+                input_tokens=usage['prompt_tokens'],
+                output_tokens=usage['completion_tokens']
+            )
+
+    def _read_events(self, response: requests.Response) -> Iterator[dict]:
+        # Server-sent events, ignoring comments sent to keep the connection
+        # alive.
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith(SSE_DATA_PREFIX):
+                    continue
+
+                data = line[len(SSE_DATA_PREFIX):]
+                if data == SSE_DONE:
+                    return
+
+                yield json.loads(data)
+        except requests.RequestException as ex:
+            raise GenerationError(
+                'Cannot read response from OpenRouter') from ex
+
+    def _post(self, prompt: str, stream: bool) -> requests.Response:
+        try:
+            response = self._session.post(
+                url=self._api_url,
+                timeout=self._api_timeout / 1000,
+                headers=self._get_headers(),
+                data=json.dumps(self._get_request_data(prompt, stream)),
+                stream=stream
             )
+        except Exception as ex:
+            raise GenerationError(
+                'Cannot perform request to OpenRouter') from ex
 
-            return generated_response
-        else:
+        status_code: int = response.status_code
+        if status_code != 200:
+            response.close()
             raise GenerationError(
                 f"OpenRouter HTTP request error: {status_code}")
+
+        return response
+
+    def _get_headers(self) -> dict[str, str]:
+        return {
+            'Authorization': f"Bearer {self._api_key}"
+        }
+
+    def _get_request_data(self, prompt: str, stream: bool) -> dict[str, Any]:
+        data = {
+            'model': self._model_name,
+            'messages': [
+                {
+                    'role': "user",
+                    'content': prompt
+                }
+            ]
+        }
+        if stream:
+            data['stream'] = True
+            data['usage'] = {'include': True}
+
+        return data
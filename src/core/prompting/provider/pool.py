@@ -0,0 +1,345 @@
+"""Ollama client pool module."""
+
+from logging import getLogger
+import threading
+import time
+from timeit import default_timer as timer
+from typing import Any, AsyncIterator, Iterator
+
+from attr import dataclass
+
+from core.latency import LatencyStats
+
+LATENCY_PERCENTILES = (50, 95)
+"""Percentiles of the latencies reported for each host."""
+
+logger = getLogger()
+
+
+@dataclass
+class HostStatus():
+    """Defines the state of a host in the pool."""
+
+    host: str
+    """Host of the Ollama server."""
+
+    healthy: bool
+    """Whether the host receives requests. Failing hosts are ejected until
+    their cooldown ends."""
+
+    in_flight: int
+    """Number of requests being processed by the host."""
+
+    requests: int
+    """Total number of requests sent to the host."""
+
+    errors: int
+    """Total number of requests failed by the host."""
+
+    latencies: dict[str, tuple[float | None, ...]]
+    """Percentiles of the recent latencies of each method, in seconds."""
+
+
+class PooledHost():
+    """Routing state of a host in a pool."""
+
+    def __init__(self, name: str, client: Any):
+        self.name = name
+        self.client = client
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.ejected_until = 0.0
+        self.stats: dict[str, LatencyStats] = {}
+
+
+class OllamaClientPool():
+    """Routes the requests of an Ollama client to a pool of Ollama servers.
+
+    It has the `generate` and `embed` methods of the Ollama client, so it can
+    replace it. Each request is sent to the host with the fewest requests in
+    flight. Hosts failing with connection errors, timeouts or server errors
+    are ejected for a cooldown and then receive requests again, while the
+    failed request is retried on another host. Errors of the request itself
+    (4xx status) are raised without ejecting the host.
+
+    Streamed responses keep their host busy until consumed, and are only
+    retried if no chunk was received.
+    """
+
+    def __init__(
+        self,
+        clients: dict[str, Any],
+        cooldown: float = 30,
+        window: int = 100
+    ):
+        """
+        Args:
+            - clients: Ollama client of each host.
+            - cooldown: Seconds a failing host is ejected from the pool.
+            - window: Number of recent latencies kept per host and method.
+        """
+        if not clients:
+            raise ValueError('At least one host is required.')
+
+        self._hosts = [PooledHost(host, client)
+                       for host, client in clients.items()]
+        self._cooldown = cooldown
+        self._window = window
+        self._lock = threading.Lock()
+
+    def generate(self, *args, **kwargs) -> Any:
+        """Generate a response in a host of the pool, with the same arguments
+        of the Ollama client."""
+        return self._request('generate', args, kwargs)
+
+    def embed(self, *args, **kwargs) -> Any:
+        """Generate embeddings in a host of the pool, with the same arguments
+        of the Ollama client."""
+        return self._request('embed', args, kwargs)
+
+    def get_hosts(self) -> list[str]:
+        """Get the hosts of the pool."""
+        return [host.name for host in self._hosts]
+
+    def get_async(self, clients: dict[str, Any]) -> 'AsyncOllamaClientPool':
+        """Get a pool of async clients sharing the routing state of this
+        pool.
+
+        Args:
+            - clients: Async Ollama client of each host.
+        """
+        return AsyncOllamaClientPool(self, clients)
+
+    def get_statuses(self) -> list[HostStatus]:
+        """Get the state of each host."""
+        now = time.monotonic()
+        with self._lock:
+            return [HostStatus(
+                host=host.name,
+                healthy=host.ejected_until <= now,
+                in_flight=host.in_flight,
+                requests=host.requests,
+                errors=host.errors,
+                latencies={
+                    method: tuple(stats.get_percentile(percentile)
+                                  for percentile in LATENCY_PERCENTILES)
+                    for method, stats in host.stats.items()
+                }
+            ) for host in self._hosts]
+
+    def _request(self, method: str, args: tuple, kwargs: dict) -> Any:
+        if kwargs.get('stream'):
+            return self._stream(method, args, kwargs)
+
+        tried: set[str] = set()
+        while True:
+            host = self.acquire(tried)
+            start = timer()
+            try:
+                response = getattr(host.client, method)(*args, **kwargs)
+            except Exception as e:
+                if self.release(host, method, start, e) and \
+                        self.can_retry(tried):
+                    continue
+                raise
+
+            self.release(host, method, start)
+            return response
+
+    def _stream(self, method: str, args: tuple, kwargs: dict) -> Iterator[Any]:
+        tried: set[str] = set()
+        while True:
+            host = self.acquire(tried)
+            start = timer()
+            try:
+                chunks = iter(getattr(host.client, method)(*args, **kwargs))
+                first_chunk = next(chunks)
+            except StopIteration:
+                self.release(host, method, start)
+                return
+            except Exception as e:
+                if self.release(host, method, start, e) and \
+                        self.can_retry(tried):
+                    continue
+                raise
+
+            break
+
+        error = None
+        try:
+            yield first_chunk
+            yield from chunks
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.release(host, method, start, error)
+
+    def acquire(self, tried: set[str]) -> PooledHost:
+        """Choose the host of a request, counting it as in flight until
+        released.
+
+        Args:
+            - tried: Hosts already tried by the request. The chosen host is
+                added to it.
+
+        Returns:
+            Host with the fewest requests in flight, preferring healthy ones.
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [host for host in self._hosts
+                          if host.name not in tried]
+            # When all hosts are ejected, the one closest to the end of its
+            # cooldown is tried instead of failing the request.
+            healthy = [host for host in candidates
+                       if host.ejected_until <= now]
+            if not healthy:
+                healthy = [min(candidates, key=lambda host: host.ejected_until)]
+
+            host = min(healthy,
+                       key=lambda host: (host.in_flight, host.requests))
+            host.in_flight += 1
+            host.requests += 1
+            tried.add(host.name)
+
+        return host
+
+    def release(
+        self,
+        host: PooledHost,
+        method: str,
+        start: float,
+        error: Exception | None = None
+    ) -> bool:
+        """Finish a request of a host, recording its latency or ejecting the
+        host if it failed.
+
+        Args:
+            - host: Host acquired for the request.
+            - method: Client method requested.
+            - start: Start time of the request, from `timeit.default_timer`.
+            - error: Error that failed the request, if any.
+
+        Returns:
+            True if the request failed because of the host, so it can be
+            retried on another one.
+        """
+        elapsed = timer() - start
+        host_error = error is not None and _is_host_error(error)
+
+        with self._lock:
+            host.in_flight -= 1
+            if error is None:
+                if method not in host.stats:
+                    host.stats[method] = LatencyStats(self._window)
+                host.stats[method].record(elapsed)
+                host.ejected_until = 0.0
+            elif host_error:
+                host.errors += 1
+                host.ejected_until = time.monotonic() + self._cooldown
+
+        if host_error:
+            logger.warning('m=eject host=%s method=%s cooldown=%s e=%s',
+                           host.name, method, self._cooldown, error)
+
+        return host_error
+
+    def can_retry(self, tried: set[str]) -> bool:
+        """Check if a request can be retried on a host not tried yet.
+
+        Args:
+            - tried: Hosts already tried by the request.
+        """
+        return len(tried) < len(self._hosts)
+
+
+class AsyncOllamaClientPool():
+    """Routes the requests of an async Ollama client to a pool of Ollama
+    servers, sharing the routing state of a pool.
+
+    It can only be used in the event loop where its clients are used.
+    """
+
+    def __init__(self, pool: OllamaClientPool, clients: dict[str, Any]):
+        """
+        Args:
+            - pool: Pool whose routing state is shared.
+            - clients: Async Ollama client of each host.
+        """
+        self._pool = pool
+        self._clients = clients
+
+    async def generate(self, *args, **kwargs) -> Any:
+        """Generate a response in a host of the pool, with the same arguments
+        of the async Ollama client."""
+        return await self._request('generate', args, kwargs)
+
+    async def embed(self, *args, **kwargs) -> Any:
+        """Generate embeddings in a host of the pool, with the same arguments
+        of the async Ollama client."""
+        return await self._request('embed', args, kwargs)
+
+    async def _request(self, method: str, args: tuple, kwargs: dict) -> Any:
+        if kwargs.get('stream'):
+            return self._stream(method, args, kwargs)
+
+        tried: set[str] = set()
+        while True:
+            host = self._pool.acquire(tried)
+            start = timer()
+            try:
+                response = await getattr(
+                    self._clients[host.name], method)(*args, **kwargs)
+            except Exception as e:
+                if self._pool.release(host, method, start, e) and \
+                        self._pool.can_retry(tried):
+                    continue
+                raise
+
+            self._pool.release(host, method, start)
+            return response
+
+    async def _stream(
+        self,
+        method: str,
+        args: tuple,
+        kwargs: dict
+    ) -> AsyncIterator[Any]:
+        tried: set[str] = set()
+        while True:
+            host = self._pool.acquire(tried)
+            start = timer()
+            try:
+                chunks = await getattr(
+                    self._clients[host.name], method)(*args, **kwargs)
+                first_chunk = await anext(chunks)
+            except StopAsyncIteration:
+                self._pool.release(host, method, start)
+                return
+            except Exception as e:
+                if self._pool.release(host, method, start, e) and \
+                        self._pool.can_retry(tried):
+                    continue
+                raise
+
+            break
+
+        error = None
+        try:
+            yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._pool.release(host, method, start, error)
+
+
+def _is_host_error(error: Exception) -> bool:
+    # Errors with a status below 500 are caused by the request (e.g. a model
+    # not found), while the others are caused by the host.
+    status_code = getattr(error, 'status_code', None)
+    return status_code is None or status_code >= 500
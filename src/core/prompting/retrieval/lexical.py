@@ -0,0 +1,233 @@
+"""Lexical retrieval module."""
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from typing import Collection
+
+TOKEN_PATTERN = re.compile(r"\w+(?:[\-\.:/]\w+)*")
+"""Pattern of a token, keeping identifiers like error codes and SKUs
+(e.g. ERR-404, v1.2.3) as a single token."""
+
+TOKEN_PART_SEPARATOR = re.compile(r"[\-\.:/]")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split a text in lowercase tokens.
+
+    Compound tokens are kept whole and also split in their parts, so both
+    `ERR-404` and `404` match a text containing `ERR-404`.
+
+    Args:
+        - text: Text to be tokenized.
+
+    Returns:
+        Tokens of the text.
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        parts = TOKEN_PART_SEPARATOR.split(token)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part)
+
+    return tokens
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[str]],
+    k: int = 60
+) -> list[tuple[str, float]]:
+    """Fuse rankings using reciprocal rank fusion.
+
+    Args:
+        - rankings: Rankings of ids, each one ordered by relevance.
+        - k: Constant that reduces the weight of top ranks.
+
+    Returns:
+        Ids with their fused scores, ordered by relevance.
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, 1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class LexicalIndex():
+    """Inverted index scoring documents with BM25."""
+
+    def __init__(
+        self,
+        path: str = '',
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        """
+        Args:
+            - path: Path of the JSON file where the index is saved. If empty,
+                the index is kept only in memory.
+            - k1: BM25 term frequency saturation.
+            - b: BM25 document length normalization.
+        """
+        self._path = path
+        self._k1 = k1
+        self._b = b
+        self._lock = threading.Lock()
+        self._postings: dict[str, dict[str, int]] = {}
+        self._documents: dict[str, tuple[str, dict[str, int]]] = {}
+        self._lengths: dict[str, int] = {}
+        self._total_length = 0
+
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                for doc_id, (file_name, frequencies) in json.load(file).items():
+                    self._add(doc_id, file_name, frequencies)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, ids: list[str], texts: list[str], file_names: list[str]):
+        """Add documents to the index, replacing existing ones with the same
+        ids.
+
+        Args:
+            - ids: Ids of the documents.
+            - texts: Texts of the documents.
+            - file_names: Names of the files the documents belong to.
+        """
+        with self._lock:
+            for doc_id, text, file_name in zip(ids, texts, file_names):
+                self._remove(doc_id)
+
+                frequencies: dict[str, int] = {}
+                for token in tokenize(text):
+                    frequencies[token] = frequencies.get(token, 0) + 1
+
+                self._add(doc_id, file_name, frequencies)
+
+    def get_ids(self, file_names: list[str]) -> list[str]:
+        """Get the ids of the documents of files.
+
+        Args:
+            - file_names: Names of the files.
+        """
+        file_names_set = set(file_names)
+        with self._lock:
+            return [doc_id for doc_id, (file_name, _) in self._documents.items()
+                    if file_name in file_names_set]
+
+    def remove(self, ids: list[str]):
+        """Remove documents from the index.
+
+        Args:
+            - ids: Ids of the documents.
+        """
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def remove_files(self, file_names: list[str]):
+        """Remove all documents of files from the index.
+
+        Args:
+            - file_names: Names of the files.
+        """
+        file_names_set = set(file_names)
+        with self._lock:
+            ids = [doc_id for doc_id, (file_name, _) in self._documents.items()
+                   if file_name in file_names_set]
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        file_name: str = '',
+        file_names: Collection[str] | None = None
+    ) -> list[tuple[str, float]]:
+        """Search documents matching the query terms.
+
+        Args:
+            - query: Query text.
+            - top_k: Maximum number of documents to return.
+            - file_name: Name of the file for results filtering.
+            - file_names: Names of the files for results filtering.
+
+        Returns:
+            Ids of the documents with their scores, ordered by relevance.
+        """
+        allowed_file_names = set(file_names) if file_names is not None \
+            else None
+        if file_name:
+            allowed_file_names = {file_name}
+
+        with self._lock:
+            total_documents = len(self._documents)
+            if total_documents == 0:
+                return []
+
+            average_length = self._total_length / total_documents
+            scores: dict[str, float] = {}
+
+            for token in set(tokenize(query)):
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (total_documents - len(postings) + 0.5) /
+                               (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    if (allowed_file_names is not None and
+                            self._documents[doc_id][0] not in allowed_file_names):
+                        continue
+
+                    length_norm = 1 - self._b + self._b * \
+                        self._lengths[doc_id] / average_length
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * \
+                        frequency * (self._k1 + 1) / \
+                        (frequency + self._k1 * length_norm)
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def save(self):
+        """Save the index, if it has a path."""
+        if not self._path:
+            return
+
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{self._path}.tmp"
+        with self._lock:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(self._documents, file)
+            os.replace(temp_path, self._path)
+
+    def _add(self, doc_id: str, file_name: str, frequencies: dict[str, int]):
+        self._documents[doc_id] = (file_name, frequencies)
+        length = sum(frequencies.values())
+        self._lengths[doc_id] = length
+        self._total_length += length
+
+        for token, frequency in frequencies.items():
+            self._postings.setdefault(token, {})[doc_id] = frequency
+
+    def _remove(self, doc_id: str):
+        if doc_id not in self._documents:
+            return
+
+        _, frequencies = self._documents.pop(doc_id)
+        self._total_length -= self._lengths.pop(doc_id)
+
+        for token in frequencies:
+            postings = self._postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[token]
@@ -0,0 +1,55 @@
+"""Maximal marginal relevance module."""
+
+from typing import Sequence
+
+import numpy as np
+
+from core.prompting.retrieval.similarity import normalize
+
+
+def maximal_marginal_relevance(
+    query: Sequence[float],
+    embeddings: Sequence[Sequence[float]],
+    top_k: int,
+    lambda_mult: float = 0.5
+) -> list[int]:
+    """Select embeddings relevant to a query and diverse among themselves.
+
+    Each step selects the candidate maximizing
+    `lambda_mult * relevance - (1 - lambda_mult) * redundancy`, where
+    relevance is the cosine similarity to the query and redundancy is the
+    highest cosine similarity to the already selected candidates.
+
+    Args:
+        - query: Query embedding.
+        - embeddings: Candidate embeddings.
+        - top_k: Number of candidates to select.
+        - lambda_mult: Trade-off between relevance (1) and diversity (0).
+
+    Returns:
+        Indexes of the selected candidates, in selection order.
+    """
+    if not 0 <= lambda_mult <= 1:
+        raise ValueError('Lambda must be between 0 and 1.')
+
+    if len(embeddings) == 0 or top_k < 1:
+        return []
+
+    candidates = normalize(np.asarray(embeddings, dtype=np.float32))
+    relevance = candidates @ normalize(np.asarray(query, dtype=np.float32))
+    similarities = candidates @ candidates.T
+
+    redundancy = np.zeros(len(candidates), dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    selected: list[int] = []
+
+    for _ in range(min(top_k, len(candidates))):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        index = int(np.argmax(scores))
+
+        selected.append(index)
+        available[index] = False
+        np.maximum(redundancy, similarities[index], out=redundancy)
+
+    return selected
@@ -0,0 +1,155 @@
+"""Context packing module."""
+
+from typing import Iterable
+import math
+
+from attr import dataclass
+
+CHARS_PER_TOKEN = 4
+"""Average number of characters per token used to estimate text sizes."""
+
+MIN_OVERLAP_LENGTH = 16
+"""Minimum number of characters shared by adjacent chunks to be considered
+an overlap, avoiding trimming text that only coincidentally matches."""
+
+
+@dataclass
+class ContextChunk:
+    """Chunk of context to be packed."""
+    id: str
+    text: str
+    file_name: str = ''
+    chunk_index: int | None = None
+
+
+@dataclass
+class _Block:
+    file_name: str
+    first_index: int | None
+    last_index: int | None
+    rank: int
+    chunks: list[ContextChunk]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens of a text.
+
+    Args:
+        - text: Text to be estimated.
+
+    Returns:
+        Estimated number of tokens.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def pack_context(chunks: Iterable[ContextChunk], max_tokens: int = 0) -> str:
+    """Pack chunks into a context limited by a token budget.
+
+    Chunks are selected in relevance order while they fit the budget, skipping
+    duplicated texts. Selected chunks adjacent in the same file are merged,
+    dropping the text they overlap, and blocks are output in the order of
+    their most relevant chunk. Sizes are estimated conservatively, so merging
+    never makes the context exceed the budget.
+
+    Args:
+        - chunks: Chunks ordered by relevance, most relevant first.
+        - max_tokens: Maximum estimated tokens of the context. 0 means no
+            limit.
+
+    Returns:
+        Context packed or empty string.
+    """
+    selected: list[ContextChunk] = []
+    seen_texts = set()
+    used_tokens = 0
+
+    for chunk in chunks:
+        text = chunk.text.strip()
+        if not text or text in seen_texts:
+            continue
+
+        tokens = estimate_tokens(_get_header(chunk.id) + text + '\n\n')
+        if max_tokens > 0 and used_tokens + tokens > max_tokens:
+            continue
+
+        seen_texts.add(text)
+        selected.append(chunk)
+        used_tokens += tokens
+
+    blocks = _merge_adjacent(selected)
+    blocks.sort(key=lambda block: block.rank)
+
+    return ''.join(_render_block(block) for block in blocks)
+
+
+def _merge_adjacent(chunks: list[ContextChunk]) -> list[_Block]:
+    blocks: list[_Block] = []
+    positioned = sorted(
+        (
+            (rank, chunk) for rank, chunk in enumerate(chunks)
+            if chunk.file_name and chunk.chunk_index is not None
+        ),
+        key=lambda item: (item[1].file_name, item[1].chunk_index)
+    )
+
+    for rank, chunk in positioned:
+        previous = blocks[-1] if blocks else None
+        if (previous is not None
+                and previous.file_name == chunk.file_name
+                and previous.last_index is not None
+                and chunk.chunk_index == previous.last_index + 1):
+            previous.chunks.append(chunk)
+            previous.last_index = chunk.chunk_index
+            previous.rank = min(previous.rank, rank)
+            continue
+
+        blocks.append(_Block(
+            chunk.file_name, chunk.chunk_index, chunk.chunk_index, rank, [chunk]))
+
+    for rank, chunk in enumerate(chunks):
+        if not chunk.file_name or chunk.chunk_index is None:
+            blocks.append(_Block(chunk.file_name, None, None, rank, [chunk]))
+
+    return blocks
+
+
+def _render_block(block: _Block) -> str:
+    if len(block.chunks) == 1:
+        chunk_id = block.chunks[0].id
+    else:
+        chunk_id = f"{block.file_name}:{block.first_index}-{block.last_index}"
+
+    previous = block.chunks[0].text.strip()
+    parts = [previous]
+    for chunk in block.chunks[1:]:
+        text = chunk.text.strip()
+        overlap = _get_overlap(previous, text)
+        if overlap > 0:
+            parts.append(text[overlap:])
+        else:
+            parts.append('\n' + text)
+        previous = text
+
+    return _get_header(chunk_id) + ''.join(parts) + '\n\n'
+
+
+def _get_header(chunk_id: str) -> str:
+    return f"<< Context {chunk_id} >>\n"
+
+
+def _get_overlap(previous: str, text: str) -> int:
+    """Get the length of the longest suffix of `previous` that is a prefix of
+    `text`."""
+    if len(text) < MIN_OVERLAP_LENGTH:
+        return 0
+
+    probe = text[:MIN_OVERLAP_LENGTH]
+    start = max(0, len(previous) - len(text))
+    while True:
+        start = previous.find(probe, start)
+        if start == -1:
+            return 0
+        if text.startswith(previous[start:]):
+            return len(previous) - start
+        start += 1
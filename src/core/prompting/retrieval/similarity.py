@@ -0,0 +1,36 @@
+"""Vector similarity module."""
+
+from typing import Sequence
+
+import numpy as np
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale vectors to unit length along the last axis, so their dot
+    product is their cosine similarity. Zero vectors are kept as zeros.
+
+    Args:
+        - vectors: Vector or matrix with a vector per row.
+    """
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def cosine_similarities(
+    query: Sequence[float],
+    embeddings: Sequence[Sequence[float]]
+) -> list[float]:
+    """Calculate the cosine similarity of a query to each embedding.
+
+    Args:
+        - query: Query embedding.
+        - embeddings: Embeddings to compare with the query.
+
+    Returns:
+        Similarity of each embedding, in the same order.
+    """
+    if len(embeddings) == 0:
+        return []
+
+    vectors = normalize(np.asarray(embeddings, dtype=np.float32))
+    return (vectors @ normalize(np.asarray(query, dtype=np.float32))).tolist()
@@ -0,0 +1,115 @@
+"""Vector store module."""
+
+from abc import abstractmethod
+from typing import Any, Sequence
+
+from attr import dataclass
+
+Filter = dict[str, Any]
+"""Metadata filter, matching entries whose metadata field equals the value.
+A list value matches any of its items. Multiple fields must all match."""
+
+
+@dataclass
+class VectorMatch():
+    """Defines an entry found in a vector store."""
+
+    id: str
+    """Id of the entry."""
+
+    document: str
+    """Text of the entry."""
+
+    metadata: dict[str, Any]
+    """Metadata of the entry."""
+
+    distance: float = 0.0
+    """Cosine distance to the query. 0 when not found by a query."""
+
+    embedding: Sequence[float] | None = None
+    """Embedding of the entry, when requested."""
+
+
+class VectorStore():
+    """Stores embeddings of a collection and searches them by similarity."""
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[Sequence[float]],
+        documents: list[str],
+        metadatas: list[dict[str, Any]]
+    ):
+        """Add entries, replacing existing ones with the same ids.
+
+        Args:
+            - ids: Ids of the entries.
+            - embeddings: Embeddings of the entries.
+            - documents: Texts of the entries.
+            - metadatas: Metadata of the entries.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def delete(self, where: Filter):
+        """Remove entries matching a filter.
+
+        Args:
+            - where: Metadata filter of the entries to remove.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def query(
+        self,
+        embedding: Sequence[float],
+        top_k: int,
+        where: Filter | None = None,
+        include_embeddings: bool = False
+    ) -> list[VectorMatch]:
+        """Find the entries most similar to an embedding.
+
+        Args:
+            - embedding: Embedding to compare.
+            - top_k: Maximum number of entries to return.
+            - where: Metadata filter of the entries to search.
+            - include_embeddings: Whether embeddings are returned.
+
+        Returns:
+            Entries found, ordered by similarity.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get(
+        self,
+        ids: list[str],
+        include_embeddings: bool = False
+    ) -> list[VectorMatch]:
+        """Get entries by id.
+
+        Args:
+            - ids: Ids of the entries.
+            - include_embeddings: Whether embeddings are returned.
+
+        Returns:
+            Entries found. Ids not found are ignored.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def count(self) -> int:
+        """Get the number of entries in the store."""
+        raise NotImplementedError()
+
+    def persist(self):
+        """Ensure all changes are saved. Stores that save on every change do
+        not need to override it."""
+        return
+
+    @abstractmethod
+    def drop(self):
+        """Remove the store and all its entries. Does nothing if the store was
+        never written."""
+        raise NotImplementedError()
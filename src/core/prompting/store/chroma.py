@@ -0,0 +1,128 @@
+"""Chroma vector store module."""
+
+from typing import Any, Sequence
+
+from chromadb.api import ClientAPI
+from chromadb.api.models.Collection import Collection
+from chromadb.errors import NotFoundError
+
+from core.prompting.store.base import Filter, VectorMatch, VectorStore
+
+
+class ChromaVectorStore(VectorStore):
+    """Stores embeddings in a Chroma collection, indexed with HNSW.
+
+    Suited for large collections, where approximate search is faster than
+    comparing all embeddings.
+    """
+
+    def __init__(
+        self,
+        db: ClientAPI,
+        collection_name: str
+    ):
+        """
+        Args:
+            - db: Client of the Chroma database.
+            - collection_name: Name of the collection.
+        """
+        self._db = db
+        self._collection_name = collection_name
+
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[Sequence[float]],
+        documents: list[str],
+        metadatas: list[dict[str, Any]]
+    ):
+        self._get_or_create_collection().upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas
+        )
+
+    def delete(self, where: Filter):
+        self._get_or_create_collection().delete(
+            where=self._get_where(where))
+
+    def query(
+        self,
+        embedding: Sequence[float],
+        top_k: int,
+        where: Filter | None = None,
+        include_embeddings: bool = False
+    ) -> list[VectorMatch]:
+        include = ['documents', 'metadatas', 'distances']
+        if include_embeddings:
+            include.append('embeddings')
+
+        results = self._get_or_create_collection().query(
+            query_embeddings=[embedding],
+            n_results=top_k,
+            where=self._get_where(where) if where else None,
+            include=include
+        )
+
+        return [
+            VectorMatch(
+                id=results['ids'][0][index],
+                document=results['documents'][0][index],
+                metadata=results['metadatas'][0][index],
+                distance=results['distances'][0][index],
+                embedding=(results['embeddings'][0][index]
+                           if include_embeddings else None)
+            )
+            for index in range(len(results['ids'][0]))
+        ]
+
+    def get(
+        self,
+        ids: list[str],
+        include_embeddings: bool = False
+    ) -> list[VectorMatch]:
+        include = ['documents', 'metadatas']
+        if include_embeddings:
+            include.append('embeddings')
+
+        results = self._get_or_create_collection().get(
+            ids=ids,
+            include=include
+        )
+
+        return [
+            VectorMatch(
+                id=results['ids'][index],
+                document=results['documents'][index],
+                metadata=results['metadatas'][index],
+                embedding=(results['embeddings'][index]
+                           if include_embeddings else None)
+            )
+            for index in range(len(results['ids']))
+        ]
+
+    def count(self) -> int:
+        return self._get_or_create_collection().count()
+
+    def drop(self):
+        try:
+            self._db.delete_collection(self._collection_name)
+        except (NotFoundError, ValueError):
+            # Collections are only created when first used, so sessions that
+            # never indexed files have none.
+            pass
+
+    def _get_or_create_collection(self) -> Collection:
+        return self._db.create_collection(
+            name=self._collection_name,
+            get_or_create=True,
+            metadata={'hnsw:space': 'cosine'}
+        )
+
+    def _get_where(self, where: Filter) -> dict[str, Any]:
+        conditions = [
+            {field: {'$in': value} if isinstance(value, list) else value}
+            for field, value in where.items()
+        ]
+        return conditions[0] if len(conditions) == 1 else {'$and': conditions}
@@ -0,0 +1,375 @@
+"""NumPy vector store module."""
+
+from logging import getLogger
+import json
+import os
+import shutil
+import threading
+from typing import Any, Sequence
+
+import numpy as np
+
+from core.prompting.retrieval.similarity import normalize
+from core.prompting.store.base import Filter, VectorMatch, VectorStore
+from core.prompting.store.quantization import (
+    QUANTIZATION_DTYPES,
+    QUANTIZATION_FLOAT32,
+    QUANTIZATION_INT8,
+    QUANTIZATIONS,
+    dequantize,
+    quantize,
+    score,
+    top_k_indexes
+)
+
+INITIAL_CAPACITY = 1024
+
+logger = getLogger()
+
+
+class NumpyVectorStore(VectorStore):
+    """Stores embeddings in a contiguous matrix memory-mapped on disk and
+    searches them exactly.
+
+    Embeddings are normalized when stored, so a query is a single
+    matrix-vector product followed by a partial sort of the scores. Suited for
+    small collections, where it avoids the startup, disk writes and latency
+    of an approximate index.
+
+    Embeddings can be stored quantized as float16, or int8 with a scale per
+    vector, reducing disk and memory usage. Quantized searches can rescore the
+    best candidates with float32 embeddings, kept in a separate file that is
+    only read for the shortlisted rows.
+    """
+
+    VECTORS_FILE = 'vectors.bin'
+    SCALES_FILE = 'scales.f32'
+    ORIGINALS_FILE = 'originals.f32'
+    RECORDS_FILE = 'records.json'
+
+    def __init__(
+        self,
+        path: str,
+        quantization: str = QUANTIZATION_FLOAT32,
+        rescore: bool = False,
+        rescore_factor: int = 4
+    ):
+        """
+        Args:
+            - path: Directory where the store files are saved.
+            - quantization: Type of the stored embeddings (float32, float16,
+                int8). Existing stores keep the type they were created with.
+            - rescore: Whether quantized results are rescored with float32
+                embeddings. Requires keeping the float32 embeddings on disk.
+            - rescore_factor: Candidates per result shortlisted for
+                rescoring.
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Invalid quantization {quantization}.")
+
+        self._path = path
+        self._quantization = quantization
+        self._rescore = rescore and quantization != QUANTIZATION_FLOAT32
+        self._rescore_factor = rescore_factor
+        self._lock = threading.RLock()
+        self._dimensions = 0
+        self._vectors: np.memmap | None = None
+        self._scales: np.memmap | None = None
+        self._originals: np.memmap | None = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: list[str | None] = []
+        self._documents: list[str | None] = []
+        self._metadatas: list[dict[str, Any] | None] = []
+        self._rows: dict[str, int] = {}
+        self._free_rows: list[int] = []
+        self._columns: dict[str, np.ndarray] = {}
+
+        records_path = os.path.join(path, self.RECORDS_FILE)
+        if os.path.exists(records_path):
+            self._load(records_path)
+
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[Sequence[float]],
+        documents: list[str],
+        metadatas: list[dict[str, Any]]
+    ):
+        if not ids:
+            return
+
+        vectors = normalize(np.asarray(embeddings, dtype=np.float32))
+        values, scales = quantize(vectors, self._quantization)
+
+        with self._lock:
+            if self._vectors is None:
+                self._dimensions = vectors.shape[1]
+                os.makedirs(self._path, exist_ok=True)
+                self._resize(max(INITIAL_CAPACITY, len(ids)))
+            elif vectors.shape[1] != self._dimensions:
+                raise ValueError(
+                    f"Embeddings must have {self._dimensions} dimensions.")
+
+            rows = [self._allocate_row(chunk_id) for chunk_id in ids]
+            if len(self._ids) > self._capacity():
+                self._resize(max(len(self._ids), self._capacity() * 2))
+
+            self._vectors[rows] = values
+            if self._scales is not None:
+                self._scales[rows] = scales
+            if self._originals is not None:
+                self._originals[rows] = vectors
+            self._alive[rows] = True
+
+            for row, chunk_id, document, metadata in zip(
+                    rows, ids, documents, metadatas):
+                self._ids[row] = chunk_id
+                self._documents[row] = document
+                self._metadatas[row] = metadata
+                self._rows[chunk_id] = row
+
+            self._columns.clear()
+
+    def delete(self, where: Filter):
+        with self._lock:
+            for row in np.flatnonzero(self._get_mask(where)):
+                del self._rows[self._ids[row]]
+                self._ids[row] = None
+                self._documents[row] = None
+                self._metadatas[row] = None
+                self._alive[row] = False
+                self._free_rows.append(int(row))
+
+            self._columns.clear()
+
+    def query(
+        self,
+        embedding: Sequence[float],
+        top_k: int,
+        where: Filter | None = None,
+        include_embeddings: bool = False
+    ) -> list[VectorMatch]:
+        vector = normalize(np.asarray(embedding, dtype=np.float32))
+
+        with self._lock:
+            if self._vectors is None or top_k < 1:
+                return []
+
+            total_rows = len(self._ids)
+            scores = score(
+                self._vectors[:total_rows],
+                self._scales[:total_rows] if self._scales is not None
+                else None,
+                vector)
+            candidate_rows = np.flatnonzero(self._get_mask(where or {}))
+            if len(candidate_rows) == 0:
+                return []
+
+            candidate_scores = scores[candidate_rows]
+
+            if self._originals is not None:
+                shortlist = candidate_rows[top_k_indexes(
+                    candidate_scores, top_k * self._rescore_factor)]
+                candidate_rows = np.sort(shortlist)
+                candidate_scores = self._originals[candidate_rows] @ vector
+
+            return [
+                self._get_match(
+                    candidate_rows[index],
+                    1.0 - float(candidate_scores[index]),
+                    include_embeddings)
+                for index in top_k_indexes(candidate_scores, top_k)
+            ]
+
+    def get(
+        self,
+        ids: list[str],
+        include_embeddings: bool = False
+    ) -> list[VectorMatch]:
+        with self._lock:
+            return [
+                self._get_match(self._rows[chunk_id], 0.0, include_embeddings)
+                for chunk_id in ids if chunk_id in self._rows
+            ]
+
+    def count(self) -> int:
+        return len(self._rows)
+
+    def persist(self):
+        with self._lock:
+            if self._vectors is None:
+                return
+
+            for array in (self._vectors, self._scales, self._originals):
+                if array is not None:
+                    array.flush()
+
+            records_path = os.path.join(self._path, self.RECORDS_FILE)
+            temp_path = f"{records_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump({
+                    'dimensions': self._dimensions,
+                    'quantization': self._quantization,
+                    'rescore': self._rescore,
+                    'ids': self._ids,
+                    'documents': self._documents,
+                    'metadatas': self._metadatas
+                }, file)
+            os.replace(temp_path, records_path)
+
+    def drop(self):
+        with self._lock:
+            self._vectors = None
+            self._scales = None
+            self._originals = None
+            self._dimensions = 0
+            self._alive = np.zeros(0, dtype=bool)
+            self._ids = []
+            self._documents = []
+            self._metadatas = []
+            self._rows = {}
+            self._free_rows = []
+            self._columns.clear()
+
+            if os.path.exists(self._path):
+                shutil.rmtree(self._path)
+
+    def _load(self, records_path: str):
+        with open(records_path, 'r', encoding='utf-8') as file:
+            records = json.load(file)
+
+        if (records['quantization'] != self._quantization
+                or records['rescore'] != self._rescore):
+            logger.warning(
+                'm=load path=%s quantization=%s rescore=%s '
+                'msg=Keeping the settings the store was created with.',
+                self._path, records['quantization'], records['rescore'])
+
+        self._dimensions = records['dimensions']
+        self._quantization = records['quantization']
+        self._rescore = records['rescore']
+        self._ids = records['ids']
+        self._documents = records['documents']
+        self._metadatas = records['metadatas']
+
+        for row, chunk_id in enumerate(self._ids):
+            if chunk_id is None:
+                self._free_rows.append(row)
+            else:
+                self._rows[chunk_id] = row
+
+        vectors_path = os.path.join(self._path, self.VECTORS_FILE)
+        capacity = os.path.getsize(vectors_path) // (
+            self._dimensions *
+            np.dtype(QUANTIZATION_DTYPES[self._quantization]).itemsize)
+        self._open_arrays(capacity)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[list(self._rows.values())] = True
+
+    def _capacity(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    def _resize(self, capacity: int):
+        for array in (self._vectors, self._scales, self._originals):
+            if array is not None:
+                array.flush()
+        self._vectors = None
+        self._scales = None
+        self._originals = None
+
+        self._open_arrays(capacity, resize=True)
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive[:capacity]
+        self._alive = alive
+
+    def _open_arrays(self, capacity: int, resize: bool = False):
+        self._vectors = self._open_array(
+            self.VECTORS_FILE,
+            QUANTIZATION_DTYPES[self._quantization],
+            (capacity, self._dimensions),
+            resize)
+
+        if self._quantization == QUANTIZATION_INT8:
+            self._scales = self._open_array(
+                self.SCALES_FILE, np.float32, (capacity,), resize)
+
+        if self._rescore:
+            self._originals = self._open_array(
+                self.ORIGINALS_FILE,
+                np.float32,
+                (capacity, self._dimensions),
+                resize)
+
+    def _open_array(
+        self,
+        file_name: str,
+        dtype: type,
+        shape: tuple[int, ...],
+        resize: bool
+    ) -> np.memmap:
+        array_path = os.path.join(self._path, file_name)
+        if resize:
+            with open(array_path, 'ab') as file:
+                file.truncate(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+
+        return np.memmap(array_path, dtype=dtype, mode='r+', shape=shape)
+
+    def _allocate_row(self, chunk_id: str) -> int:
+        if chunk_id in self._rows:
+            return self._rows[chunk_id]
+
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            row = len(self._ids)
+            self._ids.append(None)
+            self._documents.append(None)
+            self._metadatas.append(None)
+
+        # Reserve the row, so repeated ids in the same upsert share it.
+        self._rows[chunk_id] = row
+        return row
+
+    def _get_mask(self, where: Filter) -> np.ndarray:
+        mask = self._alive[:len(self._ids)].copy()
+
+        for field, value in where.items():
+            column = self._get_column(field)
+            if isinstance(value, list):
+                mask &= np.isin(column, np.asarray(value, dtype=object))
+            else:
+                mask &= column == value
+
+        return mask
+
+    def _get_column(self, field: str) -> np.ndarray:
+        if field not in self._columns:
+            column = np.empty(len(self._metadatas), dtype=object)
+            column[:] = [metadata.get(field) if metadata else None
+                         for metadata in self._metadatas]
+            self._columns[field] = column
+
+        return self._columns[field]
+
+    def _get_embedding(self, row: int) -> np.ndarray:
+        if self._originals is not None:
+            return np.array(self._originals[row])
+
+        return dequantize(
+            self._vectors[row],
+            self._scales[row] if self._scales is not None else None)
+
+    def _get_match(
+        self,
+        row: int,
+        distance: float,
+        include_embeddings: bool
+    ) -> VectorMatch:
+        return VectorMatch(
+            id=self._ids[row],
+            document=self._documents[row],
+            metadata=self._metadatas[row],
+            distance=distance,
+            embedding=self._get_embedding(row) if include_embeddings else None
+        )
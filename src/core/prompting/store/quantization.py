@@ -0,0 +1,205 @@
+"""Embedding quantization module."""
+
+from attr import dataclass
+import numpy as np
+
+from core.prompting.retrieval.similarity import normalize
+
+QUANTIZATION_FLOAT32 = 'float32'
+QUANTIZATION_FLOAT16 = 'float16'
+QUANTIZATION_INT8 = 'int8'
+QUANTIZATIONS = [QUANTIZATION_FLOAT32, QUANTIZATION_FLOAT16, QUANTIZATION_INT8]
+
+QUANTIZATION_DTYPES = {
+    QUANTIZATION_FLOAT32: np.float32,
+    QUANTIZATION_FLOAT16: np.float16,
+    QUANTIZATION_INT8: np.int8
+}
+
+INT8_MAX = 127
+
+SCORE_BLOCK_ROWS = 8192
+"""Rows converted to float32 at a time when scoring quantized vectors, which
+bounds the memory used by a query."""
+
+
+def quantize(
+    vectors: np.ndarray,
+    quantization: str
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Quantize float32 vectors.
+
+    Args:
+        - vectors: Vectors to quantize, one per row.
+        - quantization: Quantization type (float32, float16, int8).
+
+    Returns:
+        Quantized vectors and, for int8, the scale of each vector.
+    """
+    if quantization == QUANTIZATION_INT8:
+        scales = np.abs(vectors).max(axis=-1) / INT8_MAX
+        scales = np.where(scales == 0, 1, scales).astype(np.float32)
+        values = np.rint(vectors / scales[..., np.newaxis])
+        return values.astype(np.int8), scales
+
+    return vectors.astype(QUANTIZATION_DTYPES[quantization]), None
+
+
+def dequantize(
+    values: np.ndarray,
+    scales: np.ndarray | None
+) -> np.ndarray:
+    """Convert quantized vectors back to float32.
+
+    Args:
+        - values: Quantized vectors, one per row.
+        - scales: Scale of each vector, for int8 vectors.
+
+    Returns:
+        Approximated float32 vectors.
+    """
+    vectors = values.astype(np.float32)
+    if scales is not None:
+        vectors *= scales[..., np.newaxis]
+
+    return vectors
+
+
+def score(
+    values: np.ndarray,
+    scales: np.ndarray | None,
+    query: np.ndarray
+) -> np.ndarray:
+    """Calculate the dot product of quantized vectors and a float32 query.
+
+    Args:
+        - values: Quantized vectors, one per row.
+        - scales: Scale of each vector, for int8 vectors.
+        - query: Query vector.
+
+    Returns:
+        Score of each vector.
+    """
+    if values.dtype == np.float32:
+        return values @ query
+
+    scores = np.empty(len(values), dtype=np.float32)
+    for start in range(0, len(values), SCORE_BLOCK_ROWS):
+        block = values[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+        scores[start:start + SCORE_BLOCK_ROWS] = block @ query
+
+    if scales is not None:
+        scores *= scales
+
+    return scores
+
+
+def top_k_indexes(scores: np.ndarray, k: int) -> np.ndarray:
+    """Get the indexes of the highest scores, ordered by score.
+
+    Args:
+        - scores: Scores to sort.
+        - k: Number of indexes to return.
+    """
+    k = min(k, len(scores))
+    if k < 1:
+        return np.zeros(0, dtype=np.int64)
+
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def get_bytes_per_vector(
+    dimensions: int,
+    quantization: str,
+    rescore: bool
+) -> int:
+    """Get the storage size of a vector.
+
+    Args:
+        - dimensions: Dimensions of the vector.
+        - quantization: Quantization type.
+        - rescore: Whether float32 vectors are also stored for rescoring.
+    """
+    size = dimensions * np.dtype(QUANTIZATION_DTYPES[quantization]).itemsize
+    if quantization == QUANTIZATION_INT8:
+        size += np.dtype(np.float32).itemsize
+    if rescore and quantization != QUANTIZATION_FLOAT32:
+        size += dimensions * np.dtype(np.float32).itemsize
+
+    return size
+
+
+@dataclass
+class QuantizationReportEntry():
+    """Defines the result of a quantization setting in a report."""
+
+    quantization: str
+    """Quantization type."""
+
+    rescore: bool
+    """Whether results were rescored with float32 vectors."""
+
+    searched_bytes: int
+    """Size of the vectors scanned by queries, in bytes."""
+
+    stored_bytes: int
+    """Size of all stored vectors, in bytes."""
+
+    recall: float
+    """Average fraction of the exact top-k results found."""
+
+
+def get_quantization_report(
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    top_k: int = 10,
+    rescore_factor: int = 4
+) -> list[QuantizationReportEntry]:
+    """Compare recall and size of each quantization setting against exact
+    float32 search.
+
+    Args:
+        - embeddings: Corpus embeddings, one per row.
+        - queries: Query embeddings, one per row.
+        - top_k: Number of results per query.
+        - rescore_factor: Candidates per result shortlisted for rescoring.
+
+    Returns:
+        One entry per quantization and rescoring setting.
+    """
+    embeddings = normalize(embeddings.astype(np.float32))
+    queries = normalize(queries.astype(np.float32))
+    total, dimensions = embeddings.shape
+    expected = [set(top_k_indexes(embeddings @ query, top_k))
+                for query in queries]
+
+    entries = []
+    for quantization in QUANTIZATIONS:
+        values, scales = quantize(embeddings, quantization)
+        searched_bytes = total * get_bytes_per_vector(
+            dimensions, quantization, False)
+
+        for rescore in ([False] if quantization == QUANTIZATION_FLOAT32
+                        else [False, True]):
+            hits = 0
+            for query, expected_indexes in zip(queries, expected):
+                scores = score(values, scales, query)
+                if rescore:
+                    shortlist = top_k_indexes(scores, top_k * rescore_factor)
+                    rescored = embeddings[shortlist] @ query
+                    found = shortlist[top_k_indexes(rescored, top_k)]
+                else:
+                    found = top_k_indexes(scores, top_k)
+                hits += len(expected_indexes.intersection(found))
+
+            entries.append(QuantizationReportEntry(
+                quantization=quantization,
+                rescore=rescore,
+                searched_bytes=searched_bytes,
+                stored_bytes=total * get_bytes_per_vector(
+                    dimensions, quantization, rescore),
+                recall=hits / max(1, len(queries) * min(top_k, total))
+            ))
+
+    return entries
@@ -0,0 +1,252 @@
+"""Session lifecycle module."""
+
+from logging import getLogger
+import os
+import shutil
+import threading
+import time
+from typing import Callable
+
+from attr import dataclass
+
+LAST_ACCESS_FILE_NAME = '.last-access'
+TOUCH_INTERVAL = 60
+"""Minimum seconds between records of the last access of a session."""
+
+logger = getLogger()
+
+
+@dataclass
+class SessionInfo():
+    """Defines the state of a stored session."""
+
+    id: str
+    """Identifier of the session."""
+
+    last_access: float
+    """Time of the last access, in seconds since the epoch."""
+
+    size: int
+    """Size of the session files and other data, in bytes."""
+
+
+class SessionManager():
+    """Manages the lifecycle of sessions, evicting idle ones.
+
+    Each session has a directory in the sessions path, whose last access is
+    recorded in a marker file so it is shared by all processes. Evicted
+    sessions have their directory removed and the eviction handler is
+    called to drop the other data of the session (e.g. its collection).
+    Busy sessions (e.g. indexing files) are never evicted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: int,
+        max_size: int = 0,
+        min_idle: int = 300,
+        on_evict: Callable[[str], None] | None = None,
+        is_busy: Callable[[str], bool] | None = None,
+        get_data_paths: Callable[[str], list[str]] | None = None
+    ):
+        """
+        Args:
+            - path: Path where session directories are stored.
+            - ttl: Seconds a session can stay idle before being evicted. 0
+                disables expiration.
+            - max_size: Maximum total size of the session directories, in
+                bytes. The least recently accessed sessions are evicted while
+                it is exceeded. 0 disables the quota.
+            - min_idle: Seconds a session must be idle before being evicted to
+                enforce the quota, protecting sessions in use.
+            - on_evict: Called with the session identifier before its directory
+                is removed.
+            - is_busy: Called with the session identifier to check if the
+                session is in use by this process, which prevents its
+                eviction.
+            - get_data_paths: Called with the session identifier to get the
+                paths of the other data of the session (e.g. its collection),
+                whose size is included in the session size.
+        """
+        self._path = path
+        self._ttl = ttl
+        self._max_size = max_size
+        self._min_idle = min_idle
+        self._on_evict = on_evict
+        self._is_busy = is_busy
+        self._get_data_paths = get_data_paths
+        self._touched: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._sweeper: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def touch(self, session_id: str, create: bool = True) -> bool:
+        """Record the access to a session.
+
+        Args:
+            - session_id: Identifier of the session.
+            - create: Whether to store the session if it is not stored. If
+                False, evicted sessions are not recreated.
+
+        Returns:
+            True if the session was already recorded, False if it is new or was
+            evicted.
+        """
+        marker_path = os.path.join(
+            self._path, session_id, LAST_ACCESS_FILE_NAME)
+        now = time.time()
+
+        with self._lock:
+            exists = os.path.exists(marker_path)
+            if not exists and not create:
+                return False
+            if exists and now - self._touched.get(session_id, 0) < \
+                    TOUCH_INTERVAL:
+                return True
+
+            os.makedirs(os.path.dirname(marker_path), exist_ok=True)
+            with open(marker_path, 'a', encoding='utf-8'):
+                pass
+            os.utime(marker_path, (now, now))
+            self._touched[session_id] = now
+
+        return exists
+
+    def exists(self, session_id: str) -> bool:
+        """Check if a session is stored.
+
+        Args:
+            - session_id: Identifier of the session.
+        """
+        return os.path.exists(os.path.join(
+            self._path, session_id, LAST_ACCESS_FILE_NAME))
+
+    def get_sessions(self) -> list[SessionInfo]:
+        """Get the stored sessions.
+
+        Returns:
+            Sessions ordered from the least to the most recently accessed.
+        """
+        if not os.path.isdir(self._path):
+            return []
+
+        sessions = []
+        for entry in os.scandir(self._path):
+            if not entry.is_dir():
+                continue
+
+            marker_path = os.path.join(entry.path, LAST_ACCESS_FILE_NAME)
+            try:
+                last_access = os.stat(marker_path).st_mtime
+            except FileNotFoundError:
+                last_access = entry.stat().st_mtime
+
+            size = _get_size(entry.path)
+            if self._get_data_paths is not None:
+                size += sum(_get_size(path)
+                            for path in self._get_data_paths(entry.name))
+
+            sessions.append(SessionInfo(entry.name, last_access, size))
+
+        sessions.sort(key=lambda session: session.last_access)
+        return sessions
+
+    def sweep(self, now: float | None = None) -> list[str]:
+        """Evict the expired sessions, then the least recently accessed
+        sessions while the quota is exceeded.
+
+        Args:
+            - now: Current time, in seconds since the epoch.
+
+        Returns:
+            Identifiers of the evicted sessions.
+        """
+        now = now if now is not None else time.time()
+        sessions = self.get_sessions()
+        total_size = sum(session.size for session in sessions)
+        evicted = []
+
+        for session in sessions:
+            idle = now - session.last_access
+            expired = self._ttl > 0 and idle > self._ttl
+            over_quota = (self._max_size > 0
+                          and total_size > self._max_size
+                          and idle > self._min_idle)
+            if not expired and not over_quota:
+                continue
+
+            if self._is_busy is not None and self._is_busy(session.id):
+                logger.info('m=sweep session=%s skipped=busy', session.id)
+                continue
+
+            if self._evict(session.id):
+                evicted.append(session.id)
+                total_size -= session.size
+
+        logger.info('m=sweep sessions=%d evicted=%d size=%d',
+                    len(sessions), len(evicted), total_size)
+        return evicted
+
+    def start(self, interval: int):
+        """Start sweeping sessions periodically in a background thread.
+
+        Args:
+            - interval: Seconds between sweeps.
+        """
+        with self._lock:
+            if self._sweeper is not None:
+                return
+
+            self._stop.clear()
+            self._sweeper = threading.Thread(
+                target=self._run, args=(interval,), name='session-sweeper',
+                daemon=True)
+            self._sweeper.start()
+
+    def stop(self):
+        """Stop the background sweeping."""
+        with self._lock:
+            sweeper = self._sweeper
+            self._sweeper = None
+
+        if sweeper is not None:
+            self._stop.set()
+            sweeper.join()
+
+    def _run(self, interval: int):
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.exception('m=sweep error=%s', e)
+
+    def _evict(self, session_id: str) -> bool:
+        try:
+            if self._on_evict is not None:
+                self._on_evict(session_id)
+            shutil.rmtree(os.path.join(self._path, session_id))
+        except Exception as e:
+            logger.exception('m=evict session=%s error=%s', session_id, e)
+            return False
+
+        with self._lock:
+            self._touched.pop(session_id, None)
+
+        logger.info('m=evict session=%s', session_id)
+        return True
+
+
+def _get_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+
+    size = 0
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            try:
+                size += os.path.getsize(os.path.join(root, file_name))
+            except FileNotFoundError:
+                pass
+
+    return size
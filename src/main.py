@@ -4,9 +4,9 @@
 import logging
 import uuid
 from logging import getLogger
+from timeit import default_timer as timer
 
 import streamlit as st
-import ollama
 
 from config import get_settings
 from core.prompting.executor import PromptExecutor
@@ -18,15 +18,52 @@ from core.prompting.generator.endpoint import EndpointResponseGenerator
 from core.prompting.generator.rag import RagResponseGenerator
 from core.prompting.generator.template import TemplateResponseGenerator
 from core.prompting.history import PromptHistory
-from core.prompting.provider.ollama import OllamaModelProvider
-from core.prompting.provider.openrouter import OpenRouterModelProvider
+from core.prompting.provider.monitor import ModelStatus
+from core.prompting.provider.pool import HostStatus, OllamaClientPool
+from resources import (
+    get_cached_model_provider,
+    create_vector_store,
+    get_corpus,
+    get_document_parser,
+    get_embedding_cache,
+    get_http_session,
+    get_indexing_jobs,
+    get_model_monitors,
+    get_model_provider,
+    get_ollama_client,
+    get_persistent_resource,
+    get_query_caches,
+    get_session_manager,
+    get_session_resource
+)
 from ui.component.base import OperationMode, OperationModeManager, UiComponent
 from ui.component.chat import ChatComponent
 from ui.component.context import ContextCompoonent
 from ui.component.replay import ReplayComponent
 
+SESSION_QUERY_PARAM = 'session'
+
+rerun_start = timer()
 logger = getLogger()
 settings = get_settings()
+session_manager = get_session_manager()
+# Started on the first run, so models load while the page is used.
+model_monitors = get_model_monitors()
+
+# Sessions evicted while idle start over, without storing them again.
+if 'id' in st.session_state and \
+        not session_manager.touch(st.session_state.id, create=False):
+    logger.info('m=restart session=%s reason=evicted', st.session_state.id)
+    st.session_state.clear()
+
+
+def is_session_id(value: str) -> bool:
+    """Check if a value is a valid session ID."""
+    try:
+        return str(uuid.UUID(value)) == value
+    except ValueError:
+        return False
+
 
 # Initial setup.
 if 'id' not in st.session_state:
@@ -36,47 +73,71 @@ if 'id' not in st.session_state:
         ch.setLevel(logging.DEBUG)
         ch.setFormatter(logging.Formatter(settings.log_format))
         logger.addHandler(ch)
-    st.session_state.id = str(uuid.uuid4())
+    # When enabled, the session ID is kept in the URL, so refreshing the page
+    # restores the session and its indexing jobs.
+    session_id = st.query_params.get(SESSION_QUERY_PARAM, '') \
+        if settings.session_restore_from_url else ''
+    if not is_session_id(session_id) or not session_manager.exists(session_id):
+        session_id = str(uuid.uuid4())
+    st.session_state.id = session_id
     st.session_state.history = PromptHistory()
+    session_manager.touch(st.session_state.id)
+    if settings.session_restore_from_url:
+        st.query_params[SESSION_QUERY_PARAM] = session_id
 
-ollama_client = ollama.Client(
-    host=settings.ollama_host,
-    timeout=settings.ollama_request_timeout
-)
-indexer = ContextIndexer(
-    ollama_client,
-    settings.vector_db_path,
-    st.session_state.id,
-    settings.model_embeddings
-)
-context_generator = ContextResponseGenerator(indexer)
-
-if settings.model_provider == 'OPENROUTER':
-    model_provider = OpenRouterModelProvider(
-        settings.open_router_host,
-        settings.open_router_key,
-        settings.open_router_request_timeout,
-        settings.open_router_model
+
+def create_indexer() -> ContextIndexer:
+    """Create the context indexer of the session."""
+    corpus = get_corpus()
+    query_embedding_cache, query_result_cache = get_query_caches()
+    return ContextIndexer(
+        get_ollama_client(),
+        settings.vector_db_path,
+        st.session_state.id,
+        settings.model_embeddings,
+        settings.embedding_max_in_flight,
+        get_embedding_cache(),
+        query_embedding_cache,
+        query_result_cache,
+        None if corpus is not None else create_vector_store(
+            st.session_state.id),
+        get_document_parser(),
+        corpus,
+        settings.ollama_keep_alive
+    )
+
+
+def create_prompt_executor() -> PromptExecutor:
+    """Create the prompt executor of the session."""
+    context_generator = ContextResponseGenerator(indexer)
+    model_generator = ModelResponseGenerator(
+        get_model_provider(),
+        get_cached_model_provider(),
+        st.session_state.history
     )
-else:
-    model_provider = OllamaModelProvider(
-        ollama_client,
-        settings.ollama_model
+
+    return PromptExecutor(
+        st.session_state.history,
+        [
+            model_generator,
+            context_generator,
+            RagResponseGenerator(
+                model_generator,
+                context_generator,
+                settings.rag_context_max_tokens
+            ),
+            EndpointResponseGenerator(get_http_session()),
+            EchoResponseGenerator(),
+            TemplateResponseGenerator(st.session_state.history)
+        ]
     )
 
-model_generator = ModelResponseGenerator(model_provider)
 
-prompt_executor = PromptExecutor(
-    st.session_state.history,
-    [
-        model_generator,
-        context_generator,
-        RagResponseGenerator(model_generator, context_generator),
-        EndpointResponseGenerator(),
-        EchoResponseGenerator(),
-        TemplateResponseGenerator(st.session_state.history)
-    ]
-)
+indexer = get_persistent_resource(
+    st.session_state.id, 'indexer', create_indexer)
+prompt_executor = get_session_resource(
+    'prompt_executor', create_prompt_executor)
+setup_time = timer() - rerun_start
 
 mode_manager = OperationModeManager(OperationMode.CHAT)
 chat = ChatComponent(
@@ -86,7 +147,9 @@ chat = ChatComponent(
 )
 context = ContextCompoonent(
     mode_manager,
-    indexer
+    indexer,
+    get_indexing_jobs(),
+    session_manager
 )
 replay = ReplayComponent(
     mode_manager,
@@ -106,6 +169,32 @@ def open_replay():
     mode_manager.set_mode(OperationMode.REPLAY)
 
 
+def get_model_status_caption(status: ModelStatus) -> str:
+    """Get the description of the load state of a model."""
+    if status.loading:
+        state = 'loading'
+    elif status.error:
+        state = f"unavailable ({status.error})"
+    else:
+        state = 'loaded' if status.loaded else 'not loaded'
+
+    if status.load_time is not None:
+        state += f", loaded in {status.load_time:.1f}s at startup"
+
+    host = f" on {status.host}" if status.host else ''
+    return f"Model {status.name}{host}: {state}"
+
+
+def get_host_status_caption(status: HostStatus) -> str:
+    """Get the description of the state of an Ollama host."""
+    state = 'healthy' if status.healthy else 'ejected'
+    latencies = ''.join(
+        f", {method} p50/p95 {p50:.2f}s/{p95:.2f}s"
+        for method, (p50, p95) in status.latencies.items())
+    return (f"Host {status.host}: {state}, {status.in_flight} in flight, "
+            f"{status.errors}/{status.requests} failed{latencies}")
+
+
 @st.dialog('Save chat history')
 def save_chat_history(history: str):
     st.download_button(
@@ -127,6 +216,13 @@ def save_chat_history(history: str):
 
 with st.sidebar:
     context.render()
+    for monitor in model_monitors:
+        for status in monitor.get_statuses():
+            st.caption(get_model_status_caption(status))
+    ollama_client = get_ollama_client()
+    if isinstance(ollama_client, OllamaClientPool):
+        for status in ollama_client.get_statuses():
+            st.caption(get_host_status_caption(status))
     st.caption(f"Session {st.session_state.id}")
 
 col_header, col_button1, col_button2, col_button3, col_button4 = st.columns(
@@ -139,10 +235,16 @@ with col_header:
 - Use `/context` to query context returning up to 4 entries.
 - Use `/context:<number>` to query context specifying the number of entries to return (e.g. `/context:2` will return up to to 2 entries).
 - Use `/context?file="<full file name with extension>"` to query context for a specific file (e.g. `/context?file="my file.pdf"` will perform the query only on chunks of `my file.pdf`).
+- Use `/context?mode=hybrid` to combine keyword and semantic search, useful for exact identifiers and error codes.
+- Use `/context?mmr=<0 to 1>` to avoid near-duplicate entries, with lower values favoring diversity (e.g. `/context?mmr=0.5`).
+- Use `/context?max-tokens=<number>` to limit the estimated tokens of the context, merging adjacent entries of the same file.
+- Use `/rag <prompt>` to query context and ask the LLM to answer using it. It accepts the `/context` parameters (e.g. `/rag?mode=hybrid <prompt>`).
 0 Use `/get:<url>` to retrieve the response from and endpoint (e.g. `/get:http://localhost:3000/data/1`)
 - Start a prompt with `:<label>` to add a label, so its response can be referenced in subsequent prompts.
 - Add `{response:last}` to append the last response.
 - Add `{response:label:<label>}` to append a previous labeled response.
+- Use `/model?cache=1` to reuse the response previously generated for the same prompt and model.
+- Use `/model?continue=last` or `/model?continue=<label>` to continue the conversation of a previous response, without sending it again.
 - Use `Ctrl + ENTER` for new line
 """
     )
@@ -180,3 +282,5 @@ with col_button4:
 current_mode = mode_manager.get_mode()
 logger.info('m=render mode=%s', current_mode)
 modes[current_mode].render()
+
+logger.info('m=rerun setup=%f elapsed=%f', setup_time, timer() - rerun_start)
@@ -0,0 +1,436 @@
+"""Registry of resources reused between Streamlit reruns.
+
+Streamlit runs the application script on every interaction, so heavy
+resources (clients, databases, providers) are created once and reused:
+
+    - Shared resources are created once per process and used by all sessions.
+    - Session resources are created once per session and stored in the
+        session state.
+    - Persistent resources are created once per session id and kept by the
+        process, so they survive page refreshes that restore the session.
+
+Sessions:
+    - resources: Resources created for the current session.
+"""
+
+import functools
+from logging import getLogger
+import os
+import threading
+from typing import Any, Callable, TypeVar
+
+import chromadb
+from chromadb.api import ClientAPI
+import ollama
+import requests
+import streamlit as st
+
+from config import get_settings
+from core.http import create_async_http_client, create_http_session
+from core.prompting.base import ModelProvider
+from core.prompting.indexer import ContextIndexer
+from core.prompting.indexing.corpus import Corpus
+from core.prompting.indexing.job import IndexingJobRegistry
+from core.prompting.cache.base import DiskCache
+from core.prompting.cache.document import DocumentCache
+from core.prompting.cache.embedding import EmbeddingCache
+from core.prompting.cache.memory import LruCache
+from core.prompting.indexing.parser import DocumentParser
+from core.prompting.retrieval.lexical import LexicalIndex
+from core.prompting.provider.cached import CachedModelProvider
+from core.prompting.provider.hedged import HedgedModelProvider
+from core.prompting.provider.monitor import OllamaModelMonitor
+from core.prompting.provider.ollama import OllamaModelProvider
+from core.prompting.provider.pool import (
+    AsyncOllamaClientPool,
+    OllamaClientPool
+)
+from core.prompting.provider.openrouter import OpenRouterModelProvider
+from core.prompting.store.base import VectorStore
+from core.prompting.store.chroma import ChromaVectorStore
+from core.prompting.store.numpy import NumpyVectorStore
+from core.session import SessionManager
+
+T = TypeVar('T')
+
+CORPUS_COLLECTION_NAME = 'corpus'
+
+logger = getLogger()
+settings = get_settings()
+
+
+def shared_resource(factory: Callable[..., T]) -> Callable[..., T]:
+    """Decorate a factory so its resource is created once per process.
+
+    When resource caching is disabled in the settings, the factory is called
+    every time, which allows measuring the setup cost of each rerun.
+    """
+    cached_factory = st.cache_resource(factory)
+
+    @functools.wraps(factory)
+    def get_resource(*args, **kwargs) -> T:
+        if settings.cache_resources:
+            return cached_factory(*args, **kwargs)
+        return factory(*args, **kwargs)
+
+    return get_resource
+
+
+def get_session_resource(name: str, factory: Callable[[], T]) -> T:
+    """Get a resource bound to the current session, creating it on first
+    access.
+
+    Args:
+        - name: Name of the resource.
+        - factory: Creates the resource when not available in the session.
+
+    Returns:
+        Resource of the session.
+    """
+    if not settings.cache_resources:
+        return factory()
+
+    if 'resources' not in st.session_state:
+        st.session_state.resources = {}
+
+    resources: dict[str, Any] = st.session_state.resources
+    if name not in resources:
+        resources[name] = factory()
+        logger.info('m=create resource=%s', name)
+
+    return resources[name]
+
+
+@st.cache_resource
+def _get_persistent_resources() -> tuple[threading.Lock, dict[tuple[str, str], Any]]:
+    return threading.Lock(), {}
+
+
+def get_persistent_resource(
+    session_id: str,
+    name: str,
+    factory: Callable[[], T]
+) -> T:
+    """Get a resource bound to a session id, creating it on first access.
+
+    Args:
+        - session_id: Identifier of the session.
+        - name: Name of the resource.
+        - factory: Creates the resource when not available for the session.
+
+    Returns:
+        Resource of the session.
+    """
+    if not settings.cache_resources:
+        return factory()
+
+    lock, resources = _get_persistent_resources()
+    with lock:
+        key = (session_id, name)
+        if key not in resources:
+            resources[key] = factory()
+            logger.info('m=create resource=%s session=%s', name, session_id)
+
+        return resources[key]
+
+
+def remove_persistent_resources(session_id: str):
+    """Remove the persistent resources of a session.
+
+    Args:
+        - session_id: Identifier of the session.
+    """
+    lock, resources = _get_persistent_resources()
+    with lock:
+        for key in [key for key in resources if key[0] == session_id]:
+            del resources[key]
+
+
+def get_ollama_hosts() -> list[str]:
+    """Get the hosts of the Ollama servers."""
+    hosts = [host.strip() for host in settings.ollama_hosts.split(',')
+             if host.strip()]
+    return hosts if hosts else [settings.ollama_host]
+
+
+@shared_resource
+def get_ollama_client() -> ollama.Client | OllamaClientPool:
+    """Get the client to access Ollama, routing requests between hosts when
+    multiple hosts are configured."""
+    hosts = get_ollama_hosts()
+    if len(hosts) == 1:
+        return ollama.Client(
+            host=hosts[0],
+            timeout=settings.ollama_request_timeout
+        )
+
+    return OllamaClientPool(
+        {host: ollama.Client(
+            host=host,
+            timeout=settings.ollama_request_timeout
+        ) for host in hosts},
+        settings.ollama_host_cooldown
+    )
+
+
+def create_async_ollama_client() -> ollama.AsyncClient | AsyncOllamaClientPool:
+    """Create the async client to access Ollama, which can only be used in
+    the current event loop."""
+    client = get_ollama_client()
+    if isinstance(client, OllamaClientPool):
+        return client.get_async({host: ollama.AsyncClient(
+            host=host,
+            timeout=settings.ollama_request_timeout
+        ) for host in client.get_hosts()})
+
+    return ollama.AsyncClient(
+        host=get_ollama_hosts()[0],
+        timeout=settings.ollama_request_timeout
+    )
+
+
+def create_model_monitors() -> list[OllamaModelMonitor]:
+    """Create the monitors of the models loaded by each Ollama host."""
+    hosts = get_ollama_hosts()
+    return [OllamaModelMonitor(
+        ollama.Client(host=host, timeout=settings.ollama_request_timeout),
+        settings.ollama_model if 'OLLAMA' in (
+            settings.model_provider, settings.model_provider_secondary)
+        else None,
+        settings.model_embeddings,
+        settings.ollama_keep_alive,
+        host if len(hosts) > 1 else ''
+    ) for host in hosts]
+
+
+@st.cache_resource
+def get_model_monitors() -> list[OllamaModelMonitor]:
+    """Get the monitors of the models loaded by each Ollama host, warming
+    them up and checking them in background when enabled. Always shared, so
+    models are loaded once per process."""
+    monitors = create_model_monitors()
+    if settings.ollama_warm_up or settings.ollama_monitor_interval > 0:
+        for monitor in monitors:
+            monitor.start(settings.ollama_monitor_interval,
+                          settings.ollama_warm_up)
+
+    return monitors
+
+
+@shared_resource
+def get_http_session() -> requests.Session:
+    """Get the HTTP session shared by providers and generators, keeping
+    connections alive between requests."""
+    return create_http_session(
+        settings.http_pool_size,
+        settings.http_max_retries,
+        settings.http_backoff_factor
+    )
+
+
+@shared_resource
+def get_vector_db() -> ClientAPI:
+    """Get the client of the vector database."""
+    return chromadb.PersistentClient(path=settings.vector_db_path)
+
+
+def get_numpy_store_path(collection_name: str) -> str:
+    """Get the path of the NumPy vector store of a collection.
+
+    Args:
+        - collection_name: Name of the collection.
+    """
+    return os.path.join(settings.vector_db_path, 'numpy', collection_name)
+
+
+def create_vector_store(collection_name: str) -> VectorStore:
+    """Create the vector store of a collection.
+
+    Args:
+        - collection_name: Name of the collection.
+    """
+    if settings.vector_store == 'NUMPY':
+        return NumpyVectorStore(
+            get_numpy_store_path(collection_name),
+            settings.vector_store_quantization,
+            settings.vector_store_rescore)
+
+    return ChromaVectorStore(get_vector_db(), collection_name)
+
+
+@st.cache_resource
+def get_corpus() -> Corpus | None:
+    """Get the corpus shared by all sessions, if enabled. Always shared, since
+    its references and indexes are kept in memory and saved over the ones of
+    other instances."""
+    if not settings.shared_corpus:
+        return None
+
+    return Corpus(
+        create_vector_store(CORPUS_COLLECTION_NAME),
+        LexicalIndex(os.path.join(
+            settings.vector_db_path, 'lexical',
+            f"{CORPUS_COLLECTION_NAME}.json")),
+        os.path.join(settings.vector_db_path, 'corpus.json'))
+
+
+def delete_session_data(session_id: str):
+    """Delete the collection of a session and its index data.
+
+    Args:
+        - session_id: Identifier of the session.
+    """
+    remove_persistent_resources(session_id)
+    get_indexing_jobs().remove(session_id)
+    ContextIndexer.delete_collection(
+        settings.vector_db_path,
+        session_id,
+        create_vector_store(session_id),
+        get_corpus())
+
+
+def get_session_data_paths(session_id: str) -> list[str]:
+    """Get the paths of the collection and index data of a session. Chroma
+    collections are stored together in the vector database, so they are not
+    included.
+
+    Args:
+        - session_id: Identifier of the session.
+    """
+    paths = ContextIndexer.get_data_paths(settings.vector_db_path, session_id)
+    if settings.vector_store == 'NUMPY':
+        paths.append(get_numpy_store_path(session_id))
+
+    return paths
+
+
+def create_session_manager(
+    is_busy: Callable[[str], bool] | None = None
+) -> SessionManager:
+    """Create the manager of the sessions lifecycle.
+
+    Args:
+        - is_busy: Checks if a session is in use, which prevents its eviction.
+    """
+    return SessionManager(
+        settings.session_path,
+        settings.session_ttl,
+        settings.session_max_size,
+        on_evict=delete_session_data,
+        is_busy=is_busy,
+        get_data_paths=get_session_data_paths)
+
+
+@st.cache_resource
+def get_session_manager() -> SessionManager:
+    """Get the manager of the sessions lifecycle, sweeping idle sessions in
+    background when enabled. Sessions indexing files are not evicted. Always
+    shared, so a single sweeper runs per process."""
+    manager = create_session_manager(get_indexing_jobs().is_running)
+    if settings.session_sweep_interval > 0:
+        manager.start(settings.session_sweep_interval)
+
+    return manager
+
+
+@st.cache_resource
+def get_indexing_jobs() -> IndexingJobRegistry:
+    """Get the indexing jobs of the process. Always shared, since jobs must
+    outlive the reruns that started them."""
+    return IndexingJobRegistry()
+
+
+@shared_resource
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Get the embedding cache, if enabled."""
+    if settings.embedding_cache_max_size <= 0:
+        return None
+
+    return EmbeddingCache(DiskCache(
+        os.path.join(settings.vector_db_path, 'embedding_cache.db'),
+        settings.embedding_cache_max_size
+    ))
+
+
+@shared_resource
+def get_query_caches() -> tuple[LruCache, LruCache]:
+    """Get the query embedding and query result caches."""
+    return (
+        LruCache(settings.query_cache_size),
+        LruCache(settings.query_cache_size)
+    )
+
+
+@shared_resource
+def get_document_parser() -> DocumentParser:
+    """Get the parser of indexed files, whose worker processes are shared by
+    all sessions."""
+    cache = None
+    if settings.document_cache_max_size > 0:
+        cache = DocumentCache(DiskCache(
+            os.path.join(settings.vector_db_path, 'document_cache.db'),
+            settings.document_cache_max_size
+        ))
+
+    return DocumentParser(settings.parser_workers, cache)
+
+
+def create_model_provider(name: str) -> ModelProvider:
+    """Create a provider for LLM generation.
+
+    Args:
+        - name: Name of the provider (OLLAMA, OPENROUTER).
+    """
+    if name == 'OPENROUTER':
+        return OpenRouterModelProvider(
+            settings.open_router_host,
+            settings.open_router_key,
+            settings.open_router_request_timeout,
+            settings.open_router_model,
+            get_http_session(),
+            lambda: create_async_http_client(
+                settings.http_pool_size,
+                settings.http_max_retries,
+                settings.http_backoff_factor)
+        )
+
+    return OllamaModelProvider(
+        get_ollama_client(),
+        settings.ollama_model,
+        create_async_ollama_client,
+        settings.ollama_keep_alive
+    )
+
+
+@shared_resource
+def get_model_provider() -> ModelProvider:
+    """Get the provider used for LLM generation, hedging slow prompts with
+    the secondary provider when enabled."""
+    provider = create_model_provider(settings.model_provider)
+    if not settings.model_provider_secondary or \
+            settings.model_provider_secondary == settings.model_provider:
+        return provider
+
+    return HedgedModelProvider(
+        provider,
+        create_model_provider(settings.model_provider_secondary),
+        settings.hedge_percentile,
+        settings.hedge_initial_deadline,
+        timeout=settings.hedge_timeout or None
+    )
+
+
+@shared_resource
+def get_cached_model_provider() -> ModelProvider | None:
+    """Get the provider reusing previous responses, if enabled."""
+    if settings.response_cache_max_size <= 0:
+        return None
+
+    return CachedModelProvider(
+        get_model_provider(),
+        DiskCache(
+            os.path.join(settings.vector_db_path, 'response_cache.db'),
+            settings.response_cache_max_size,
+            settings.response_cache_ttl
+        )
+    )
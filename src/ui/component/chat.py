@@ -3,15 +3,18 @@
 Sessions:
     - messages: Chat message history. 
     - replay: User prompts to replay.
+    - replay_parameters: Generator parameters used by the replayed prompts.
 """
 
 import gc
+import itertools
 from logging import getLogger
 from timeit import default_timer as timer
 
 import streamlit as st
 
 from core.prompting.executor import PromptExecutor
+from core.prompting.generator.model import PARAM_CACHE
 from core.prompting.history import PromptHistory
 from ui.component.base import OperationModeManager, UiComponent
 
@@ -24,6 +27,8 @@ CHAT_CSS = """
 """
 ROLE_BOT = 'assistant'
 ROLE_USER = 'user'
+STREAM_RENDER_INTERVAL = 0.05
+"""Minimum seconds between renders of a streamed response."""
 
 logger = getLogger()
 
@@ -62,18 +67,23 @@ class ChatComponent(UiComponent):
         st.text(
             f"Execution time: {execution_time:,.2f}s | "
             f"Input tokens: {self._history.get_total_input_tokens()} | "
-            f"Output tokens: {self._history.get_total_output_tokens()}"
+            f"Output tokens: {self._history.get_total_output_tokens()} | "
+            f"Cached responses: {self._history.get_total_cached()}"
         )
         logger.info('m=render elapsed=%f', execution_time)
 
-    def replay(self, prompts: list[str]):
+    def replay(self, prompts: list[str], use_cache: bool = False):
         """Replay a list of prompts.
 
         Args:
             - prompts: Prompts to be sent to the core.
+            - use_cache: Reuse model responses previously generated for the
+                same prompts.
         """
         self.clear_history()
         st.session_state.replay = prompts
+        st.session_state.replay_parameters = {
+            PARAM_CACHE: '1'} if use_cache else {}
 
     def download_history(self):
         """Download all chat messages."""
@@ -85,14 +95,18 @@ class ChatComponent(UiComponent):
 
     def _reset_replay(self):
         st.session_state.replay = []
+        st.session_state.replay_parameters = {}
 
     def _has_replay(self) -> bool:
         return len(st.session_state.replay) > 0
 
     def _render_message(self, role: str, message: str):
         with st.chat_message(role):
-            # The replacement is to ensure all \n are treated as new lines.
-            st.text(message.replace('\n', '  \n'))
+            self._render_text(message)
+
+    def _render_text(self, message: str):
+        # The replacement is to ensure all \n are treated as new lines.
+        st.text(message.replace('\n', '  \n'))
 
     def _render_history(self):
         for entry in self._history:
@@ -102,7 +116,8 @@ class ChatComponent(UiComponent):
 
     def _render_replay(self):
         for prompt in st.session_state.replay:
-            self._render_send_prompt(prompt)
+            self._render_send_prompt(
+                prompt, st.session_state.replay_parameters)
 
         self._reset_replay()
         st.rerun()
@@ -111,9 +126,29 @@ class ChatComponent(UiComponent):
         if prompt := st.chat_input('Prompt to the LLM '):
             self._render_send_prompt(prompt)
 
-    def _render_send_prompt(self, prompt: str):
+    def _render_send_prompt(
+        self,
+        prompt: str,
+        parameters: dict[str, str] | None = None
+    ):
         self._render_message(ROLE_USER, prompt)
 
-        with st.spinner("Thinking..."):
-            response = self._prompt_executor.execute(prompt)
-            self._render_message(ROLE_BOT, response.value)
+        with st.chat_message(ROLE_BOT):
+            placeholder = st.empty()
+            with placeholder, st.spinner("Thinking..."):
+                stream = self._prompt_executor.execute_stream(
+                    prompt, parameters)
+                chunks = iter(stream)
+                parts = list(itertools.islice(chunks, 1))
+
+            # Renders are throttled, since each one sends the whole text.
+            last_render = 0.0
+            for chunk in chunks:
+                parts.append(chunk)
+                if timer() - last_render >= STREAM_RENDER_INTERVAL:
+                    with placeholder:
+                        self._render_text(''.join(parts))
+                    last_render = timer()
+
+            with placeholder:
+                self._render_text(stream.get_response().value)
@@ -3,6 +3,7 @@
 Sessions:
     - id: Session ID
     - files: List of the uploaded files.
+    - indexing_error: Error of the last indexing job, shown once.
 """
 
 import os
@@ -14,12 +15,18 @@ from streamlit.runtime.uploaded_file_manager import UploadedFile
 
 from config import get_settings
 from core.prompting.indexer import ContextIndexer
+from core.prompting.indexing.job import IndexingJob, IndexingJobRegistry
+from core.prompting.indexing.pipeline import IndexingProgress
+from core.session import SessionManager
 from ui.component.base import OperationModeManager, UiComponent
 import ui.component.icon as icon
 
 logger = getLogger()
 settings = get_settings()
 
+JOB_POLL_INTERVAL = 1.0
+"""Seconds between refreshes of the indexing progress."""
+
 
 class ContextCompoonent(UiComponent):
     """Manages context UI operations."""
@@ -27,20 +34,38 @@ class ContextCompoonent(UiComponent):
     def __init__(
             self,
             mode_manager: OperationModeManager,
-            indexer: ContextIndexer
+            indexer: ContextIndexer,
+            jobs: IndexingJobRegistry,
+            session_manager: SessionManager
     ):
         super().__init__(mode_manager)
         self._indexer = indexer
+        self._jobs = jobs
+        self._session_manager = session_manager
         if 'files' not in st.session_state:
-            st.session_state.files = []
+            # Restores the files of a session after a page refresh.
+            files_dir = self._get_files_dir()
+            st.session_state.files = [
+                os.path.join(files_dir, file_name)
+                for file_name in indexer.get_file_names()
+            ]
 
     def render(self):
         st.header('Context management', divider='orange')
 
+        if 'indexing_error' in st.session_state:
+            st.error(f"Error: {st.session_state.indexing_error}")
+            del st.session_state['indexing_error']
+
+        job = self._jobs.get(st.session_state.id)
+        if job is not None:
+            self._render_job()
+
         if not self._has_files():
-            self._render_upload_context()
+            if job is None:
+                self._render_upload_context()
         else:
-            self._render_list_context()
+            self._render_list_context(job is None)
 
     def _render_upload_context(self):
         st.info(
@@ -49,6 +74,9 @@ class ContextCompoonent(UiComponent):
             icon=icon.INFO
         )
 
+        self._render_files_form()
+
+    def _render_files_form(self):
         with st.form("files_form"):
             uploaded_files = st.file_uploader(
                 "Choose context files",
@@ -73,30 +101,80 @@ class ContextCompoonent(UiComponent):
                 help='Amount of overlap when splitting documents into chunk_size.'
             )
 
+            batch_size = st.number_input(
+                label='Batch size',
+                value=64,
+                min_value=1,
+                max_value=512,
+                step=16,
+                help='Amount of chunks embedded and saved in a single request.'
+            )
+
             if st.form_submit_button('Index'):
                 if uploaded_files:
                     try:
-                        with st.spinner('Indexing files...'):
-                            files_path = self._save_files(uploaded_files)
-                            self._indexer.index_files(
+                        files_path = list(dict.fromkeys(
+                            st.session_state.files +
+                            self._save_files(uploaded_files)))
+                        self._jobs.start(
+                            st.session_state.id,
+                            files_path,
+                            lambda on_progress: self._indexer.index_files(
                                 files_path,
                                 chunk_size,
-                                chunk_overlap)
-                            st.session_state.files = files_path
-                            st.success('Files indexed', icon=icon.SUCCESS)
-                            st.rerun()
+                                chunk_overlap,
+                                batch_size,
+                                on_progress))
+                        st.rerun()
                     except Exception as e:
                         tb = traceback.format_exc()
                         logger.error(tb)
                         st.error(f"Error: {e}")
 
+    @st.fragment(run_every=JOB_POLL_INTERVAL)
+    def _render_job(self):
+        job = self._jobs.get(st.session_state.id)
+        if job is None:
+            return
+
+        # Progress refreshes only rerun this fragment, so the access is
+        # recorded here to keep the session from expiring while indexing.
+        self._session_manager.touch(st.session_state.id)
+        if job.is_running():
+            self._render_progress(job.get_progress())
+            return
+
+        self._finish_job(job)
+        st.rerun()
+
+    def _finish_job(self, job: IndexingJob):
+        if job.get_status() == IndexingJob.STATUS_SUCCEEDED:
+            st.session_state.files = job.get_files_path()
+            st.toast('Files indexed', icon=icon.SUCCESS)
+        else:
+            st.session_state.indexing_error = str(job.get_error())
+
+        self._jobs.remove(job.get_key())
+
+    def _render_progress(self, progress: IndexingProgress):
+        completion = (progress.chunks_saved / progress.chunks_split
+                      if progress.chunks_split > 0 else 0.0)
+        st.progress(
+            min(completion, 1.0),
+            text=f"Indexing files {progress.files_loaded}/{progress.files}"
+        )
+        st.caption(
+            f"Chunks split {progress.chunks_split} | "
+            f"embedded {progress.chunks_embedded} | "
+            f"saved {progress.chunks_saved}"
+        )
+
     def _save_files(
             self,
             files: list[UploadedFile]
     ) -> list[str]:
         files_info: list[str] = []
-        session_dir = os.path.join(
-            settings.session_path, st.session_state.id, 'files')
+        session_dir = self._get_files_dir()
         os.makedirs(session_dir, exist_ok=True)
         for file_to_save in files:
             file_path = os.path.join(session_dir, file_to_save.name)
@@ -108,11 +186,19 @@ class ContextCompoonent(UiComponent):
 
         return files_info
 
-    def _render_list_context(self):
+    def _render_list_context(self, can_add_files: bool):
         with st.container(border=True):
             st.write(f"Indexed files ({len(st.session_state.files)})")
             for file in st.session_state.files:
                 st.code(os.path.basename(file))
 
+        if can_add_files:
+            with st.expander('Add files'):
+                self._render_files_form()
+
     def _has_files(self) -> bool:
         return len(st.session_state.files) > 0
+
+    def _get_files_dir(self) -> str:
+        return os.path.join(
+            settings.session_path, st.session_state.id, 'files')
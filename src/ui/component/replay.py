@@ -56,6 +56,11 @@ class ReplayComponent(UiComponent):
                 height=375)
             self._set_prompts(prompts)
 
+            use_cache = st.checkbox(
+                'Use cached responses',
+                help='Reuse model responses previously generated for the '
+                'same prompts, without spending tokens.')
+
             col1, col2, col3, col4 = st.columns(
                 [4, 0.8, 1.2, 1], vertical_alignment='center')
 
@@ -80,7 +85,7 @@ class ReplayComponent(UiComponent):
                     help='Execute replay of the entered prompts.'
                 ):
                     prompts_to_replay = self._get_prompts_as_list()
-                    self._chat.replay(prompts_to_replay)
+                    self._chat.replay(prompts_to_replay, use_cache)
                     self._close()
 
             with col3:
@@ -0,0 +1,87 @@
+"""Tests for DiskCache class."""
+
+import os
+
+import pytest
+
+from core.prompting.cache.base import DiskCache
+from core.prompting.cache.embedding import EmbeddingCache
+
+TEST_MODEL = 'model'
+
+
+@pytest.fixture
+def cache_path(tmp_path) -> str:
+    return os.path.join(tmp_path, 'cache.db')
+
+
+@pytest.fixture
+def cache(cache_path) -> DiskCache:
+    return DiskCache(cache_path, max_size=1024)
+
+
+def test_get_missing_key(cache):
+    assert cache.get('key') is None
+    assert cache.get_stats().misses == 1
+
+
+def test_set_and_get(cache):
+    cache.set('key', b'value')
+
+    assert cache.get('key') == b'value'
+    assert cache.get_stats().hits == 1
+
+
+def test_get_many(cache):
+    cache.set_many({'key1': b'value1', 'key2': b'value2'})
+
+    values = cache.get_many(['key1', 'key2', 'key3'])
+
+    assert values == {'key1': b'value1', 'key2': b'value2'}
+    assert cache.get_stats().hits == 2
+    assert cache.get_stats().misses == 1
+
+
+def test_shared_between_instances(cache, cache_path):
+    cache.set('key', b'value')
+
+    other_cache = DiskCache(cache_path, max_size=1024)
+
+    assert other_cache.get('key') == b'value'
+
+
+def test_evict_least_recently_used(cache_path):
+    cache = DiskCache(cache_path, max_size=10)
+    cache.set('key1', b'12345')
+    cache.set('key2', b'12345')
+    cache.get('key1')
+    cache.set('key3', b'12345')
+
+    assert cache.get('key2') is None
+    assert cache.get('key1') == b'12345'
+    assert cache.get('key3') == b'12345'
+    assert cache.get_size() == 10
+    assert cache.get_stats().evictions == 1
+
+
+def test_expired_entry(cache_path, monkeypatch):
+    cache = DiskCache(cache_path, max_size=1024, ttl=10)
+    monkeypatch.setattr('time.time', lambda: 100)
+    cache.set('key', b'value')
+
+    monkeypatch.setattr('time.time', lambda: 105)
+    assert cache.get('key') == b'value'
+
+    monkeypatch.setattr('time.time', lambda: 111)
+    assert cache.get('key') is None
+
+
+def test_embedding_cache(cache):
+    embedding_cache = EmbeddingCache(cache)
+    embedding_cache.set_many(TEST_MODEL, ['text1'], [[0.5, 0.25]])
+
+    embeddings = embedding_cache.get_many(TEST_MODEL, ['text1', 'text2'])
+    other_model_embeddings = embedding_cache.get_many('other', ['text1'])
+
+    assert embeddings == [[0.5, 0.25], None]
+    assert other_model_embeddings == [None]
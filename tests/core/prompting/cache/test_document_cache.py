@@ -0,0 +1,109 @@
+"""Tests for DocumentCache class."""
+
+import os
+
+import pytest
+
+pytest.importorskip('llama_index.core')
+
+from core.prompting.cache.base import DiskCache  # noqa: E402
+from core.prompting.cache.document import DocumentCache  # noqa: E402
+from core.prompting.indexing.parser import DocumentParser  # noqa: E402
+
+
+class CountingParser(DocumentParser):
+    """Parser counting the files actually parsed."""
+
+    def __init__(self, cache: DocumentCache):
+        super().__init__(cache=cache)
+        self.parsed: list[str] = []
+
+    def _store(self, file_path, content_hash, documents):
+        self.parsed.append(os.path.basename(file_path))
+        return super()._store(file_path, content_hash, documents)
+
+
+@pytest.fixture
+def disk_cache(tmp_path) -> DiskCache:
+    return DiskCache(os.path.join(tmp_path, 'cache.db'), max_size=1024 ** 2)
+
+
+@pytest.fixture
+def parser(disk_cache) -> CountingParser:
+    return CountingParser(DocumentCache(disk_cache))
+
+
+def write_file(path: str, contents: str = 'Cached contents.') -> str:
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(contents)
+    return path
+
+
+def test_identical_contents_hit(tmp_path, parser):
+    first = write_file(os.path.join(tmp_path, 'first.txt'))
+    copy = write_file(os.path.join(tmp_path, 'copy.txt'))
+
+    list(parser.parse([first]))
+    [(file_path, documents)] = list(parser.parse([copy]))
+
+    assert parser.parsed == ['first.txt']
+    assert file_path == copy
+    assert documents[0].text == 'Cached contents.'
+    assert documents[0].metadata['file_name'] == 'copy.txt'
+    assert documents[0].metadata['file_path'] == copy
+
+
+def test_reused_with_other_chunking(tmp_path, parser):
+    pytest.importorskip('numpy')
+    from core.prompting.indexer import ContextIndexer
+    from core.prompting.store.numpy import NumpyVectorStore
+
+    class EmbeddingClient():
+        def embed(self, model, input, keep_alive=None):
+            return {'embeddings': [[1.0, float(len(text))] for text in input]}
+
+    db_path = os.path.join(tmp_path, 'db')
+    indexer = ContextIndexer(
+        EmbeddingClient(), db_path, 'session', 'embedding-model',
+        store=NumpyVectorStore(os.path.join(db_path, 'numpy')),
+        parser=parser)
+    file_path = write_file(os.path.join(tmp_path, 'file.txt'))
+
+    indexer.index_files([file_path], chunk_size=1024)
+    indexer.index_files([file_path], chunk_size=512)
+
+    assert parser.parsed == ['file.txt']
+
+
+def test_changed_contents_miss(tmp_path, parser):
+    file_path = write_file(os.path.join(tmp_path, 'file.txt'))
+    list(parser.parse([file_path]))
+
+    write_file(file_path, 'Changed contents.')
+    [(_, documents)] = list(parser.parse([file_path]))
+
+    assert parser.parsed == ['file.txt', 'file.txt']
+    assert documents[0].text == 'Changed contents.'
+
+
+def test_corrupt_entry_parsed_again(tmp_path, disk_cache, parser):
+    file_path = write_file(os.path.join(tmp_path, 'file.txt'))
+    list(parser.parse([file_path]))
+    [key] = disk_cache._connection.execute(
+        'SELECT key FROM entries').fetchone()
+    disk_cache.set(key, b'corrupt')
+
+    [(_, documents)] = list(parser.parse([file_path]))
+
+    assert parser.parsed == ['file.txt', 'file.txt']
+    assert documents[0].text == 'Cached contents.'
+
+
+def test_evicted_entry_parsed_again(tmp_path, disk_cache, parser):
+    file_path = write_file(os.path.join(tmp_path, 'file.txt'))
+    list(parser.parse([file_path]))
+    disk_cache.clear()
+
+    list(parser.parse([file_path]))
+
+    assert parser.parsed == ['file.txt', 'file.txt']
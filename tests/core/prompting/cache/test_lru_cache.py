@@ -0,0 +1,39 @@
+"""Tests for LruCache class."""
+
+import pytest
+
+from core.prompting.cache.memory import LruCache
+
+
+def test_get_missing_key():
+    cache = LruCache(2)
+
+    assert cache.get('key') is None
+    assert cache.get_stats().misses == 1
+
+
+def test_set_and_get():
+    cache = LruCache(2)
+    cache.set(('model', 'text'), [0.1])
+
+    assert cache.get(('model', 'text')) == [0.1]
+    assert cache.get_stats().hits == 1
+
+
+def test_evict_least_recently_used():
+    cache = LruCache(2)
+    cache.set('key1', 1)
+    cache.set('key2', 2)
+    cache.get('key1')
+    cache.set('key3', 3)
+
+    assert len(cache) == 2
+    assert cache.get('key2') is None
+    assert cache.get('key1') == 1
+    assert cache.get('key3') == 3
+    assert cache.get_stats().evictions == 1
+
+
+def test_invalid_max_entries():
+    with pytest.raises(ValueError):
+        LruCache(0)
@@ -0,0 +1,124 @@
+"""Tests for the shared corpus."""
+
+import os
+
+from core.prompting.indexing.corpus import Corpus
+from core.prompting.indexing.fingerprint import FileFingerprint
+from core.prompting.retrieval.lexical import LexicalIndex
+from core.prompting.store.base import Filter, VectorStore
+
+
+class RecordingVectorStore(VectorStore):
+    """Vector store recording deletions."""
+
+    def __init__(self):
+        self.deleted: list[Filter] = []
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        pass
+
+    def delete(self, where):
+        self.deleted.append(where)
+
+    def query(self, embedding, top_k, where=None, include_embeddings=False):
+        return []
+
+    def get(self, ids, include_embeddings=False):
+        return []
+
+    def count(self):
+        return 0
+
+    def drop(self):
+        pass
+
+
+def test_document_id_depends_on_chunking():
+    fingerprint = FileFingerprint(10, 1, 'hash', 1024, 20)
+    rechunked = FileFingerprint(10, 2, 'hash', 512, 20)
+    touched = FileFingerprint(10, 3, 'hash', 1024, 20)
+
+    assert Corpus.get_document_id(fingerprint) != \
+        Corpus.get_document_id(rechunked)
+    assert Corpus.get_document_id(fingerprint) == \
+        Corpus.get_document_id(touched)
+
+
+def test_documents_deleted_without_references(tmp_path):
+    store = RecordingVectorStore()
+    lexical_index = LexicalIndex()
+    lexical_index.add(['doc:0'], ['Shared policy.'], ['doc'])
+    corpus = Corpus(store, lexical_index, os.path.join(tmp_path, 'c.json'))
+
+    corpus.add_references('a', {'policy.txt': 'doc'})
+    corpus.add_references('b', {'policy.txt': 'doc'})
+    corpus.set_indexed(['doc'])
+
+    corpus.remove_references('a')
+    assert corpus.has_document('doc')
+    assert store.deleted == []
+
+    corpus.remove_references('b', {'policy.txt': 'doc'})
+    assert not corpus.has_document('doc')
+    assert store.deleted == [{Corpus.METADATA_DOCUMENT_ID: ['doc']}]
+    assert len(lexical_index) == 0
+
+
+def test_references_counted_per_file(tmp_path):
+    store = RecordingVectorStore()
+    corpus = Corpus(store, LexicalIndex(), os.path.join(tmp_path, 'c.json'))
+
+    # Identical files of the same collection share the document.
+    corpus.add_references('a', {'policy.txt': 'doc', 'copy.txt': 'doc'})
+    corpus.set_indexed(['doc'])
+
+    corpus.remove_references('a', {'copy.txt': 'doc'})
+    assert corpus.has_document('doc')
+    assert store.deleted == []
+
+    corpus.remove_references('a', {'policy.txt': 'doc'})
+    assert not corpus.has_document('doc')
+
+
+def test_references_persisted(tmp_path):
+    path = os.path.join(tmp_path, 'corpus.json')
+    corpus = Corpus(RecordingVectorStore(), LexicalIndex(), path)
+    corpus.add_references('a', {'a.txt': 'indexed', 'b.txt': 'pending'})
+    corpus.set_indexed(['indexed'])
+
+    corpus = Corpus(RecordingVectorStore(), LexicalIndex(), path)
+
+    assert corpus.has_document('indexed')
+    assert not corpus.has_document('pending')
+
+
+def test_file_references_persisted(tmp_path):
+    path = os.path.join(tmp_path, 'corpus.json')
+    corpus = Corpus(RecordingVectorStore(), LexicalIndex(), path)
+    corpus.add_references('a', {'policy.txt': 'doc', 'copy.txt': 'doc'})
+    corpus.set_indexed(['doc'])
+
+    corpus = Corpus(RecordingVectorStore(), LexicalIndex(), path)
+    corpus.remove_references('a', {'copy.txt': 'doc'})
+
+    assert corpus.has_document('doc')
+
+
+def test_collections_sharing_document(tmp_path):
+    path = os.path.join(tmp_path, 'corpus.json')
+    store = RecordingVectorStore()
+    corpus = Corpus(store, LexicalIndex(), path)
+
+    # Both sessions use the corpus shared by the process.
+    corpus.add_references('a', {'policy.txt': 'doc'})
+    corpus.set_indexed(['doc'])
+    corpus.add_references('b', {'rules.txt': 'doc'})
+    corpus.remove_references('a')
+
+    assert corpus.has_document('doc')
+    assert store.deleted == []
+    assert Corpus(RecordingVectorStore(), LexicalIndex(), path).has_document(
+        'doc')
+
+    corpus.remove_references('b')
+    assert store.deleted == [{Corpus.METADATA_DOCUMENT_ID: ['doc']}]
@@ -0,0 +1,80 @@
+"""Tests for file fingerprinting."""
+
+import os
+
+import pytest
+
+from core.prompting.indexing.fingerprint import (
+    FingerprintRegistry,
+    get_file_fingerprint
+)
+
+
+@pytest.fixture
+def file_path(tmp_path) -> str:
+    path = os.path.join(tmp_path, 'file.txt')
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('contents')
+    return path
+
+
+def test_unchanged_file(file_path):
+    fingerprint = get_file_fingerprint(file_path, 1024, 20)
+
+    assert get_file_fingerprint(file_path, 1024, 20, fingerprint) == fingerprint
+
+
+def test_changed_chunking(file_path):
+    fingerprint = get_file_fingerprint(file_path, 1024, 20)
+
+    assert get_file_fingerprint(file_path, 512, 20, fingerprint) != fingerprint
+
+
+def test_changed_contents(file_path):
+    fingerprint = get_file_fingerprint(file_path, 1024, 20)
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write('other contents')
+
+    changed = get_file_fingerprint(file_path, 1024, 20, fingerprint)
+
+    assert changed.content_hash != fingerprint.content_hash
+
+
+def test_registry_persistence(tmp_path, file_path):
+    registry_path = os.path.join(tmp_path, 'registry', 'fingerprints.json')
+    fingerprint = get_file_fingerprint(file_path, 1024, 20)
+    registry = FingerprintRegistry(registry_path)
+    registry.set('file.txt', fingerprint)
+    registry.save()
+
+    loaded_registry = FingerprintRegistry(registry_path)
+
+    assert loaded_registry.get('file.txt') == fingerprint
+    assert loaded_registry.get_file_names() == ['file.txt']
+    assert loaded_registry.get_version() == 1
+
+
+def test_rewritten_identical_contents(file_path):
+    fingerprint = get_file_fingerprint(file_path, 1024, 20)
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write('contents')
+    os.utime(file_path, ns=(fingerprint.modified + 10 ** 9,
+                            fingerprint.modified + 10 ** 9))
+
+    rewritten = get_file_fingerprint(file_path, 1024, 20, fingerprint)
+
+    assert rewritten != fingerprint
+    assert rewritten.is_indexed_as(fingerprint)
+
+
+def test_changed_not_indexed_as(file_path):
+    fingerprint = get_file_fingerprint(file_path, 1024, 20)
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write('other contents')
+
+    changed = get_file_fingerprint(file_path, 1024, 20, fingerprint)
+
+    assert not changed.is_indexed_as(fingerprint)
+    assert not get_file_fingerprint(
+        file_path, 512, 20, changed).is_indexed_as(changed)
+    assert not changed.is_indexed_as(None)
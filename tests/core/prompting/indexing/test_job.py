@@ -0,0 +1,63 @@
+"""Tests for background indexing jobs."""
+
+import threading
+
+import pytest
+
+from core.prompting.indexing.job import IndexingJob, IndexingJobRegistry
+from core.prompting.indexing.pipeline import IndexingProgress
+
+
+def test_job_reports_progress():
+    reported = threading.Event()
+    release = threading.Event()
+
+    def index(on_progress):
+        on_progress(IndexingProgress(files=2, files_loaded=1))
+        reported.set()
+        release.wait()
+
+    registry = IndexingJobRegistry()
+    job = registry.start('session', ['a.txt', 'b.txt'], index)
+
+    assert reported.wait(1)
+    assert job.is_running()
+    assert registry.is_running('session')
+    assert not registry.is_running('other')
+    assert job.get_progress().files_loaded == 1
+
+    release.set()
+    assert job.wait(1)
+    assert job.get_status() == IndexingJob.STATUS_SUCCEEDED
+    assert not registry.is_running('session')
+
+
+def test_job_failure():
+    def index(on_progress):
+        raise AssertionError('No documents were loaded.')
+
+    registry = IndexingJobRegistry()
+    job = registry.start('session', ['a.txt'], index)
+
+    assert job.wait(1)
+    assert job.get_status() == IndexingJob.STATUS_FAILED
+    assert str(job.get_error()) == 'No documents were loaded.'
+
+    registry.remove('session')
+    assert registry.get('session') is None
+
+
+def test_single_running_job_per_key():
+    release = threading.Event()
+    registry = IndexingJobRegistry()
+    job = registry.start('session', [], lambda on_progress: release.wait())
+
+    with pytest.raises(ValueError):
+        registry.start('session', [], lambda on_progress: None)
+
+    # Running jobs are kept.
+    registry.remove('session')
+    assert registry.get('session') is job
+
+    release.set()
+    job.wait(1)
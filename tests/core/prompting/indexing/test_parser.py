@@ -0,0 +1,67 @@
+"""Tests for DocumentParser."""
+
+import os
+
+import pytest
+
+pytest.importorskip('llama_index.core')
+
+from core.prompting.indexing.parser import DocumentParser  # noqa: E402
+
+
+@pytest.fixture
+def files_path(tmp_path) -> list[str]:
+    paths = []
+    for index in range(3):
+        path = os.path.join(tmp_path, f"file{index}.txt")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(f"Contents of file {index}.")
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture(scope='module')
+def pooled_parser() -> DocumentParser:
+    # Workers are started as new interpreters, so they are shared by tests.
+    parser = DocumentParser(workers=2)
+    yield parser
+    parser.shutdown()
+
+
+def get_texts(parsed: list) -> dict[str, list[str]]:
+    return {
+        file_path: [document.text for document in documents]
+        for file_path, documents in parsed
+    }
+
+
+def test_workers_parse_as_inline(files_path, pooled_parser):
+    inline = list(DocumentParser(workers=1).parse(files_path))
+    pooled = list(pooled_parser.parse(files_path))
+
+    assert get_texts(pooled) == get_texts(inline)
+    assert [documents[0].metadata for _, documents in sorted(pooled)] == \
+        [documents[0].metadata for _, documents in sorted(inline)]
+
+
+def test_worker_error_propagates(files_path, tmp_path, pooled_parser):
+    with pytest.raises(ValueError):
+        list(pooled_parser.parse(
+            files_path + [os.path.join(tmp_path, 'missing.txt')]))
+
+
+def test_shutdown_stops_workers(files_path):
+    parser = DocumentParser(workers=2)
+    list(parser.parse(files_path[:1]))
+    executor = parser._executor
+
+    parser.shutdown()
+
+    assert parser._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+
+def test_invalid_workers():
+    with pytest.raises(ValueError):
+        DocumentParser(workers=0)
@@ -0,0 +1,66 @@
+"""Tests for Pipeline class."""
+
+import threading
+
+import pytest
+
+from core.prompting.indexing.pipeline import Pipeline, PipelineStage
+
+
+def test_items_flow_through_stages():
+    results = []
+    lock = threading.Lock()
+
+    def collect(item):
+        with lock:
+            results.append(item)
+        return []
+
+    pipeline = Pipeline([
+        PipelineStage('double', lambda item: [item, item]),
+        PipelineStage('square', lambda item: [item * item], workers=3),
+        PipelineStage('collect', collect)
+    ], queue_size=2)
+
+    pipeline.run(range(10))
+
+    assert sorted(results) == sorted([i * i for i in range(10)] * 2)
+
+
+def test_error_is_raised():
+    def fail(item):
+        if item == 5:
+            raise ValueError('Failed')
+        return [item]
+
+    pipeline = Pipeline([
+        PipelineStage('fail', fail, workers=2),
+        PipelineStage('discard', lambda item: [])
+    ], queue_size=1)
+
+    with pytest.raises(ValueError):
+        pipeline.run(range(100))
+
+
+def test_on_wait_is_called():
+    calls = []
+    event = threading.Event()
+
+    def wait_for_event(item):
+        event.wait(1)
+        return []
+
+    def on_wait():
+        calls.append(True)
+        event.set()
+
+    pipeline = Pipeline([PipelineStage('wait', wait_for_event)])
+
+    pipeline.run([1], on_wait, wait_interval=0.01)
+
+    assert len(calls) > 0
+
+
+def test_no_stages():
+    with pytest.raises(ValueError):
+        Pipeline([])
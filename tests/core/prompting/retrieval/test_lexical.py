@@ -0,0 +1,91 @@
+"""Tests for lexical retrieval."""
+
+import os
+
+from core.prompting.retrieval.lexical import (
+    LexicalIndex,
+    reciprocal_rank_fusion,
+    tokenize
+)
+
+
+def test_tokenize_compound_tokens():
+    tokens = tokenize('Error ERR-404 on SKU ab.12')
+
+    assert tokens == ['error', 'err-404', 'err', '404',
+                      'on', 'sku', 'ab.12', 'ab', '12']
+
+
+def test_search_exact_identifier():
+    index = LexicalIndex()
+    index.add(
+        ['a:0', 'a:1', 'b:0'],
+        ['The service failed with ERR-404.',
+         'The service is running.',
+         'Product SKU-1234 is out of stock.'],
+        ['a', 'a', 'b']
+    )
+
+    results = index.search('Failure ERR-404')
+
+    assert [doc_id for doc_id, _ in results] == ['a:0']
+
+
+def test_search_file_filter():
+    index = LexicalIndex()
+    index.add(['a:0', 'b:0'], ['stock report', 'stock list'], ['a', 'b'])
+
+    results = index.search('stock', file_name='b')
+
+    assert [doc_id for doc_id, _ in results] == ['b:0']
+
+
+def test_remove_files():
+    index = LexicalIndex()
+    index.add(['a:0', 'b:0'], ['stock report', 'stock list'], ['a', 'b'])
+
+    index.remove_files(['a'])
+
+    assert len(index) == 1
+    assert [doc_id for doc_id, _ in index.search('stock')] == ['b:0']
+
+
+def test_persistence(tmp_path):
+    path = os.path.join(tmp_path, 'lexical', 'index.json')
+    index = LexicalIndex(path)
+    index.add(['a:0'], ['stock report'], ['a'])
+    index.save()
+
+    loaded_index = LexicalIndex(path)
+
+    assert loaded_index.search('report') == index.search('report')
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['c', 'a']])
+
+    assert [item_id for item_id, _ in fused] == ['a', 'c', 'b']
+
+
+def test_search_file_names_filter():
+    index = LexicalIndex()
+    index.add(
+        ['a:0', 'b:0', 'c:0'],
+        ['Release notes.', 'Release plan.', 'Release date.'],
+        ['a', 'b', 'c']
+    )
+
+    results = index.search('release', file_names=['a', 'c'])
+
+    assert sorted(doc_id for doc_id, _ in results) == ['a:0', 'c:0']
+    assert index.search('release', file_names=[]) == []
+
+
+def test_remove_ids():
+    index = LexicalIndex()
+    index.add(['a:0', 'a:1', 'b:0'], ['one', 'two', 'three'], ['a', 'a', 'b'])
+
+    index.remove(['a:1'])
+
+    assert index.get_ids(['a']) == ['a:0']
+    assert index.get_ids(['a', 'b']) == ['a:0', 'b:0']
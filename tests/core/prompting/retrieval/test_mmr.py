@@ -0,0 +1,47 @@
+"""Tests for maximal marginal relevance."""
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from core.prompting.retrieval.mmr import (  # noqa: E402
+    maximal_marginal_relevance
+)
+
+QUERY = [1.0, 0.0, 0.0]
+EMBEDDINGS = [
+    [0.9, 0.1, 0.0],
+    [0.9, 0.11, 0.0],
+    [0.6, 0.0, 0.8],
+    [0.0, 1.0, 0.0]
+]
+"""Two near-duplicates most relevant to the query, a distinct relevant
+embedding and an unrelated one."""
+
+
+def test_near_duplicates_not_selected():
+    selected = maximal_marginal_relevance(QUERY, EMBEDDINGS, 2, 0.5)
+
+    assert selected[0] in (0, 1)
+    assert selected[1] == 2
+
+
+def test_relevance_order_without_diversity():
+    selected = maximal_marginal_relevance(QUERY, EMBEDDINGS, 4, 1)
+
+    assert selected == [0, 1, 2, 3]
+
+
+def test_top_k_greater_than_candidates():
+    selected = maximal_marginal_relevance(QUERY, EMBEDDINGS, 10)
+
+    assert sorted(selected) == [0, 1, 2, 3]
+
+
+def test_no_candidates():
+    assert maximal_marginal_relevance(QUERY, [], 2) == []
+
+
+def test_invalid_lambda():
+    with pytest.raises(ValueError):
+        maximal_marginal_relevance(QUERY, EMBEDDINGS, 2, 1.5)
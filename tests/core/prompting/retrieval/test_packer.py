@@ -0,0 +1,51 @@
+"""Tests for context packing."""
+
+from core.prompting.retrieval.packer import (
+    ContextChunk,
+    estimate_tokens,
+    pack_context
+)
+
+
+def test_pack_merges_adjacent_chunks():
+    chunks = [
+        ContextChunk('a:1', 'sentence two overlaps here. Sentence three.',
+                     'a', 1),
+        ContextChunk('b:0', 'Another file.', 'b', 0),
+        ContextChunk('a:0', 'Sentence one. sentence two overlaps here.',
+                     'a', 0),
+    ]
+
+    context = pack_context(chunks)
+
+    assert context == (
+        '<< Context a:0-1 >>\n'
+        'Sentence one. sentence two overlaps here. Sentence three.\n\n'
+        '<< Context b:0 >>\nAnother file.\n\n'
+    )
+
+
+def test_pack_drops_duplicates():
+    chunks = [
+        ContextChunk('a:0', 'Same text.', 'a', 0),
+        ContextChunk('b:3', 'Same text.', 'b', 3),
+    ]
+
+    context = pack_context(chunks)
+
+    assert context == '<< Context a:0 >>\nSame text.\n\n'
+
+
+def test_pack_fills_budget_by_relevance():
+    chunks = [
+        ContextChunk('a:0', 'x' * 40, 'a', 0),
+        ContextChunk('b:0', 'y' * 400, 'b', 0),
+        ContextChunk('c:0', 'z' * 40, 'c', 0),
+    ]
+
+    context = pack_context(chunks, max_tokens=30)
+
+    assert '<< Context a:0 >>' in context
+    assert '<< Context b:0 >>' not in context
+    assert '<< Context c:0 >>' in context
+    assert estimate_tokens(context) <= 30
@@ -0,0 +1,26 @@
+"""Tests for vector similarity."""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from core.prompting.retrieval.similarity import (  # noqa: E402
+    cosine_similarities,
+    normalize
+)
+
+
+def test_normalize_keeps_zero_vectors():
+    vectors = normalize(np.array([[3, 4], [0, 0]], dtype=np.float32))
+
+    assert np.allclose(vectors, [[0.6, 0.8], [0, 0]])
+
+
+def test_cosine_similarities():
+    similarities = cosine_similarities([1, 0], [[2, 0], [0, 1], [1, 1]])
+
+    assert similarities == pytest.approx([1, 0, 2 ** -0.5])
+
+
+def test_cosine_similarities_empty():
+    assert cosine_similarities([1, 0], []) == []
@@ -0,0 +1,51 @@
+"""Tests for ChromaVectorStore."""
+
+import os
+import time
+
+import pytest
+
+chromadb = pytest.importorskip('chromadb')
+
+from core.prompting.store.chroma import ChromaVectorStore  # noqa: E402
+from core.session import SessionManager  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    return chromadb.PersistentClient(path=os.path.join(tmp_path, 'chroma'))
+
+
+def test_query_and_delete(db):
+    store = ChromaVectorStore(db, 'session')
+    store.upsert(
+        ['a:0', 'b:0'],
+        [[1.0, 0.0], [0.0, 1.0]],
+        ['text a', 'text b'],
+        [{'file-name': 'a'}, {'file-name': 'b'}])
+
+    matches = store.query([1.0, 0.1], top_k=1)
+    assert [match.id for match in matches] == ['a:0']
+
+    store.delete({'file-name': ['a']})
+    assert store.count() == 1
+
+
+def test_drop_without_collection(db):
+    store = ChromaVectorStore(db, 'never-indexed')
+
+    store.drop()
+
+    assert store.count() == 0
+
+
+def test_evicts_session_never_indexed(db, tmp_path):
+    sessions_path = os.path.join(tmp_path, 'sessions')
+    manager = SessionManager(
+        sessions_path, ttl=60,
+        on_evict=lambda session_id: ChromaVectorStore(db, session_id).drop())
+    manager.touch('session')
+    marker_path = os.path.join(sessions_path, 'session', '.last-access')
+    os.utime(marker_path, (time.time() - 120, time.time() - 120))
+
+    assert manager.sweep() == ['session']
@@ -0,0 +1,145 @@
+"""Tests for NumpyVectorStore."""
+
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from core.prompting.store.numpy import (  # noqa: E402
+    INITIAL_CAPACITY,
+    NumpyVectorStore
+)
+
+
+def upsert(store: NumpyVectorStore, ids: list[str], file_name: str = 'a'):
+    store.upsert(
+        ids,
+        [[1.0, float(index), 0.0, 0.0] for index in range(len(ids))],
+        [f"text {chunk_id}" for chunk_id in ids],
+        [{'file-name': file_name} for _ in ids]
+    )
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    return os.path.join(tmp_path, 'store')
+
+
+def test_query_orders_by_similarity(path):
+    store = NumpyVectorStore(path)
+    store.upsert(
+        ['x', 'y', 'z'],
+        [[1, 0, 0, 0], [0, 1, 0, 0], [1, 1, 0, 0]],
+        ['x', 'y', 'z'],
+        [{}, {}, {}])
+
+    matches = store.query([2, 0, 0, 0], 2, include_embeddings=True)
+
+    assert [match.id for match in matches] == ['x', 'z']
+    assert matches[0].distance == pytest.approx(0)
+    assert np.allclose(matches[0].embedding, [1, 0, 0, 0])
+
+
+def test_upsert_replaces_existing_id(path):
+    store = NumpyVectorStore(path)
+    upsert(store, ['a:0'])
+
+    store.upsert(['a:0'], [[0, 1, 0, 0]], ['new'], [{'file-name': 'a'}])
+
+    assert store.count() == 1
+    assert store.get(['a:0'])[0].document == 'new'
+
+
+def test_resize_keeps_rows(path):
+    store = NumpyVectorStore(path)
+    upsert(store, [f"a:{index}" for index in range(INITIAL_CAPACITY)])
+
+    upsert(store, ['b:0'], 'b')
+
+    assert store.count() == INITIAL_CAPACITY + 1
+    assert store.get(['a:0'])[0].document == 'text a:0'
+    assert store.query([1, 0, 0, 0], 1, {'file-name': 'b'})[0].id == 'b:0'
+
+
+def test_delete_reuses_rows(path):
+    store = NumpyVectorStore(path)
+    upsert(store, ['a:0', 'a:1'], 'a')
+    upsert(store, ['b:0'], 'b')
+
+    store.delete({'file-name': 'a'})
+    upsert(store, ['c:0', 'c:1'], 'c')
+
+    assert store.count() == 3
+    assert len(store._ids) == 3
+    assert store.get(['a:0']) == []
+    assert {match.id for match in store.query([1, 0, 0, 0], 10)} == \
+        {'b:0', 'c:0', 'c:1'}
+
+
+def test_where_filters(path):
+    store = NumpyVectorStore(path)
+    upsert(store, ['a:0'], 'a')
+    upsert(store, ['b:0'], 'b')
+    upsert(store, ['c:0'], 'c')
+
+    scalar = store.query([1, 0, 0, 0], 10, {'file-name': 'b'})
+    listed = store.query([1, 0, 0, 0], 10, {'file-name': ['a', 'c']})
+    missing = store.query([1, 0, 0, 0], 10, {'file-name': 'd'})
+
+    assert [match.id for match in scalar] == ['b:0']
+    assert {match.id for match in listed} == {'a:0', 'c:0'}
+    assert missing == []
+
+
+def test_persist_and_reload(path):
+    store = NumpyVectorStore(path, 'int8', rescore=True)
+    upsert(store, ['a:0', 'a:1'])
+    store.delete({'file-name': 'missing'})
+    store.persist()
+
+    loaded = NumpyVectorStore(path)
+    matches = loaded.query([1, 1, 0, 0], 1)
+
+    assert loaded.count() == 2
+    assert matches[0].id == 'a:1'
+    assert matches[0].metadata == {'file-name': 'a'}
+
+
+def test_reload_keeps_free_rows(path):
+    store = NumpyVectorStore(path)
+    upsert(store, ['a:0'], 'a')
+    upsert(store, ['b:0'], 'b')
+    store.delete({'file-name': 'a'})
+    store.persist()
+
+    loaded = NumpyVectorStore(path)
+    upsert(loaded, ['c:0'], 'c')
+
+    assert loaded.count() == 2
+    assert len(loaded._ids) == 2
+
+
+def test_dimension_mismatch(path):
+    store = NumpyVectorStore(path)
+    upsert(store, ['a:0'])
+
+    with pytest.raises(ValueError):
+        store.upsert(['b:0'], [[1.0, 0.0]], ['b'], [{}])
+
+
+def test_invalid_quantization(path):
+    with pytest.raises(ValueError):
+        NumpyVectorStore(path, 'int4')
+
+
+def test_drop(path):
+    store = NumpyVectorStore(path)
+    upsert(store, ['a:0'])
+    store.persist()
+
+    store.drop()
+
+    assert store.count() == 0
+    assert not os.path.exists(path)
+    assert store.query([1, 0, 0, 0], 1) == []
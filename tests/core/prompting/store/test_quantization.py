@@ -0,0 +1,103 @@
+"""Tests for embedding quantization."""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from core.prompting.retrieval.similarity import normalize  # noqa: E402
+from core.prompting.store.numpy import NumpyVectorStore  # noqa: E402
+from core.prompting.store.quantization import (  # noqa: E402
+    dequantize,
+    get_bytes_per_vector,
+    get_quantization_report,
+    quantize,
+    score,
+    top_k_indexes
+)
+
+DIMENSIONS = 64
+
+
+@pytest.fixture
+def embeddings() -> np.ndarray:
+    vectors = np.random.default_rng(0).normal(size=(500, DIMENSIONS))
+    return normalize(vectors.astype(np.float32))
+
+
+@pytest.mark.parametrize('quantization, tolerance', [
+    ('float32', 0),
+    ('float16', 1e-3),
+    ('int8', 1e-2)
+])
+def test_round_trip(embeddings, quantization, tolerance):
+    values, scales = quantize(embeddings, quantization)
+
+    restored = dequantize(values, scales)
+
+    assert values.dtype == np.dtype(quantization)
+    assert (scales is not None) == (quantization == 'int8')
+    assert np.abs(restored - embeddings).max() <= tolerance
+
+
+def test_int8_zero_vector():
+    values, scales = quantize(np.zeros((1, 4), dtype=np.float32), 'int8')
+
+    assert np.all(dequantize(values, scales) == 0)
+
+
+@pytest.mark.parametrize('quantization', ['float16', 'int8'])
+def test_score_close_to_exact(embeddings, quantization):
+    query = embeddings[0]
+    values, scales = quantize(embeddings, quantization)
+
+    scores = score(values, scales, query)
+
+    assert np.allclose(scores, embeddings @ query, atol=2e-2)
+
+
+def test_top_k_indexes():
+    scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+
+    assert list(top_k_indexes(scores, 3)) == [1, 3, 2]
+    assert list(top_k_indexes(scores, 10)) == [1, 3, 2, 0]
+    assert len(top_k_indexes(scores, 0)) == 0
+
+
+def test_bytes_per_vector():
+    assert get_bytes_per_vector(DIMENSIONS, 'float32', True) == 256
+    assert get_bytes_per_vector(DIMENSIONS, 'float16', False) == 128
+    assert get_bytes_per_vector(DIMENSIONS, 'int8', False) == 68
+    assert get_bytes_per_vector(DIMENSIONS, 'int8', True) == 324
+
+
+def test_quantization_report(embeddings):
+    queries = embeddings[:20] + 0.1
+
+    entries = get_quantization_report(embeddings, queries, top_k=10)
+    recalls = {(entry.quantization, entry.rescore): entry.recall
+               for entry in entries}
+
+    assert set(recalls) == {('float32', False), ('float16', False),
+                            ('float16', True), ('int8', False),
+                            ('int8', True)}
+    assert recalls[('float32', False)] == 1
+    assert recalls[('float16', False)] >= 0.95
+    assert recalls[('int8', False)] >= 0.8
+    assert recalls[('int8', True)] >= recalls[('int8', False)]
+    assert recalls[('int8', True)] >= 0.95
+
+
+@pytest.mark.parametrize('quantization', ['float16', 'int8'])
+def test_store_rescore_recall(tmp_path, embeddings, quantization):
+    store = NumpyVectorStore(str(tmp_path), quantization, rescore=True)
+    ids = [str(index) for index in range(len(embeddings))]
+    store.upsert(ids, embeddings.tolist(), ids, [{} for _ in ids])
+    hits = 0
+
+    for query in embeddings[:20] + 0.1:
+        expected = {str(index) for index in top_k_indexes(
+            embeddings @ normalize(query), 10)}
+        found = {match.id for match in store.query(query.tolist(), 10)}
+        hits += len(expected & found)
+
+    assert hits / 200 >= 0.95
@@ -0,0 +1,98 @@
+"""Tests for CachedModelProvider."""
+
+import os
+
+import pytest
+
+from core.prompting.base import GeneratedResponse, ModelProvider
+from core.prompting.cache.base import DiskCache
+from core.prompting.history import PromptHistory, PromptHistoryEntry
+from core.prompting.provider.cached import CachedModelProvider
+
+
+class CountingModelProvider(ModelProvider):
+    """Provider returning the prompt and counting generations."""
+
+    def __init__(self, model_name: str = 'model'):
+        self.model_name = model_name
+        self.calls = 0
+
+    def get_cache_key(self) -> str:
+        return f"counting:{self.model_name}"
+
+    def generate(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        self.calls += 1
+        return GeneratedResponse(
+            value=prompt.upper(), input_tokens=3, output_tokens=5,
+            context=(context or []) + [len(prompt)])
+
+
+@pytest.fixture
+def cache(tmp_path) -> DiskCache:
+    cache = DiskCache(os.path.join(tmp_path, 'responses.db'), 1024 * 1024)
+    yield cache
+    cache.close()
+
+
+def test_generate_cached(cache):
+    provider = CountingModelProvider()
+    cached_provider = CachedModelProvider(provider, cache)
+
+    first = cached_provider.generate('prompt')
+    second = cached_provider.generate('prompt')
+
+    assert provider.calls == 1
+    assert not first.cached
+    assert second == GeneratedResponse(
+        value='PROMPT', input_tokens=3, output_tokens=5, cached=True,
+        context=[6])
+
+
+def test_cache_keyed_by_model(cache):
+    CachedModelProvider(CountingModelProvider('a'), cache).generate('prompt')
+    provider = CountingModelProvider('b')
+
+    CachedModelProvider(provider, cache).generate('prompt')
+
+    assert provider.calls == 1
+
+
+def test_cache_keyed_by_context(cache):
+    provider = CountingModelProvider()
+    cached_provider = CachedModelProvider(provider, cache)
+
+    cached_provider.generate('prompt')
+    response = cached_provider.generate('prompt', [1])
+    cached_response = cached_provider.generate('prompt', [1])
+
+    assert provider.calls == 2
+    assert not response.cached
+    assert cached_response.context == [1, 6]
+
+
+def test_stream_cached(cache):
+    provider = CountingModelProvider()
+    cached_provider = CachedModelProvider(provider, cache)
+
+    assert ''.join(cached_provider.generate_stream('prompt')) == 'PROMPT'
+    stream = cached_provider.generate_stream('prompt')
+
+    assert ''.join(stream) == 'PROMPT'
+    assert stream.get_response().cached
+    assert provider.calls == 1
+
+
+def test_history_tokens_exclude_cached():
+    history = PromptHistory()
+    history.append(PromptHistoryEntry('', 'a', GeneratedResponse(
+        value='A', input_tokens=3, output_tokens=5)))
+    history.append(PromptHistoryEntry('', 'a', GeneratedResponse(
+        value='A', input_tokens=3, output_tokens=5, cached=True)))
+
+    assert history.get_total_input_tokens() == 3
+    assert history.get_total_output_tokens() == 5
+    assert history.get_total_cached() == 1
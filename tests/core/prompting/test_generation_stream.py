@@ -0,0 +1,69 @@
+"""Tests for GenerationStream."""
+
+from core.prompting.base import GeneratedResponse, GenerationStream
+from core.prompting.executor import PromptExecutor
+from core.prompting.generator.echo import EchoResponseGenerator
+from core.prompting.history import PromptHistory
+
+
+def test_stream_final_response():
+    stream = GenerationStream(iter([
+        'Hello', ', world',
+        GeneratedResponse(value='', input_tokens=3, output_tokens=2)
+    ]))
+    responses = []
+    stream.add_done_callback(responses.append)
+
+    assert list(stream) == ['Hello', ', world']
+    assert stream.get_response() == GeneratedResponse(
+        value='Hello, world', input_tokens=3, output_tokens=2)
+    assert responses == [stream.get_response()]
+
+
+def test_stream_without_final_response():
+    stream = GenerationStream(iter(['a', 'b']))
+
+    assert stream.get_response() == GeneratedResponse(value='ab')
+
+
+def test_stream_from_response():
+    calls = []
+
+    def generate() -> GeneratedResponse:
+        calls.append(True)
+        return GeneratedResponse(value='Done', output_tokens=1)
+
+    stream = GenerationStream.from_response(generate)
+    assert calls == []
+
+    assert list(stream) == ['Done']
+    assert stream.get_response().output_tokens == 1
+
+
+def test_execute_stream_appends_history():
+    history = PromptHistory()
+    executor = PromptExecutor(history, [EchoResponseGenerator()])
+
+    stream = executor.execute_stream(':label /echo Text')
+    assert len(history) == 0
+
+    assert ''.join(stream) == 'Text'
+    assert history.get_response_by_label('label') == ['Text']
+
+
+def test_close_stops_chunks():
+    closed = []
+
+    def chunks():
+        try:
+            yield 'a'
+            yield 'b'
+        finally:
+            closed.append(True)
+
+    stream = GenerationStream(chunks())
+    assert next(iter(stream)) == 'a'
+
+    stream.close()
+
+    assert closed == [True]
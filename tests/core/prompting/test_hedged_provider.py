@@ -0,0 +1,254 @@
+"""Tests for HedgedModelProvider."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.prompting.base import (
+    GeneratedResponse,
+    GenerationError,
+    GenerationStream,
+    ModelProvider
+)
+from core.prompting.provider.hedged import HedgedModelProvider
+
+
+class FakeModelProvider(ModelProvider):
+    """Provider answering with its name after a delay, or failing."""
+
+    def __init__(
+        self,
+        name: str,
+        delay: float = 0,
+        error: Exception | None = None
+    ):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.closed = threading.Event()
+        self.streams: list[GenerationStream] = []
+        self._lock = threading.Lock()
+
+    def get_cache_key(self) -> str:
+        return self.name
+
+    def generate(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return GeneratedResponse(value=self.name)
+
+    def generate_stream(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GenerationStream:
+        def chunks():
+            try:
+                yield self.generate(prompt, context).value
+                yield ' more'
+            finally:
+                self.closed.set()
+
+        # Streams are kept, so they are only closed explicitly.
+        stream = GenerationStream(chunks())
+        self.streams.append(stream)
+        return stream
+
+    async def generate_async(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return GeneratedResponse(value=self.name)
+
+
+def test_primary_within_deadline():
+    secondary = FakeModelProvider('secondary')
+    provider = HedgedModelProvider(
+        FakeModelProvider('primary'), secondary, initial_deadline=1)
+
+    assert provider.generate('prompt').value == 'primary'
+    assert secondary.calls == 0
+
+
+def test_hedges_slow_primary():
+    primary = FakeModelProvider('primary', delay=0.5)
+    provider = HedgedModelProvider(
+        primary, FakeModelProvider('secondary'), initial_deadline=0.05)
+
+    assert provider.generate('prompt').value == 'secondary'
+    assert primary.calls == 1
+
+
+def test_primary_wins_after_hedge():
+    provider = HedgedModelProvider(
+        FakeModelProvider('primary', delay=0.1),
+        FakeModelProvider('secondary', delay=1),
+        initial_deadline=0.05)
+
+    assert provider.generate('prompt').value == 'primary'
+
+
+def test_fails_over_on_error():
+    provider = HedgedModelProvider(
+        FakeModelProvider('primary', error=GenerationError()),
+        FakeModelProvider('secondary'),
+        initial_deadline=10)
+
+    start = time.monotonic()
+    response = provider.generate('prompt')
+
+    assert response.value == 'secondary'
+    assert time.monotonic() - start < 1
+
+
+def test_both_failing():
+    provider = HedgedModelProvider(
+        FakeModelProvider('primary', error=GenerationError('primary')),
+        FakeModelProvider('secondary', error=GenerationError('secondary')))
+
+    with pytest.raises(GenerationError, match='secondary'):
+        provider.generate('prompt')
+
+
+def test_deadline_from_latencies():
+    primary = FakeModelProvider('primary')
+    secondary = FakeModelProvider('secondary')
+    provider = HedgedModelProvider(primary, secondary, initial_deadline=10)
+
+    # Fast responses of the primary provider replace the initial deadline.
+    for _ in range(10):
+        provider.generate('prompt')
+    primary.delay = 0.5
+    response = provider.generate('prompt')
+
+    assert response.value == 'secondary'
+    assert secondary.calls == 1
+
+
+def test_stream_hedged():
+    provider = HedgedModelProvider(
+        FakeModelProvider('primary', delay=0.5),
+        FakeModelProvider('secondary'),
+        initial_deadline=0.05)
+
+    stream = provider.generate_stream('prompt')
+
+    assert ''.join(stream) == 'secondary more'
+    assert stream.get_response().value == 'secondary more'
+
+
+def test_losing_stream_closed():
+    primary = FakeModelProvider('primary', delay=0.3)
+    provider = HedgedModelProvider(
+        primary, FakeModelProvider('secondary'), initial_deadline=0.05)
+
+    stream = provider.generate_stream('prompt')
+    assert next(iter(stream)) == 'secondary'
+
+    # The primary stream is closed once its first chunk arrives, without
+    # being consumed.
+    assert primary.closed.wait(1)
+
+
+def test_async_hedged():
+    primary = FakeModelProvider('primary', delay=1)
+    provider = HedgedModelProvider(
+        primary, FakeModelProvider('secondary'), initial_deadline=0.05)
+
+    response = asyncio.run(provider.generate_async('prompt'))
+
+    assert response.value == 'secondary'
+
+
+def test_async_fails_over_on_error():
+    provider = HedgedModelProvider(
+        FakeModelProvider('primary', error=GenerationError()),
+        FakeModelProvider('secondary'))
+
+    response = asyncio.run(provider.generate_async('prompt'))
+
+    assert response.value == 'secondary'
+
+
+def test_cache_key_of_both_providers():
+    provider = HedgedModelProvider(
+        FakeModelProvider('a'), FakeModelProvider('b'))
+
+    assert provider.get_cache_key() == 'a+b'
+
+
+def test_hedges_with_more_slow_primaries_than_workers():
+    provider = HedgedModelProvider(
+        FakeModelProvider('primary', delay=1),
+        FakeModelProvider('secondary'),
+        initial_deadline=0.05,
+        max_workers=2)
+    responses = []
+
+    def generate():
+        responses.append(provider.generate('prompt').value)
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=generate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Hedged requests do not queue behind the stuck primary requests.
+    assert responses == ['secondary'] * 4
+    assert time.monotonic() - start < 0.5
+
+
+def test_drops_queued_primaries():
+    primary = FakeModelProvider('primary', delay=0.5)
+    provider = HedgedModelProvider(
+        primary, FakeModelProvider('secondary'),
+        initial_deadline=0.05, max_workers=1)
+
+    for _ in range(3):
+        assert provider.generate('prompt').value == 'secondary'
+    time.sleep(0.6)
+
+    # Only the first primary request started before the others were dropped.
+    assert primary.calls == 1
+
+
+def test_timeout():
+    provider = HedgedModelProvider(
+        FakeModelProvider('primary', delay=1),
+        FakeModelProvider('secondary', delay=1),
+        initial_deadline=0.05,
+        timeout=0.2)
+
+    start = time.monotonic()
+    with pytest.raises(GenerationError):
+        provider.generate('prompt')
+
+    assert time.monotonic() - start < 0.5
+
+
+def test_async_timeout():
+    provider = HedgedModelProvider(
+        FakeModelProvider('primary', delay=1),
+        FakeModelProvider('secondary', delay=1),
+        initial_deadline=0.05,
+        timeout=0.2)
+
+    with pytest.raises(GenerationError):
+        asyncio.run(provider.generate_async('prompt'))
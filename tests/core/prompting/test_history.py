@@ -79,3 +79,27 @@ def test_get_total_output_tokens(history, entry1, entry2):
     calculated_tokens = history.get_total_output_tokens()
 
     assert calculated_tokens == expected_tokens
+
+
+def test_get_context_no_context(history, entry1, entry2):
+    history.extend([entry1, entry2])
+
+    assert history.get_context() is None
+
+
+def test_get_context_last_and_label(history, entry1, entry2):
+    entry1.response.context = [1, 2]
+    entry2.response.context = [3, 4]
+    history.extend([entry1, entry2])
+
+    assert history.get_context() == [3, 4]
+    assert history.get_context(entry1.label) == [1, 2]
+
+
+def test_get_context_last_without_context(history, entry1, entry2):
+    entry1.response.context = [1, 2]
+    history.extend([entry1, entry2])
+
+    # The last response has no context, so older ones are not continued.
+    assert history.get_context() is None
+    assert history.get_context(entry1.label) == [1, 2]
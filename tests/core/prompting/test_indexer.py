@@ -0,0 +1,79 @@
+"""Tests for ContextIndexer."""
+
+import os
+
+import pytest
+
+pytest.importorskip('llama_index.core')
+pytest.importorskip('numpy')
+
+from core.prompting.indexer import ContextIndexer  # noqa: E402
+from core.prompting.store.numpy import NumpyVectorStore  # noqa: E402
+
+
+class FakeOllamaClient():
+    """Ollama client embedding texts by their length, or failing."""
+
+    def __init__(self):
+        self.error: Exception | None = None
+
+    def embed(self, model: str, input: list[str], keep_alive=None) -> dict:
+        if self.error is not None:
+            raise self.error
+        return {'embeddings': [[1.0, float(len(text))] for text in input]}
+
+
+@pytest.fixture
+def ollama() -> FakeOllamaClient:
+    return FakeOllamaClient()
+
+
+@pytest.fixture
+def indexer(tmp_path, ollama) -> ContextIndexer:
+    db_path = os.path.join(tmp_path, 'db')
+    return ContextIndexer(
+        ollama,
+        db_path,
+        'session',
+        'embedding-model',
+        store=NumpyVectorStore(os.path.join(db_path, 'numpy', 'session')))
+
+
+def write_file(path: str, paragraphs: int, word: str):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('\n\n'.join(
+            f"{word} paragraph {index}. " * 20 for index in range(paragraphs)))
+
+
+def test_failed_reindex_keeps_previous_chunks(tmp_path, ollama, indexer):
+    file_path = os.path.join(tmp_path, 'notes.txt')
+    write_file(file_path, 10, 'original')
+    indexer.index_files([file_path], chunk_size=128, chunk_overlap=0)
+    fingerprints_path = os.path.join(
+        tmp_path, 'db', 'fingerprints', 'session.json')
+    with open(fingerprints_path, encoding='utf-8') as file:
+        fingerprints = file.read()
+
+    write_file(file_path, 10, 'changed')
+    ollama.error = ConnectionError('Ollama is down.')
+    with pytest.raises(ConnectionError):
+        indexer.index_files([file_path], chunk_size=128, chunk_overlap=0)
+
+    with open(fingerprints_path, encoding='utf-8') as file:
+        assert file.read() == fingerprints
+    assert indexer.get_file_names() == ['notes.txt']
+    ollama.error = None
+    assert 'original' in indexer.query('paragraph', mode='hybrid')
+
+
+def test_reindex_removes_stale_chunks(tmp_path, indexer):
+    file_path = os.path.join(tmp_path, 'notes.txt')
+    write_file(file_path, 10, 'original')
+    indexer.index_files([file_path], chunk_size=128, chunk_overlap=0)
+
+    write_file(file_path, 1, 'changed')
+    indexer.index_files([file_path], chunk_size=128, chunk_overlap=0)
+
+    context = indexer.query('paragraph', top_k=20, mode='hybrid')
+    assert 'changed' in context
+    assert 'original' not in context
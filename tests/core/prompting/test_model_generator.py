@@ -0,0 +1,72 @@
+"""Tests for ModelResponseGenerator."""
+
+from core.prompting.base import GeneratedResponse, ModelProvider, Prompt
+from core.prompting.generator.model import ModelResponseGenerator
+from core.prompting.history import PromptHistory, PromptHistoryEntry
+
+
+class RecordingModelProvider(ModelProvider):
+    """Provider recording the contexts received."""
+
+    def __init__(self):
+        self.contexts: list[list[int] | None] = []
+
+    def generate(
+        self,
+        prompt: str,
+        context: list[int] | None = None
+    ) -> GeneratedResponse:
+        self.contexts.append(context)
+        return GeneratedResponse(value=prompt)
+
+
+def create_history() -> PromptHistory:
+    history = PromptHistory()
+    history.append(PromptHistoryEntry('first', 'a', GeneratedResponse(
+        value='A', context=[1])))
+    history.append(PromptHistoryEntry('', 'b', GeneratedResponse(
+        value='B', context=[2])))
+    return history
+
+
+def test_generate_without_continue():
+    provider = RecordingModelProvider()
+    generator = ModelResponseGenerator(provider, history=create_history())
+
+    generator.generate(Prompt('prompt'))
+
+    assert provider.contexts == [None]
+
+
+def test_generate_continue_last():
+    provider = RecordingModelProvider()
+    generator = ModelResponseGenerator(provider, history=create_history())
+
+    generator.generate(Prompt('/model?continue=last prompt'))
+    generator.generate_stream(Prompt('/model?continue=last prompt')) \
+        .get_response()
+
+    assert provider.contexts == [[2], [2]]
+
+
+def test_generate_continue_last_without_context():
+    provider = RecordingModelProvider()
+    history = create_history()
+    history.append(PromptHistoryEntry('', '/echo c', GeneratedResponse(
+        value='C')))
+    generator = ModelResponseGenerator(provider, history=history)
+
+    generator.generate(Prompt('/model?continue=last prompt'))
+
+    # The last response has no conversation, so a new one is started.
+    assert provider.contexts == [None]
+
+
+def test_generate_continue_label():
+    provider = RecordingModelProvider()
+    generator = ModelResponseGenerator(provider, history=create_history())
+
+    generator.generate(Prompt('/model?continue=first prompt'))
+    generator.generate(Prompt('/model?continue=missing prompt'))
+
+    assert provider.contexts == [[1], None]
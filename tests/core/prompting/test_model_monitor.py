@@ -0,0 +1,92 @@
+"""Tests for OllamaModelMonitor."""
+
+import pytest
+
+pytest.importorskip('ollama')
+
+from core.prompting.provider.monitor import (  # noqa: E402
+    OllamaModelMonitor
+)
+
+
+class FakeOllamaClient():
+    """Ollama client loading models, or failing."""
+
+    def __init__(self, running: list[dict] | None = None):
+        self.running = running or []
+        self.error: Exception | None = None
+        self.requests: list[tuple[str, str]] = []
+
+    def generate(self, model: str, prompt: str, keep_alive=None) -> dict:
+        self.requests.append(('generate', model))
+        if self.error is not None:
+            raise self.error
+        return {'load_duration': 2_500_000_000}
+
+    def embed(self, model: str, input: list[str], keep_alive=None) -> dict:
+        self.requests.append(('embed', model))
+        if self.error is not None:
+            raise self.error
+        return {'load_duration': 500_000_000}
+
+    def ps(self) -> dict:
+        self.requests.append(('ps', ''))
+        return {'models': self.running}
+
+
+def test_warm_up_records_load_time():
+    monitor = OllamaModelMonitor(FakeOllamaClient(), 'llm', 'embedding')
+
+    monitor.warm_up()
+
+    statuses = {status.name: status for status in monitor.get_statuses()}
+    assert statuses['llm'].loaded
+    assert statuses['llm'].load_time == 2.5
+    assert statuses['embedding'].load_time == 0.5
+
+
+def test_warm_up_records_error():
+    client = FakeOllamaClient()
+    client.error = ConnectionError('Connection refused')
+    monitor = OllamaModelMonitor(client, None, 'embedding')
+
+    monitor.warm_up()
+
+    [status] = monitor.get_statuses()
+    assert not status.loaded
+    assert not status.loading
+    assert status.load_time is None
+    assert status.error == 'Connection refused'
+    assert client.requests == [('embed', 'embedding')]
+
+
+def test_check_matches_default_tag():
+    client = FakeOllamaClient([
+        {'model': 'llm:latest', 'size_vram': 1024},
+        {'model': 'embedding:v1', 'size_vram': 512}
+    ])
+    monitor = OllamaModelMonitor(client, 'llm', 'embedding:v1')
+
+    statuses = {status.name: status for status in monitor.check()}
+
+    assert statuses['llm'].loaded
+    assert statuses['llm'].size_vram == 1024
+    assert statuses['embedding:v1'].loaded
+
+    client.running = []
+    assert not any(status.loaded for status in monitor.check())
+
+
+def test_start_without_interval_only_warms_up():
+    client = FakeOllamaClient()
+    monitor = OllamaModelMonitor(client, 'llm', 'embedding')
+
+    monitor.start(0, warm_up=True)
+    thread = monitor._monitor
+    thread.join(1)
+
+    # Models are loaded, but not polled.
+    assert not thread.is_alive()
+    assert client.requests == [('generate', 'llm'), ('embed', 'embedding')]
+    assert all(status.loaded for status in monitor.get_statuses())
+    monitor.stop()
@@ -0,0 +1,161 @@
+"""Tests for OllamaClientPool."""
+
+import asyncio
+import threading
+
+import pytest
+
+from core.prompting.provider.pool import OllamaClientPool
+
+
+class ResponseError(Exception):
+    """Error of a request reported by Ollama."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class FakeClient():
+    """Client returning its host, optionally failing or blocking."""
+
+    def __init__(self, host: str, error: Exception | None = None):
+        self.host = host
+        self.error = error
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def generate(self, model: str = '', prompt: str = '', stream=False):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        if stream:
+            return iter([{'response': self.host}, {'response': '!'}])
+
+        self.release.wait()
+        return {'response': self.host}
+
+    def embed(self, model: str = '', input=None):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return {'embeddings': [[0.0]]}
+
+
+class FakeAsyncClient():
+    """Async client returning its host."""
+
+    def __init__(self, host: str):
+        self.host = host
+
+    async def generate(self, model: str = '', prompt: str = ''):
+        return {'response': self.host}
+
+
+def test_routes_to_least_in_flight():
+    clients = {'a': FakeClient('a'), 'b': FakeClient('b')}
+    pool = OllamaClientPool(clients)
+    clients['a'].release.clear()
+    busy = threading.Thread(target=pool.generate)
+    busy.start()
+    while clients['a'].calls == 0:
+        pass
+
+    responses = [pool.generate()['response'] for _ in range(3)]
+    clients['a'].release.set()
+    busy.join()
+
+    assert responses == ['b', 'b', 'b']
+    assert pool.get_statuses()[0].in_flight == 0
+
+
+def test_spreads_sequential_requests():
+    pool = OllamaClientPool({'a': FakeClient('a'), 'b': FakeClient('b')})
+
+    responses = [pool.generate()['response'] for _ in range(4)]
+
+    assert sorted(responses) == ['a', 'a', 'b', 'b']
+
+
+def test_ejects_failing_host_and_retries():
+    failing = FakeClient('a', ConnectionError('refused'))
+    pool = OllamaClientPool({'a': failing, 'b': FakeClient('b')})
+
+    responses = [pool.generate()['response'] for _ in range(3)]
+    statuses = pool.get_statuses()
+
+    assert responses == ['b', 'b', 'b']
+    assert failing.calls == 1
+    assert not statuses[0].healthy
+    assert statuses[0].errors == 1
+    assert statuses[1].healthy
+
+
+def test_retries_host_after_cooldown():
+    failing = FakeClient('a', ConnectionError('refused'))
+    pool = OllamaClientPool({'a': failing, 'b': FakeClient('b')}, cooldown=0)
+
+    pool.generate()
+    failing.error = None
+    responses = [pool.generate()['response'] for _ in range(2)]
+
+    assert 'a' in responses
+    assert pool.get_statuses()[0].healthy
+
+
+def test_request_error_not_retried():
+    failing = FakeClient('a', ResponseError(404))
+    other = FakeClient('b')
+    pool = OllamaClientPool({'a': failing, 'b': other})
+
+    with pytest.raises(ResponseError):
+        pool.embed()
+
+    assert other.calls == 0
+    assert pool.get_statuses()[0].healthy
+
+
+def test_all_hosts_failing():
+    pool = OllamaClientPool({
+        'a': FakeClient('a', ConnectionError('refused')),
+        'b': FakeClient('b', TimeoutError('timeout'))
+    })
+
+    with pytest.raises(TimeoutError):
+        pool.generate()
+
+    assert not any(status.healthy for status in pool.get_statuses())
+
+
+def test_stream_keeps_host_busy():
+    pool = OllamaClientPool({'a': FakeClient('a'), 'b': FakeClient('b')})
+
+    chunks = pool.generate(stream=True)
+    first_chunk = next(chunks)
+    in_flight = sum(status.in_flight for status in pool.get_statuses())
+    rest = list(chunks)
+
+    assert in_flight == 1
+    assert [first_chunk] + rest == [{'response': 'a'}, {'response': '!'}]
+    assert sum(status.in_flight for status in pool.get_statuses()) == 0
+
+
+def test_latency_stats():
+    pool = OllamaClientPool({'a': FakeClient('a')})
+
+    pool.generate()
+    pool.embed()
+
+    assert set(pool.get_statuses()[0].latencies) == {'generate', 'embed'}
+
+
+def test_async_shares_routing_state():
+    pool = OllamaClientPool({'a': FakeClient('a'), 'b': FakeClient('b')})
+    async_pool = pool.get_async(
+        {'a': FakeAsyncClient('a'), 'b': FakeAsyncClient('b')})
+
+    response = asyncio.run(async_pool.generate())
+
+    assert response == {'response': 'a'}
+    assert pool.get_statuses()[0].requests == 1
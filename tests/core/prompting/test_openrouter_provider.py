@@ -0,0 +1,74 @@
+"""Tests for OpenRouterModelProvider."""
+
+import asyncio
+import json
+
+import pytest
+
+httpx = pytest.importorskip('httpx')
+requests = pytest.importorskip('requests')
+
+from core.prompting.base import GenerationError  # noqa: E402
+from core.prompting.provider.openrouter import (  # noqa: E402
+    OpenRouterModelProvider
+)
+
+API_URL = 'http://openrouter/api'
+API_RESPONSE = {
+    'choices': [{'message': {'content': 'Response'}}],
+    'usage': {'prompt_tokens': 5, 'completion_tokens': 10}
+}
+
+
+class FakeSession(requests.Session):
+    """Session answering every POST with a status and JSON body."""
+
+    def __init__(self, status_code: int = 200):
+        super().__init__()
+        self.status_code = status_code
+        self.requests: list[dict] = []
+
+    def post(self, url, **kwargs) -> requests.Response:
+        self.requests.append(kwargs)
+        response = requests.Response()
+        response.status_code = self.status_code
+        response._content = json.dumps(API_RESPONSE).encode()
+        response._content_consumed = True
+        return response
+
+
+def test_timeout_in_seconds():
+    session = FakeSession()
+    provider = OpenRouterModelProvider(
+        API_URL, 'key', api_timeout=60000, session=session)
+
+    response = provider.generate('prompt')
+
+    assert response.value == 'Response'
+    assert session.requests[0]['timeout'] == 60
+
+
+def test_error_status():
+    provider = OpenRouterModelProvider(
+        API_URL, 'key', session=FakeSession(status_code=502))
+
+    with pytest.raises(GenerationError, match='502'):
+        provider.generate('prompt')
+
+
+def test_async_timeout_in_seconds():
+    timeouts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions['timeout'])
+        return httpx.Response(200, json=API_RESPONSE)
+
+    provider = OpenRouterModelProvider(
+        API_URL, 'key', api_timeout=1500,
+        async_client=lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)))
+
+    response = asyncio.run(provider.generate_async('prompt'))
+
+    assert response.output_tokens == 10
+    assert timeouts[0]['read'] == 1.5
@@ -121,3 +121,11 @@ def test_prompt_processing(
     assert prompt_processor.get_generator_type() == generator_type
     assert prompt_processor.get_prompt() == actual_prompt
     assert prompt_processor.get_generator_parameters() == generator_parameters
+
+
+def test_prompt_default_parameters():
+    prompt = Prompt('/model?cache=0&top-k=2 Prompt text',
+                    {'cache': '1', 'mode': 'hybrid'})
+
+    assert prompt.get_generator_parameters() == {
+        'cache': '0', 'top-k': '2', 'mode': 'hybrid'}
@@ -0,0 +1,58 @@
+"""Tests for PromptExecutor async execution."""
+
+import asyncio
+
+from core.prompting.base import GeneratedResponse, Prompt, ResponseGenerator
+from core.prompting.executor import PromptExecutor
+from core.prompting.generator.echo import EchoResponseGenerator
+from core.prompting.history import PromptHistory
+
+
+class SleepResponseGenerator(ResponseGenerator):
+    """Generate responses after waiting for the seconds in the prompt."""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    def get_type(self) -> str:
+        return 'sleep'
+
+    def generate(self, prompt: Prompt) -> GeneratedResponse:
+        raise NotImplementedError()
+
+    async def generate_async(self, prompt: Prompt) -> GeneratedResponse:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(float(prompt.get_prompt()))
+        self.running -= 1
+
+        return GeneratedResponse(value=prompt.get_prompt())
+
+
+def test_execute_async_concurrently():
+    history = PromptHistory()
+    generator = SleepResponseGenerator()
+    executor = PromptExecutor(history, [generator])
+
+    async def execute() -> list[GeneratedResponse]:
+        return await asyncio.gather(
+            executor.execute_async('/sleep 0.02'),
+            executor.execute_async('/sleep 0.01'))
+
+    responses = asyncio.run(execute())
+
+    assert [response.value for response in responses] == ['0.02', '0.01']
+    assert generator.max_running == 2
+    # Responses are added to the history as they complete.
+    assert history.get_prompts() == ['/sleep 0.01', '/sleep 0.02']
+
+
+def test_execute_async_sync_generator():
+    history = PromptHistory()
+    executor = PromptExecutor(history, [EchoResponseGenerator()])
+
+    response = asyncio.run(executor.execute_async('/echo Text'))
+
+    assert response.value == 'Text'
+    assert history.get_last_response() == 'Text'
@@ -0,0 +1,132 @@
+"""Tests for the HTTP clients."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+httpx = pytest.importorskip('httpx')
+pytest.importorskip('requests')
+
+from urllib3.exceptions import (  # noqa: E402
+    ConnectTimeoutError,
+    MaxRetryError,
+    ReadTimeoutError
+)
+
+from core.http import (  # noqa: E402
+    AsyncRetryTransport,
+    _get_retry_after,
+    create_http_session
+)
+
+URL = 'http://server/api'
+
+
+def send(handler, max_retries: int = 2) -> tuple[httpx.Response, int]:
+    """Send a POST request through a retrying transport.
+
+    Returns:
+        Response and number of attempts.
+    """
+    attempts = []
+
+    def count(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        return handler(len(attempts))
+
+    async def post() -> httpx.Response:
+        transport = AsyncRetryTransport(
+            httpx.MockTransport(count), max_retries, 0, 0)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.post(URL, content='{}')
+
+    return asyncio.run(post()), len(attempts)
+
+
+@pytest.mark.parametrize('status_code', [429, 500, 503])
+def test_retries_transient_status(status_code):
+    response, attempts = send(lambda attempt: httpx.Response(
+        status_code if attempt == 1 else 200))
+
+    assert response.status_code == 200
+    assert attempts == 2
+
+
+def test_returns_last_response_when_exhausted():
+    response, attempts = send(lambda attempt: httpx.Response(503))
+
+    assert response.status_code == 503
+    assert attempts == 3
+
+
+def test_no_retry_on_client_error():
+    response, attempts = send(lambda attempt: httpx.Response(400))
+
+    assert response.status_code == 400
+    assert attempts == 1
+
+
+def test_retries_connect_error():
+    def handler(attempt: int) -> httpx.Response:
+        if attempt == 1:
+            raise httpx.ConnectError('Connection refused')
+        return httpx.Response(200)
+
+    response, attempts = send(handler)
+
+    assert response.status_code == 200
+    assert attempts == 2
+
+
+def test_no_retry_on_read_error():
+    attempts = []
+
+    def handler(attempt: int) -> httpx.Response:
+        attempts.append(attempt)
+        raise httpx.ReadError('Connection reset')
+
+    with pytest.raises(httpx.ReadError):
+        send(handler)
+    assert attempts == [1]
+
+
+def test_retry_after_seconds():
+    response = httpx.Response(429, headers={'Retry-After': '3'})
+
+    assert _get_retry_after(response) == 3
+
+
+def test_retry_after_date():
+    date = datetime.now(timezone.utc) + timedelta(seconds=30)
+    response = httpx.Response(
+        503, headers={'Retry-After': format_datetime(date, usegmt=True)})
+
+    assert 25 < _get_retry_after(response) <= 30
+
+
+def test_retry_after_absent_or_invalid():
+    assert _get_retry_after(httpx.Response(503)) is None
+    assert _get_retry_after(
+        httpx.Response(503, headers={'Retry-After': 'soon'})) is None
+
+
+def test_session_retries_connect_errors_only():
+    session = create_http_session(max_retries=3)
+    retry = session.get_adapter(URL).max_retries
+
+    retry = retry.increment(
+        method='POST', url=URL, error=ConnectTimeoutError())
+    with pytest.raises(MaxRetryError):
+        retry.increment(method='POST', url=URL, error=ReadTimeoutError(
+            None, URL, 'Read timed out.'))
+
+
+def test_session_retries_transient_status():
+    session = create_http_session(max_retries=3)
+    retry = session.get_adapter(URL).max_retries
+
+    assert retry.is_retry('POST', 503)
+    assert retry.is_retry('POST', 429)
+    assert not retry.is_retry('POST', 400)
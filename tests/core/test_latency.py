@@ -0,0 +1,33 @@
+"""Tests for LatencyStats."""
+
+import pytest
+
+from core.latency import LatencyStats
+
+
+def test_percentile_empty():
+    assert LatencyStats().get_percentile(50) is None
+
+
+def test_percentile_nearest_rank():
+    stats = LatencyStats()
+    for latency in [5, 1, 4, 2, 3]:
+        stats.record(latency)
+
+    assert stats.get_percentile(0) == 1
+    assert stats.get_percentile(50) == 3
+    assert stats.get_percentile(95) == 5
+
+
+def test_window_keeps_recent():
+    stats = LatencyStats(window=2)
+    for latency in [10, 1, 2]:
+        stats.record(latency)
+
+    assert stats.get_count() == 2
+    assert stats.get_percentile(100) == 2
+
+
+def test_invalid_percentile():
+    with pytest.raises(ValueError):
+        LatencyStats().get_percentile(101)
@@ -0,0 +1,110 @@
+"""Tests for the session lifecycle."""
+
+import os
+import time
+
+from core.session import SessionManager
+
+
+def _create_session(
+    manager: SessionManager,
+    path: str,
+    session_id: str,
+    size: int,
+    last_access: float
+):
+    manager.touch(session_id)
+    with open(os.path.join(path, session_id, 'file.txt'), 'wb') as file:
+        file.write(b'x' * size)
+    os.utime(os.path.join(path, session_id, '.last-access'),
+             (last_access, last_access))
+
+
+def test_touch_new_session(tmp_path):
+    manager = SessionManager(str(tmp_path), ttl=60)
+
+    assert not manager.touch('a')
+    assert manager.touch('a')
+
+
+def test_sweep_expired_sessions(tmp_path):
+    evicted = []
+    manager = SessionManager(str(tmp_path), ttl=60, on_evict=evicted.append)
+    now = time.time()
+    _create_session(manager, str(tmp_path), 'old', 10, now - 120)
+    _create_session(manager, str(tmp_path), 'new', 10, now - 30)
+
+    assert manager.sweep(now) == ['old']
+    assert evicted == ['old']
+    assert not os.path.exists(os.path.join(tmp_path, 'old'))
+    assert [session.id for session in manager.get_sessions()] == ['new']
+
+
+def test_sweep_quota(tmp_path):
+    manager = SessionManager(
+        str(tmp_path), ttl=0, max_size=250, min_idle=60)
+    now = time.time()
+    _create_session(manager, str(tmp_path), 'a', 100, now - 300)
+    _create_session(manager, str(tmp_path), 'b', 100, now - 200)
+    _create_session(manager, str(tmp_path), 'c', 100, now - 10)
+
+    assert manager.sweep(now) == ['a']
+
+    # Sessions in use are kept even when the quota is exceeded.
+    manager = SessionManager(str(tmp_path), ttl=0, max_size=50, min_idle=60)
+    assert manager.sweep(now) == ['b']
+    assert [session.id for session in manager.get_sessions()] == ['c']
+
+
+def test_failed_eviction_keeps_session(tmp_path):
+    def fail(session_id: str):
+        raise RuntimeError(session_id)
+
+    manager = SessionManager(str(tmp_path), ttl=60, on_evict=fail)
+    _create_session(manager, str(tmp_path), 'a', 10, time.time() - 120)
+
+    assert manager.sweep() == []
+    assert os.path.exists(os.path.join(tmp_path, 'a'))
+
+
+def test_sweep_skips_busy_sessions(tmp_path):
+    manager = SessionManager(str(tmp_path), ttl=60,
+                             is_busy=lambda session_id: session_id == 'busy')
+    now = time.time()
+    _create_session(manager, str(tmp_path), 'busy', 10, now - 120)
+    _create_session(manager, str(tmp_path), 'idle', 10, now - 120)
+
+    assert manager.sweep(now) == ['idle']
+    assert os.path.exists(os.path.join(tmp_path, 'busy'))
+
+
+def test_size_includes_data_paths(tmp_path):
+    sessions_path = os.path.join(tmp_path, 'sessions')
+    data_path = os.path.join(tmp_path, 'data')
+    os.makedirs(os.path.join(data_path, 'vectors'))
+    with open(os.path.join(data_path, 'vectors', 'a.bin'), 'wb') as file:
+        file.write(b'x' * 100)
+    with open(os.path.join(data_path, 'a.json'), 'wb') as file:
+        file.write(b'x' * 20)
+
+    manager = SessionManager(
+        sessions_path, ttl=0,
+        get_data_paths=lambda session_id: [
+            os.path.join(data_path, 'vectors'),
+            os.path.join(data_path, f"{session_id}.json"),
+            os.path.join(data_path, 'missing.json')
+        ])
+    _create_session(manager, sessions_path, 'a', 10, time.time())
+
+    assert manager.get_sessions()[0].size == 130
+
+
+def test_touch_evicted_session_not_recreated(tmp_path):
+    manager = SessionManager(str(tmp_path), ttl=60)
+    manager.touch('a')
+    _create_session(manager, str(tmp_path), 'a', 10, time.time() - 120)
+    manager.sweep()
+
+    assert not manager.touch('a', create=False)
+    assert not os.path.exists(os.path.join(tmp_path, 'a'))
+    assert manager.get_sessions() == []